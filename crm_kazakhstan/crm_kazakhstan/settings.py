@@ -118,6 +118,30 @@ DATABASES = {
     }
 }
 
+# Cache
+# Per-process locmem by default, set CACHE_URL (e.g. redis://redis:6379/1) to share it between workers
+CACHE_URL = config('CACHE_URL', default='')
+
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds an admin module visibility flag is kept, signals drop it earlier when the data changes
+MODULE_VISIBILITY_CACHE_TIMEOUT = 300
+
+# Seconds the visit counts of the planned laboratory filter are kept, laboratories become due as time passes
+LABORATORY_VISIT_COUNTS_CACHE_TIMEOUT = 5
+
 CELERY_BROKER_URL = "redis://redis:6379/0"
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
 CELERY_ACCEPT_CONTENT = ['json']
@@ -3,31 +3,27 @@ from django.http import HttpResponseRedirect, FileResponse, Http404
 from django.urls import path, reverse
 from django.utils.html import format_html
 
+from documents.filters import RequiredDocumentsFilter
 from documents.inlines.additional import AdditionalInline
 from documents.inlines.main import MainInline
 from documents.models import Document, MainDocument, AdditionalDocument
+from documents.services import annotate_document_counts
 #
 # from gmail_messages.tasks import Stage
 
-from mothers.admin import MotherAdmin
 from mothers.models import Mother
-
-from guardian.shortcuts import get_objects_for_user
+from mothers.pagination import KeysetPaginationMixin
+from mothers.services.visibility import get_request_visibility
 
 
 @admin.register(Document)
-class DocumentProxyAdmin(admin.ModelAdmin):
-    # This three class attribute is used for permission logic
-    mothers_admin = MotherAdmin(Mother, admin.site)
-    mothers_model_name = mothers_admin.opts.model_name
-    klass = mothers_admin.opts.model
-    # Attribute for database query
-    prefetched_list = 'main_document', 'additional_document'
+class DocumentProxyAdmin(KeysetPaginationMixin, admin.ModelAdmin):
     search_fields = 'name',
     list_per_page = 10
     ordering = '-created',
     # list_display_links = 'custom_name',
     list_display = 'custom_name', 'add_main_docs', 'add_additional_docs'
+    list_filter = [RequiredDocumentsFilter]
     inlines = [MainInline, AdditionalInline]
     change_list_template = "admin/documents/document/change_list.html"
 
@@ -35,7 +31,6 @@ class DocumentProxyAdmin(admin.ModelAdmin):
         super().__init__(*args, **kwargs)
         self.documents_app_label = self.opts.app_label
         self.documents_model_name = self.opts.model_name
-        self.klass = self.opts.model  # This three class attribute is used for permission logi
         self.request = None
 
     class Media:
@@ -55,17 +50,14 @@ class DocumentProxyAdmin(admin.ModelAdmin):
         if not request.user.is_authenticated:
             return False
 
-        user_stage = getattr(request.user, 'stage', None)
-        # Construct the custom permission name for the user at a specific stage
-        custom_permission_name = f'{user_stage}_{self.mothers_model_name}_{request.user.username}'.lower()
-        # Base permission name for viewing documents
-        document_view_perm_name = 'documents.view_document'
-        view_perm = request.user.has_perm(document_view_perm_name)
-        # Get all objects assigned to the user on specific stage
-        users_mother_objs = get_objects_for_user(user=request.user, perms=custom_permission_name, klass=self.klass)
+        # Both flags are kept in the cache between requests until mothers or assignments change
+        visibility = get_request_visibility(request)
+        if visibility.cached_flag('documents:assigned', visibility.assigned_mothers.exists):
+            return True
 
-        mothers_exist = Mother.objects.all().exists()
-        return bool(users_mother_objs) or (view_perm and mothers_exist)
+        # Base permission name for viewing documents
+        view_perm = request.user.has_perm('documents.view_document')
+        return view_perm and visibility.cached_flag('documents:any', Mother.objects.exists)
 
     def get_queryset(self, request):
         """
@@ -73,22 +65,17 @@ class DocumentProxyAdmin(admin.ModelAdmin):
 
         Users with the base 'view_document' permission have access to all instances.
         Users with custom permissions are granted access only to the objects they are specifically assigned.
+        Document counts are annotated for the list columns.
         """
         self.request = request
-        queryset = Mother.objects.prefetch_related(*self.prefetched_list)
 
-        user_stage = getattr(request.user, 'stage', None)
-        # Construct the custom permission name for the user at a specific stage
-        custom_permission_name = f'{user_stage}_{self.mothers_model_name}_{request.user.username}'.lower()
         # Base permission name for viewing documents
-        document_view_perm_name = 'documents.view_document'
-        view_perm = request.user.has_perm(document_view_perm_name)
+        view_perm = request.user.has_perm('documents.view_document')
 
         if view_perm:
-            return queryset
+            return annotate_document_counts(Mother.objects.all())
         else:
-            queryset = get_objects_for_user(user=request.user, perms=custom_permission_name, klass=self.klass)
-            return queryset
+            return annotate_document_counts(get_request_visibility(request).assigned_mothers)
 
     def has_view_permission(self, request, mother_instance: Mother = None):
         """
@@ -99,20 +86,17 @@ class DocumentProxyAdmin(admin.ModelAdmin):
         the mother instances when they were created.
         """
 
-        user_stage = getattr(request.user, 'stage', None)
-        # Construct the custom permission name for the user at a specific stage
-        custom_permission_name = f'{user_stage}_{self.mothers_model_name}_{request.user.username}'.lower()
-        custom_perm = request.user.has_perm(custom_permission_name, mother_instance)
         # Base permission name for viewing documents
-        document_view_perm_name = 'documents.view_document'
-        view_perm = request.user.has_perm(document_view_perm_name)
-        # Get all objects assigned to the user on specific stage
-        users_mother_objs = get_objects_for_user(user=request.user, perms=custom_permission_name, klass=self.klass)
+        if request.user.has_perm('documents.view_document'):
+            return True
+
+        # Assignments are looked up once per request and mother
+        visibility = get_request_visibility(request)
 
         if mother_instance:
-            return custom_perm or view_perm
+            return visibility.is_assigned(mother_instance.pk)
         else:
-            return bool(users_mother_objs or view_perm)
+            return visibility.has_assigned_mothers
 
     def has_change_permission(self, request, mother_instance: Mother = None):
         """
@@ -124,23 +108,20 @@ class DocumentProxyAdmin(admin.ModelAdmin):
         created and if the 'documents' parameter is present in the request.
         """
 
-        user_stage = getattr(request.user, 'stage', None)
-        # Construct the custom permission name for the user at a specific stage
-        custom_permission_name = f'{user_stage}_{self.mothers_model_name}_{request.user.username}'.lower()
-        custom_perm = request.user.has_perm(custom_permission_name, mother_instance)
+        if 'documents' not in request.GET:
+            return False
+
         # Base permission name for changing documents
-        document_change_perm_name = 'documents.change_document'
-        change_perm = request.user.has_perm(document_change_perm_name)
-        # Get all objects assigned to the user on specific stage
-        users_mother_objs = get_objects_for_user(user=request.user, perms=custom_permission_name, klass=self.klass)
-
-        if 'documents' in request.GET:
-            if mother_instance:
-                return custom_perm or change_perm
-            else:
-                return bool(users_mother_objs or change_perm)
+        if request.user.has_perm('documents.change_document'):
+            return True
+
+        # Assignments are looked up once per request and mother
+        visibility = get_request_visibility(request)
+
+        if mother_instance:
+            return visibility.is_assigned(mother_instance.pk)
         else:
-            return False
+            return visibility.has_assigned_mothers
 
     def get_inlines(self, request, obj):
         # When an inline has one or more instances and then return these inlines
@@ -184,15 +165,20 @@ class DocumentProxyAdmin(admin.ModelAdmin):
            This method adds hidden data to indicate whether the 'Mother' instance has related documents.
            If related documents exist, the 'name' field is a clickable link; otherwise, it is plain text.
         """
-        hidden_data = format_html('<span class="hidden-data" data-related-docs="{}"></span>', obj.has_related_documents)
-        if obj.has_related_documents:
+        has_documents = getattr(obj, 'has_documents', None)
+        if has_documents is None:
+            has_documents = obj.has_related_documents
+        hidden_data = format_html('<span class="hidden-data" data-related-docs="{}"></span>', has_documents)
+        if has_documents:
             url = reverse('admin:documents_document_change', args=[obj.pk])
             return format_html('{}<a href="{}">{}</a>', hidden_data, url, obj.name)
         return format_html('{}{}', hidden_data, obj.name)
 
     @admin.display(description='Main Docs')
     def add_main_docs(self, mother_instance: Mother) -> str:
-        main_docs_amount = mother_instance.main_document.count()
+        main_docs_amount = getattr(mother_instance, 'main_documents_count', None)
+        if main_docs_amount is None:
+            main_docs_amount = mother_instance.main_document.count()
         # Construct the URL for the admin change page
         url = reverse('admin:documents_document_change', args=(mother_instance.pk,))
 
@@ -216,7 +202,9 @@ class DocumentProxyAdmin(admin.ModelAdmin):
     @admin.display(description='Additional Docs')
     def add_additional_docs(self, mother_instance: Mother) -> str:
 
-        additional_docs_amount = mother_instance.additional_document.count()
+        additional_docs_amount = getattr(mother_instance, 'additional_documents_count', None)
+        if additional_docs_amount is None:
+            additional_docs_amount = mother_instance.additional_document.count()
         # Construct the URL for the admin change page
         url = reverse('admin:documents_document_change', args=(mother_instance.pk,))
 
@@ -0,0 +1,23 @@
+from django.contrib import admin
+from django.utils.translation import gettext_lazy as _
+
+from documents.services import annotate_document_counts
+
+
+class RequiredDocumentsFilter(admin.SimpleListFilter):
+    title = _('required documents')
+    parameter_name = 'required_documents'
+
+    def lookups(self, request, model_admin):
+        return [
+            ('missing', _('Missing')),
+            ('complete', _('Complete')),
+        ]
+
+    def queryset(self, request, queryset):
+        queryset = annotate_document_counts(queryset)
+        if self.value() == 'missing':
+            return queryset.filter(missing_required_documents__gt=0)
+        elif self.value() == 'complete':
+            return queryset.filter(missing_required_documents=0)
+        return queryset
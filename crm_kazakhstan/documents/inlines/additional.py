@@ -4,7 +4,7 @@ from django.utils.html import format_html, mark_safe
 from django.urls import reverse
 from django import forms
 from documents.widget import CustomFileInput
-from mothers.services.application import convert_utc_to_local
+from mothers.services.local_time import get_request_formatter
 
 
 class AdditionalDocumentForm(forms.ModelForm):
@@ -90,9 +90,7 @@ class AdditionalInline(admin.TabularInline):
     get_html_photo.short_description = 'Screenshot'
 
     def date_create(self, obj):
-
-        local_datetime = convert_utc_to_local(self.request, obj.created)
-        return local_datetime.strftime("%B %Y, %H:%M")
+        return get_request_formatter(self.request).format(obj.created, "%B %Y, %H:%M")
 
     date_create.short_description = 'Created'
 
@@ -37,6 +37,13 @@ class MainDocument(models.Model):
         BANK_ACCOUNT = 'BANK ACCOUNT', 'Bank account'
         TRANSFER_AGREEMENT = 'TRANSFER AGREEMENT', 'Transfer agreement'
 
+    # Main documents every mother has to bring, the marriage certificate is required only from married mothers
+    REQUIRED_TITLES = (
+        MainDocumentChoice.PASSPORT, MainDocumentChoice.INTERNATIONAL_PASSPORT, MainDocumentChoice.NO_CRIMINAL_RECORD,
+        MainDocumentChoice.NARCOLOGIST, MainDocumentChoice.PSYCHOTHERAPIST, MainDocumentChoice.MOTHERS_METRIC,
+        MainDocumentChoice.BANK_ACCOUNT,
+    )
+
     mother = models.ForeignKey(Mother, on_delete=models.CASCADE, related_name='main_document')
     title = models.CharField(max_length=25, choices=MainDocumentChoice.choices)
     note = models.TextField(validators=[validate_max_length], blank=True, null=True)
@@ -1,4 +1,7 @@
 from django.core.exceptions import ValidationError
+from django.db.models import QuerySet, Subquery, OuterRef, Count, Value, IntegerField, BooleanField, Q, \
+    ExpressionWrapper, Exists, Case, When
+from django.db.models.functions import Coalesce
 
 
 def validate_max_length(value):
@@ -6,3 +9,44 @@ def validate_max_length(value):
         raise ValidationError(
             'This field cannot exceed 300 characters.'
         )
+
+
+def count_documents(documents: QuerySet, distinct_field: str = 'pk') -> Coalesce:
+    """
+    Number of the mother's documents as a correlated subquery, so several counts never multiply the mothers.
+    """
+    counted = documents.filter(mother=OuterRef('pk')).order_by().values('mother').annotate(
+        amount=Count(distinct_field, distinct=True)
+    ).values('amount')
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+def annotate_document_counts(queryset: QuerySet) -> QuerySet:
+    """
+    Annotates the main and additional document counts of every mother, whether she has any document and
+    how many of the required main documents, one per required title and the marriage certificate of a
+    married mother, are still missing.
+    """
+    # Imported here because the document models import Mother, which imports validate_max_length
+    from documents.models import MainDocument, AdditionalDocument
+
+    if 'has_documents' in queryset.query.annotations:
+        return queryset
+
+    required_titles = MainDocument.REQUIRED_TITLES
+    has_marriage_certificate = Exists(MainDocument.objects.filter(
+        mother=OuterRef('pk'), title=MainDocument.MainDocumentChoice.MARIED
+    ))
+    missing_marriage_certificate = Case(
+        When(Q(maried=True) & ~has_marriage_certificate, then=Value(1)), default=Value(0), output_field=IntegerField()
+    )
+    return queryset.annotate(
+        main_documents_count=count_documents(MainDocument.objects.all()),
+        additional_documents_count=count_documents(AdditionalDocument.objects.all()),
+        missing_required_documents=len(required_titles) - count_documents(
+            MainDocument.objects.filter(title__in=required_titles), distinct_field='title'
+        ) + missing_marriage_certificate,
+    ).annotate(
+        has_documents=ExpressionWrapper(Q(main_documents_count__gt=0) | Q(additional_documents_count__gt=0),
+                                        output_field=BooleanField()),
+    )
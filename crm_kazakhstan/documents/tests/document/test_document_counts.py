@@ -0,0 +1,89 @@
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.test import TestCase, RequestFactory
+
+from documents.admin import DocumentProxyAdmin
+from documents.filters import RequiredDocumentsFilter
+from documents.models import Document, MainDocument, AdditionalDocument
+from mothers.models import Mother
+
+User = get_user_model()
+
+
+class DocumentCountsTest(TestCase):
+    def setUp(self):
+        self.document_admin = DocumentProxyAdmin(Document, admin.site)
+        self.factory = RequestFactory()
+        self.superuser = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+        self.without_docs = Mother.objects.create(name='Without docs')
+        self.incomplete = Mother.objects.create(name='Incomplete')
+        self.complete = Mother.objects.create(name='Complete')
+
+        MainDocument.objects.create(mother=self.incomplete, title=MainDocument.MainDocumentChoice.PASSPORT,
+                                    file='Incomplete/Passport.pdf')
+        MainDocument.objects.create(mother=self.incomplete, title=MainDocument.MainDocumentChoice.PASSPORT,
+                                    file='Incomplete/Passport2.pdf')
+        AdditionalDocument.objects.create(mother=self.incomplete, title='Photo', file='Incomplete/Photo.jpg')
+        for title in MainDocument.MainDocumentChoice.values:
+            MainDocument.objects.create(mother=self.complete, title=title, file=f'Complete/{title}.pdf')
+
+    def get_request(self, params=None):
+        request = self.factory.get('/', params or {})
+        request.user = self.superuser
+        self.document_admin.request = request
+        return request
+
+    def test_counts_are_annotated(self):
+        mothers = {mother.name: mother for mother in self.document_admin.get_queryset(self.get_request())}
+
+        counts = {name: (mother.main_documents_count, mother.additional_documents_count,
+                         mother.missing_required_documents, mother.has_documents)
+                  for name, mother in mothers.items()}
+        self.assertEqual(counts, {
+            'Without docs': (0, 0, 7, False),
+            'Incomplete': (2, 1, 6, True),
+            'Complete': (10, 0, 0, True),
+        })
+
+    def test_columns_read_annotations_without_queries(self):
+        mothers = list(self.document_admin.get_queryset(self.get_request()).order_by('pk'))
+
+        with self.assertNumQueries(0):
+            columns = [(self.document_admin.custom_name(mother), self.document_admin.add_main_docs(mother),
+                        self.document_admin.add_additional_docs(mother)) for mother in mothers]
+
+        self.assertIn('data-related-docs="False"', columns[0][0])
+        self.assertIn('data-related-docs="True"', columns[1][0])
+        self.assertIn('>2 of 10</a>', columns[1][1])
+        self.assertIn('>1</a>', columns[1][2])
+
+    def test_filter_missing_required_documents(self):
+        request = self.get_request({'required_documents': 'missing'})
+        queryset = self.document_admin.get_queryset(request)
+
+        missing = RequiredDocumentsFilter(request, {'required_documents': 'missing'}, Document, self.document_admin)
+        complete = RequiredDocumentsFilter(request, {'required_documents': 'complete'}, Document, self.document_admin)
+
+        self.assertQuerysetEqual(missing.queryset(request, queryset).order_by('pk'),
+                                 [self.without_docs, self.incomplete])
+        self.assertQuerysetEqual(complete.queryset(request, queryset), [self.complete])
+
+    def test_complete_with_required_documents_only(self):
+        required_only = Mother.objects.create(name='Required only')
+        married = Mother.objects.create(name='Married', maried=True)
+        for mother in (required_only, married):
+            for title in MainDocument.REQUIRED_TITLES:
+                MainDocument.objects.create(mother=mother, title=title, file=f'{mother.name}/{title}.pdf')
+
+        request = self.get_request({'required_documents': 'complete'})
+        queryset = self.document_admin.get_queryset(request)
+        complete = RequiredDocumentsFilter(request, {'required_documents': 'complete'}, Document, self.document_admin)
+
+        self.assertQuerysetEqual(complete.queryset(request, queryset).order_by('pk'), [self.complete, required_only])
+        self.assertEqual(queryset.get(pk=married.pk).missing_required_documents, 1)
+
+        MainDocument.objects.create(mother=married, title=MainDocument.MainDocumentChoice.MARIED,
+                                    file='Married/Maried.pdf')
+        self.assertQuerysetEqual(complete.queryset(request, queryset).order_by('pk'),
+                                 [self.complete, required_only, married])
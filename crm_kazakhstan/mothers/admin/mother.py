@@ -1,15 +1,16 @@
 from typing import Any, Dict, Optional
 from django.contrib.admin.helpers import AdminForm
 from django.db import models
-from django.db.models import Q
 from django.utils.html import format_html
 from django.contrib import admin
 from django.forms import ModelForm
 from django.utils import timezone
-from guardian.shortcuts import get_objects_for_user
-from mothers.filters.applications import DayOfWeekFilter, convert_utc_to_local, UsersObjectsFilter
+from mothers.filters.applications import DayOfWeekFilter, UsersObjectsFilter
 from mothers.models import Mother
+from mothers.pagination import KeysetPaginationMixin
 from mothers.services.application import assign_user
+from mothers.services.local_time import get_request_formatter
+from mothers.services.visibility import get_request_visibility, APPLICATION
 
 # Globally disable delete selected
 admin.site.disable_action('delete_selected')
@@ -18,7 +19,7 @@ ContentType: models
 
 
 @admin.register(Mother)
-class MotherAdmin(admin.ModelAdmin):
+class MotherAdmin(KeysetPaginationMixin, admin.ModelAdmin):
     list_per_page = 1
     search_help_text = 'Search description'
     ordering = ('-created',)
@@ -41,52 +42,37 @@ class MotherAdmin(admin.ModelAdmin):
         self.request = None
         
     def get_list_filter(self, request):
-        user_permission = request.user.user_permissions
-        if not self.get_queryset(request).exists():
+        visibility = get_request_visibility(request)
+        view_only = visibility.is_view_only('view_mother')
+        if not visibility.stage_exists(APPLICATION, users_only=not view_only):
             return []
-        if (all(perm.codename.startswith('view') for perm in user_permission.all())
-                and user_permission.filter(codename='view_mother').exists()):
+        if view_only:
             return [DayOfWeekFilter, UsersObjectsFilter]
         return [DayOfWeekFilter]
 
     @admin.display(description='Date create')
     def date_create(self, obj):
-        local_datetime = convert_utc_to_local(self.request, obj.created)
-        return format_html("<strong>{}</strong>", local_datetime.strftime("%A %H:%M"))
+        return format_html("<strong>{}</strong>", get_request_formatter(self.request).format(obj.created, "%A %H:%M"))
 
     def get_queryset(self, request):
         """
            Returns a queryset of Mother instances, filtered for null fields and user-specific permissions.
 
            This method:
-           1. Retrieves the initial queryset.
-           2. Filters instances where any of the fields (age, residence, height, weight, caesarean, children) are null.
-           3. Constructs a custom permission name based on the model name and user's username.
-           4. Retrieves objects the user has permissions for and applies the same filter.
-           5. Returns the user-specific filtered queryset if it exists, otherwise returns the general filtered queryset.
+           1. Filters instances where any of the fields (age, residence, height, weight, caesarean, children) are null.
+           2. Returns all such instances to users which only view mothers.
+           3. Otherwise returns only the instances assigned to the user.
+
+           Both querysets come from the request visibility context, so they are resolved once per request.
         """
 
         self.request = request
-        
-        filter_null_fields = (
-                Q(age__isnull=True) | Q(residence__isnull=True) | Q(height__isnull=True) | Q(weight__isnull=True) |
-                Q(caesarean__isnull=True) | Q(children__isnull=True)
-        )
-        queryset = super().get_queryset(request).filter(filter_null_fields)
-
-        mother_model_name = self.opts.model_name
-        custom_permission_name = f'{mother_model_name}_{request.user.username}'.lower()
-        klass = self.opts.model
-        user_permission = request.user.user_permissions
-
-        users_objs = get_objects_for_user(request.user, perms=custom_permission_name, klass=klass).filter(
-            filter_null_fields)
+        visibility = get_request_visibility(request)
 
-        if (all(perm.codename.startswith('view') for perm in user_permission.all())
-                and user_permission.filter(codename='view_mother').exists()):
-            return queryset
+        if visibility.is_view_only('view_mother'):
+            return visibility.stage_queryset(APPLICATION)
 
-        return users_objs
+        return visibility.users_stage_queryset(APPLICATION)
 
     def render_change_form(self, request, context: Dict[str, Any],
                            add: bool = False, change: bool = False,
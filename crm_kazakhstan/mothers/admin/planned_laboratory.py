@@ -1,25 +1,26 @@
 from django.contrib import admin
-from guardian.shortcuts import get_objects_for_user
-from mothers.admin import MotherAdmin
 from mothers.filters.planned_laboratory import TimeToVisitLaboratoryFilter, UsersObjectsFilter
 from mothers.inlines.laboratory import LaboratoryInline
-from mothers.models.mother import PlannedLaboratory, Mother, AnalysisType, Laboratory
+from mothers.models.mother import PlannedLaboratory, AnalysisType
+from mothers.pagination import KeysetPaginationMixin
 from django.urls import reverse
 from django.utils.html import format_html
-from mothers.services.application import convert_utc_to_local
-from mothers.services.planned_laboratory import mothers_which_on_laboratory_stage, get_users_objs, \
-    get_filter_choices_for_laboratories
+from mothers.services.local_time import get_request_formatter
+from mothers.services.planned_laboratory import get_filter_choices_for_laboratories, with_current_laboratory, \
+    get_current_laboratory, get_visit_counts
+from mothers.services.transitions import parse_mother_ids, complete_missed_laboratories
+from mothers.services.visibility import get_request_visibility, get_managers_with_mothers, get_manager_display, \
+    LABORATORY
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core.exceptions import PermissionDenied
 from django.http import JsonResponse
+from django.template.loader import render_to_string
 import json
 from django.urls import path
-from django.db.models import Q
-from django.contrib.auth import get_user_model
-
-User = get_user_model()
 
 
 @admin.register(PlannedLaboratory)
-class PlannedLaboratoryAdmin(admin.ModelAdmin):
+class PlannedLaboratoryAdmin(KeysetPaginationMixin, admin.ModelAdmin):
     list_per_page = 5
     search_fields = 'name__icontains',
     fieldsets = [
@@ -58,11 +59,11 @@ class PlannedLaboratoryAdmin(admin.ModelAdmin):
         return super().get_list_display(request)
 
     def get_list_filter(self, request):
-        user_permission = request.user.user_permissions
-        if not self.get_queryset(request).exists():
+        visibility = get_request_visibility(request)
+        view_only = visibility.is_view_only('view_plannedlaboratory')
+        if not visibility.stage_exists(LABORATORY, users_only=view_only):
             return []
-        if (all(perm.codename.startswith('view') for perm in user_permission.all())
-                and user_permission.filter(codename='view_plannedlaboratory').exists()):
+        if view_only:
             return [TimeToVisitLaboratoryFilter, UsersObjectsFilter]
         return [TimeToVisitLaboratoryFilter, UsersObjectsFilter]
 
@@ -82,45 +83,29 @@ class PlannedLaboratoryAdmin(admin.ModelAdmin):
         if not request.user.is_authenticated:
             return False
 
-        view_laboratory = super().has_module_permission(request)
-
-        queryset = mothers_which_on_laboratory_stage(Mother.objects.all())
+        visibility = get_request_visibility(request)
 
-        mother_admin = MotherAdmin(Mother, admin.site)
-        mother_model_name = mother_admin.opts.model_name
-        custom_permission_name = f'{mother_model_name}_{request.user.username}'.lower()
-        klass = mother_admin.opts.model
+        if visibility.stage_exists(LABORATORY, users_only=True):
+            return True
 
-        users_objs = get_objects_for_user(request.user, perms=custom_permission_name, klass=klass)
-        users_objs = mothers_which_on_laboratory_stage(users_objs)
-
-        return bool(users_objs) or (view_laboratory and queryset)
+        return super().has_module_permission(request) and visibility.stage_exists(LABORATORY)
 
     def get_queryset(self, request):
         self.request = request
+        visibility = get_request_visibility(request)
 
-        queryset = mothers_which_on_laboratory_stage(Mother.objects.all())
-
-        mother_admin = MotherAdmin(Mother, admin.site)
-        mother_model_name = mother_admin.opts.model_name
-        custom_permission_name = f'{mother_model_name}_{request.user.username}'.lower()
-        klass = mother_admin.opts.model
-        user_permission = request.user.user_permissions
+        if visibility.is_view_only('view_plannedlaboratory'):
+            return with_current_laboratory(visibility.users_stage_queryset(LABORATORY))
 
-        users_objs = get_objects_for_user(request.user, perms=custom_permission_name, klass=klass)
-        users_objs = mothers_which_on_laboratory_stage(users_objs)
-
-        if (all(perm.codename.startswith('view') for perm in user_permission.all())
-                and user_permission.filter(codename='view_plannedlaboratory').exists()):
-            return users_objs
-
-        return queryset
+        return with_current_laboratory(visibility.stage_queryset(LABORATORY))
 
     @admin.display(description='Add laboratory')
     def change_laboratory_link(self, mother_instance):
-        laboratory = mother_instance.laboratories.order_by('-id').first()
+        laboratory_id = getattr(mother_instance, 'latest_laboratory_id', None)
+        if laboratory_id is None:
+            laboratory_id = mother_instance.laboratories.order_by('-id').values_list('id', flat=True).first()
         # Generate the URL for adding an instance of the Laboratory model
-        add_url = reverse('admin:mothers_laboratory_change', args=(laboratory.id,))
+        add_url = reverse('admin:mothers_laboratory_change', args=(laboratory_id,))
 
         # Copy filters from the request and add custom parameters
         filters = {key: value for key, value in self.request.GET.items()}
@@ -130,9 +115,7 @@ class PlannedLaboratoryAdmin(admin.ModelAdmin):
         # Construct the query string
         query_string = '&'.join([f'{key}={value}' for key, value in filters.items()])
 
-        user_permission = self.request.user.user_permissions
-        only_view_perm = (all(perm.codename.startswith('view') for perm in user_permission.all())
-                          and user_permission.filter(codename='view_plannedlaboratory').exists())
+        only_view_perm = get_request_visibility(self.request).is_view_only('view_plannedlaboratory')
 
         # Construct the final URL with query parameters
         full_url = f'{add_url}?{query_string}'
@@ -143,15 +126,17 @@ class PlannedLaboratoryAdmin(admin.ModelAdmin):
 
     @admin.display(description='Scheduled time')
     def custom_scheduled_time(self, obj):
-        laboratory = obj.laboratories.filter(is_completed=False).first()
-        local_datetime = convert_utc_to_local(self.request, laboratory.scheduled_time)
-        formatted_time = local_datetime.strftime("%d %B, %A %H:%M")
-        return formatted_time
+        laboratory = get_current_laboratory(obj)
+        if laboratory is None:
+            return self.get_empty_value_display()
+        return get_request_formatter(self.request).format(laboratory.scheduled_time, "%d %B, %A %H:%M")
 
     @admin.display(description='Analysis type')
     def custom_analysis_type(self, obj):
         files = ''
-        laboratory = obj.laboratories.filter(is_completed=False).first()
+        laboratory = get_current_laboratory(obj)
+        if laboratory is None:
+            return self.get_empty_value_display()
         for num, analyze_tye in enumerate(laboratory.analysis_types.all()):
             files += f'{num + 1}.{analyze_tye.get_name_display()}</a><br>'
         return format_html(files)
@@ -177,34 +162,51 @@ class PlannedLaboratoryAdmin(admin.ModelAdmin):
 
     @staticmethod
     def update_is_completed(request):
-        # this method update mother related laboratory instance 'is_completed' field
+        # this method completes the missed laboratories of the checked mothers in one UPDATE
         if request.method == 'POST':
-            data = json.loads(request.body)
-            mother_ids = data.get('mother_ids', [])
-            for mother_id in mother_ids:
-                mother_instance = Mother.objects.get(pk=mother_id)
-                laboratory = Laboratory.objects.filter(mother=mother_instance, is_came=False,
-                                                       is_completed=False).first()
-                if laboratory:
-                    laboratory.is_completed = not laboratory.is_completed
-                    laboratory.save()
-            return JsonResponse({'status': 'success'})
+            try:
+                data = json.loads(request.body)
+                mother_ids = parse_mother_ids(data)
+            except (json.JSONDecodeError, ValueError):
+                return JsonResponse({'status': 'failed', 'error': 'Invalid mother ids'}, status=400)
+            updated = complete_missed_laboratories(mother_ids)
+            return JsonResponse({'status': 'success', 'updated': updated})
+        return JsonResponse({'status': 'failed', 'error': 'Invalid request method'}, status=400)
 
     def get_filter_choices(self, request):
-        mothers_queryset = self.get_queryset(request)
-        choices = get_filter_choices_for_laboratories(mothers_queryset)
+        counts = get_visit_counts(request.user, self.get_queryset(request))
+        choices = get_filter_choices_for_laboratories(counts)
         return JsonResponse({'choices': choices})
 
+    def get_filtered_rows(self, request):
+        """
+        Result rows and pagination of the changelist for the filters in the query string, rendered without
+        the sidebar, media and the rest of the page for the AJAX filters.
+        """
+        if not self.has_view_or_change_permission(request):
+            raise PermissionDenied
+        try:
+            changelist = self.get_changelist_instance(request)
+        except IncorrectLookupParameters:
+            return JsonResponse({'status': 'failed', 'error': 'Invalid filters'}, status=400)
+        # The planned laboratory changelist has no list_editable, so its rows are rendered without a formset
+        changelist.formset = None
+
+        rows = render_to_string('admin/mothers/plannedlaboratory/change_list_rows.html', {
+            **self.admin_site.each_context(request),
+            'cl': changelist,
+            'opts': changelist.opts,
+        }, request=request)
+        return JsonResponse({
+            'status': 'success',
+            'rows': rows,
+            'result_count': changelist.result_count,
+            'show_update_button': request.GET.get('time_new_visit') == 'not_visit',
+        })
 
     def get_users_objects_choices(self, request):
-        queryset = self.get_queryset(request)
-        users_with_country = User.objects.exclude(Q(country__isnull=True) | Q(country=''))
-
-        choices = []
-        for user in users_with_country:
-            if bool(get_users_objs(user, queryset)):
-                display_text = f'{user.get_country_display()} {user.username}'
-                choices.append({'value': user.username, 'display': display_text})
+        managers = get_managers_with_mothers(self.get_queryset(request))
+        choices = [{'value': user.username, 'display': get_manager_display(user)} for user in managers]
 
         return JsonResponse({'choices': choices})
 
@@ -217,6 +219,8 @@ class PlannedLaboratoryAdmin(admin.ModelAdmin):
                  name='get_filter_choices'),
             path('get_users_objects_choices/', self.admin_site.admin_view(self.get_users_objects_choices),
                  name='get_users_objects_choices'),
+            path('get_filtered_rows/', self.admin_site.admin_view(self.get_filtered_rows),
+                 name='get_filtered_rows'),
         ]
         return custom_urls + urls
 
@@ -1,21 +1,21 @@
 from typing import Dict, Any, Optional
-from mothers.admin import MotherAdmin
-from mothers.filters.questionnaire import UsersObjectsFilter, IsNewFilter
+from mothers.filters.questionnaire import UsersObjectsFilter, IsNewFilter, BmiClassFilter
 from mothers.inlines import ScheduledEventInline
 from mothers.models.mother import Questionnaire, Mother, ScheduledEvent
+from mothers.pagination import KeysetPaginationMixin
 from django.contrib import admin
-from guardian.shortcuts import get_objects_for_user
 from django.contrib.admin.helpers import AdminForm
-from mothers.filters.applications import convert_utc_to_local
+from mothers.services.body_metrics import annotate_bmi, calculate_bmi, truncate_bmi, classify_bmi
+from mothers.services.local_time import get_request_formatter
 from django.utils.html import format_html
 from django.urls import reverse
 import pytz
 
-from mothers.services.questionnaire import get_mothers_without_incomplete_event
+from mothers.services.visibility import get_request_visibility, QUESTIONNAIRE
 
 
 @admin.register(Questionnaire)
-class QuestionnaireAdmin(admin.ModelAdmin):
+class QuestionnaireAdmin(KeysetPaginationMixin, admin.ModelAdmin):
     list_per_page = 10
     search_help_text = ("IS_NEW field shows new instances if they have no associated scheduled events,"
                         " otherwise they are old questionnaires.")
@@ -46,13 +46,13 @@ class QuestionnaireAdmin(admin.ModelAdmin):
         js = 'questionnaire/js/redirect_on_add_change_event_tab.js', 'questionnaire/js/hide_p_elements.js',
 
     def get_list_filter(self, request):
-        user_permission = request.user.user_permissions
-        if not self.get_queryset(request).exists():
+        visibility = get_request_visibility(request)
+        view_only = visibility.is_view_only('view_questionnaire')
+        if not visibility.stage_exists(QUESTIONNAIRE, users_only=not view_only):
             return []
-        if (all(perm.codename.startswith('view') for perm in user_permission.all())
-                and user_permission.filter(codename='view_questionnaire').exists()):
-            return [UsersObjectsFilter, IsNewFilter, 'created']
-        return [IsNewFilter, 'created']
+        if view_only:
+            return [UsersObjectsFilter, IsNewFilter, BmiClassFilter, 'created']
+        return [IsNewFilter, BmiClassFilter, 'created']
 
     def get_inlines(self, request, obj):
         # When an inline has one or more instances and then return these inlines
@@ -87,19 +87,12 @@ class QuestionnaireAdmin(admin.ModelAdmin):
         if not request.user.is_authenticated:
             return False
 
-        view_questionnaire = super().has_module_permission(request)
+        visibility = get_request_visibility(request)
 
-        queryset = get_mothers_without_incomplete_event(Mother.objects.all())
+        if visibility.stage_exists(QUESTIONNAIRE, users_only=True):
+            return True
 
-        mother_admin = MotherAdmin(Mother, admin.site)
-        mother_model_name = mother_admin.opts.model_name
-        custom_permission_name = f'{mother_model_name}_{request.user.username}'.lower()
-        klass = mother_admin.opts.model
-
-        users_objs = get_objects_for_user(request.user, perms=custom_permission_name, klass=klass)
-        users_objs = get_mothers_without_incomplete_event(users_objs)
-
-        return bool(users_objs) or (view_questionnaire and queryset)
+        return super().has_module_permission(request) and visibility.stage_exists(QUESTIONNAIRE)
 
     def get_queryset(self, request):
         """
@@ -108,29 +101,18 @@ class QuestionnaireAdmin(admin.ModelAdmin):
             1. Filters the queryset to include instances where certain fields (age, residence, height,
                weight, caesarean, children) are not null.
             2. Excludes instances where related ScheduledEvent instances have `is_completed=False`.
-            3. Checks if the user has a custom permission and filters the queryset further based on this permission.
-            4. If the user has all permissions starting with 'view' and specifically the 'view_questionnaire' permission,
+            3. If the user has all permissions starting with 'view' and specifically the 'view_questionnaire' permission,
                returns the initially filtered queryset.
-            5. Otherwise, returns the queryset filtered by both the custom permission and non-null fields.
+            4. Otherwise, returns only the filtered instances assigned to the user.
+            5. Annotates the body mass index so the changelist shows, sorts and filters it in the database.
         """
         self.request = request
+        visibility = get_request_visibility(request)
 
-        queryset = get_mothers_without_incomplete_event(Mother.objects.all())
-
-        mother_admin = MotherAdmin(Mother, admin.site)
-        mother_model_name = mother_admin.opts.model_name
-        custom_permission_name = f'{mother_model_name}_{request.user.username}'.lower()
-        klass = mother_admin.opts.model
-        user_permission = request.user.user_permissions
-
-        users_objs = get_objects_for_user(request.user, perms=custom_permission_name, klass=klass)
-        users_objs = get_mothers_without_incomplete_event(users_objs)
+        if visibility.is_view_only('view_questionnaire'):
+            return annotate_bmi(visibility.stage_queryset(QUESTIONNAIRE))
 
-        if (all(perm.codename.startswith('view') for perm in user_permission.all())
-                and user_permission.filter(codename='view_questionnaire').exists()):
-            return queryset
-
-        return users_objs
+        return annotate_bmi(visibility.users_stage_queryset(QUESTIONNAIRE))
 
     def render_change_form(self, request, context: Dict[str, Any],
                            add: bool = False, change: bool = False,
@@ -155,40 +137,26 @@ class QuestionnaireAdmin(admin.ModelAdmin):
 
     @admin.display(description='Creation Date')
     def date_create(self, obj):
-        local_datetime = convert_utc_to_local(self.request, obj.created)
-        return format_html(
-            "{} {}, {} {}",
-            local_datetime.strftime("%A"),
-            local_datetime.strftime("%H:%M"),
-            local_datetime.strftime("%d"),
-            local_datetime.strftime("%B")
-        )
+        return format_html("{}", get_request_formatter(self.request).format(obj.created, "%A %H:%M, %d %B"))
 
     @staticmethod
     def classify_bmi(bmi):
-        if bmi < 18.5:
-            return "Underweight (less than 18.5) - Low"
-        elif 18.5 <= bmi < 25:
-            return "Normal weight (18.5-24.9) - Normal"
-        elif 25 <= bmi < 30:
-            return "Overweight (pre-obesity) (25.0-29.9) - Increased"
-        elif 30 <= bmi < 35:
-            return "Obesity Class I (30.0-34.9) - High"
-        elif 35 <= bmi < 40:
-            return "Obesity Class II (35.0-39.9) - Very High"
-        else:
-            return "Obesity Class III (40.0 and above) - Extremely High"
+        return classify_bmi(bmi)
 
-    @admin.display(description='Mass index')
+    @admin.display(description='Mass index', ordering='bmi')
     def mass_index(self, obj):
-        bmi = int(obj.weight) / int(obj.height) ** 2
-        formatted_value = str(bmi).strip('0').strip('.').strip('0')[:3]
-        formatted_value = formatted_value[:2] + '.' + formatted_value[2]
+        bmi = getattr(obj, 'bmi', None)
+        if bmi is None:
+            bmi = calculate_bmi(obj.weight_kg, obj.height_cm)
+        if bmi is None:
+            return self.get_empty_value_display()
+
+        formatted_value = f'{truncate_bmi(bmi):.1f}'
         classification = self.classify_bmi(float(formatted_value))
         if "Normal" in classification:
-            return format_html(f"{formatted_value}/{classification}")
+            return format_html("{}/{}", formatted_value, classification)
         else:
-            return format_html(f"<span style='color: red;'>{formatted_value}/{classification}</span>")
+            return format_html("<span style='color: red;'>{}/{}</span>", formatted_value, classification)
 
     @admin.display(description='Scheduled event')
     def scheduled_event(self, mother_instance: Mother) -> str:
@@ -206,10 +174,8 @@ class QuestionnaireAdmin(admin.ModelAdmin):
         # Construct the final URL with query parameters
         full_url = f'{url}?{query_string}'
 
-        user_permission = self.request.user.user_permissions
         # Return the HTML link
-        if (all(perm.codename.startswith('view') for perm in user_permission.all())
-                and user_permission.filter(codename='view_questionnaire').exists()):
+        if get_request_visibility(self.request).is_view_only('view_questionnaire'):
             return format_html('add event')
         return format_html('<a href="{}">add event</a>', full_url)
 
@@ -254,8 +220,6 @@ class QuestionnaireAdmin(admin.ModelAdmin):
         # Construct the final URL with query parameters
         full_url = f'{add_url}?{query_string}'
 
-        user_permission = self.request.user.user_permissions
-        if (all(perm.codename.startswith('view') for perm in user_permission.all())
-                and user_permission.filter(codename='view_questionnaire').exists()):
+        if get_request_visibility(self.request).is_view_only('view_questionnaire'):
             return format_html('Add Laboratory')
         return format_html('<a href="{}">Add Laboratory</a>', full_url)
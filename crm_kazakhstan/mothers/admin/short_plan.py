@@ -1,16 +1,17 @@
 from typing import Dict, Any, Optional
-from mothers.admin import MotherAdmin
 from mothers.filters.short_plan import NewEventOccursFilter, UsersObjectsFilter, IsNewFilter
 from mothers.inlines import ScheduledEventInline
 from mothers.models.mother import Mother, ScheduledEvent, ShortPlan
+from mothers.pagination import KeysetPaginationMixin
 from django.contrib import admin
-from guardian.shortcuts import get_objects_for_user
 from django.contrib.admin.helpers import AdminForm
-from mothers.filters.applications import convert_utc_to_local
+from mothers.services.local_time import get_request_formatter
+from mothers.services.short_plan import annotate_events
+from mothers.services.transitions import parse_mother_ids, complete_scheduled_events
 from django.utils.html import format_html
 from django.urls import reverse, path
 import pytz
-from mothers.services.short_plan import get_mothers_with_recent_incomplete_events
+from mothers.services.visibility import get_request_visibility, SHORT_PLAN
 from django.http import JsonResponse
 from django.shortcuts import redirect
 import json
@@ -19,7 +20,7 @@ from django.utils.decorators import method_decorator
 
 
 @admin.register(ShortPlan)
-class ShortPlanAdmin(admin.ModelAdmin):
+class ShortPlanAdmin(KeysetPaginationMixin, admin.ModelAdmin):
     list_per_page = 10
     search_help_text = (
         "The IS_NEW field indicates new instances if they have one uncompleted associated scheduled event,"
@@ -57,11 +58,11 @@ class ShortPlanAdmin(admin.ModelAdmin):
         return super().get_list_display(request)
 
     def get_list_filter(self, request):
-        user_permission = request.user.user_permissions
-        if not self.get_queryset(request).exists():
+        visibility = get_request_visibility(request)
+        view_only = visibility.is_view_only('view_shortplan')
+        if not visibility.stage_exists(SHORT_PLAN, users_only=not view_only):
             return []
-        if (all(perm.codename.startswith('view') for perm in user_permission.all())
-                and user_permission.filter(codename='view_shortplan').exists()):
+        if view_only:
             return [UsersObjectsFilter, IsNewFilter]
         return [IsNewFilter, NewEventOccursFilter]
 
@@ -70,55 +71,26 @@ class ShortPlanAdmin(admin.ModelAdmin):
         if not request.user.is_authenticated:
             return False
 
-        view_shortplan = super().has_module_permission(request)
-
-        queryset = get_mothers_with_recent_incomplete_events(Mother.objects.all())
+        visibility = get_request_visibility(request)
 
-        mother_admin = MotherAdmin(Mother, admin.site)
-        mother_model_name = mother_admin.opts.model_name
-        custom_permission_name = f'{mother_model_name}_{request.user.username}'.lower()
-        klass = mother_admin.opts.model
+        if visibility.stage_exists(SHORT_PLAN, users_only=True):
+            return True
 
-        users_objs = get_objects_for_user(request.user, perms=custom_permission_name, klass=klass)
-        users_objs = get_mothers_with_recent_incomplete_events(users_objs)
-
-        return bool(users_objs) or (view_shortplan and queryset)
+        return super().has_module_permission(request) and visibility.stage_exists(SHORT_PLAN)
 
     def get_queryset(self, request):
 
         self.request = request
+        visibility = get_request_visibility(request)
 
-        queryset = get_mothers_with_recent_incomplete_events(Mother.objects.all())
-
-        mother_admin = MotherAdmin(Mother, admin.site)
-        mother_model_name = mother_admin.opts.model_name
-        custom_permission_name = f'{mother_model_name}_{request.user.username}'.lower()
-        klass = mother_admin.opts.model
-        user_permission = request.user.user_permissions
-
-        users_objs = get_objects_for_user(request.user, perms=custom_permission_name, klass=klass)
-        filtered_users_objs = get_mothers_with_recent_incomplete_events(users_objs)
-
-        all_perms_is_view = (all(perm.codename.startswith('view') for perm in user_permission.all())
-                             and user_permission.filter(codename='view_shortplan').exists())
-
-        if all_perms_is_view:
-            return queryset
+        if visibility.is_view_only('view_shortplan'):
+            return annotate_events(visibility.stage_queryset(SHORT_PLAN))
 
-        else:
-            # return users_objs
-            return filtered_users_objs
+        return annotate_events(visibility.users_stage_queryset(SHORT_PLAN))
 
     @admin.display(description='Creation Date')
     def date_create(self, obj):
-        local_datetime = convert_utc_to_local(self.request, obj.created)
-        return format_html(
-            "{} {}, {} {}",
-            local_datetime.strftime("%A"),
-            local_datetime.strftime("%H:%M"),
-            local_datetime.strftime("%d"),
-            local_datetime.strftime("%B")
-        )
+        return format_html("{}", get_request_formatter(self.request).format(obj.created, "%A %H:%M, %d %B"))
 
     @admin.display(description='Scheduled event')
     def scheduled_event(self, mother_instance: Mother) -> str:
@@ -136,10 +108,8 @@ class ShortPlanAdmin(admin.ModelAdmin):
         # Construct the final URL with query parameters
         full_url = f'{url}?{query_string}'
 
-        user_permission = self.request.user.user_permissions
         # Return the HTML link
-        if (all(perm.codename.startswith('view') for perm in user_permission.all())
-                and user_permission.filter(codename='view_shortplan').exists()):
+        if get_request_visibility(self.request).is_view_only('view_shortplan'):
             return format_html('change event')
         return format_html('<a href="{}">change event</a>', full_url)
 
@@ -186,11 +156,16 @@ class ShortPlanAdmin(admin.ModelAdmin):
 
     @admin.display(description='Is new?', boolean=True)
     def is_new(self, obj):
-        is_new = obj.scheduled_event.count() == 1
+        events_count = getattr(obj, 'events_count', None)
+        if events_count is None:
+            events_count = obj.scheduled_event.count()
+        is_new = events_count == 1
         return is_new
 
-    @admin.display(description='Note')
+    @admin.display(description='Note', ordering='open_event_scheduled_time')
     def custom_note(self, obj):
+        if hasattr(obj, 'open_event_note'):
+            return obj.open_event_note
         return obj.scheduled_event.filter(is_completed=False).first().note
 
     @admin.display(description='Complete')
@@ -202,38 +177,44 @@ class ShortPlanAdmin(admin.ModelAdmin):
         return checkbox_html
 
     def changelist_view(self, request, extra_context=None):
-
-        queryset = self.get_queryset(request)
-
-        if not queryset.exists():
+        # Only an empty stage leaves the changelist, a filter or search without results is shown as usual
+        if not self.get_queryset(request).exists():
             return redirect(reverse('admin:index'))
 
         extra_context = extra_context or {}
         extra_context['show_update_button'] = request.GET.get('an_event_occurred') == 'new_event'
         extra_context['update_url'] = reverse('admin:update_scheduled_events')
 
-        instance_count = queryset.count()
+        response = super().changelist_view(request, extra_context=extra_context)
+
+        # The changelist has already counted the mothers, the response is not rendered yet
+        changelist = getattr(response, 'context_data', {}).get('cl')
+        if changelist is None:
+            return response
+
+        instance_count, instance_count_is_estimate = (changelist.full_result_count,
+                                                      changelist.full_result_count_is_estimate)
+        if instance_count is None:
+            instance_count, instance_count_is_estimate = changelist.result_count, changelist.result_count_is_estimate
 
         # Add model name and instance count to context
-        extra_context['model_name'] = self.model._meta.verbose_name_plural
-        extra_context['instance_count'] = instance_count
-        return super().changelist_view(request, extra_context=extra_context)
+        response.context_data['model_name'] = self.model._meta.verbose_name_plural
+        response.context_data['instance_count'] = instance_count
+        response.context_data['instance_count_is_estimate'] = instance_count_is_estimate
+        return response
 
     @method_decorator(csrf_exempt)
     def update_scheduled_events(self, request):
         if request.method == 'POST':
             try:
                 data = json.loads(request.body)
-                mother_ids = data.get('mother_ids', [])
-                for mother_id in mother_ids:
-                    mother_instance = Mother.objects.get(pk=mother_id)
-                    scheduled_event = ScheduledEvent.objects.filter(mother=mother_instance, is_completed=False).first()
-                    if scheduled_event:
-                        scheduled_event.is_completed = not scheduled_event.is_completed
-                        scheduled_event.save()
-                return JsonResponse({'status': 'success'})
-            except json.JSONDecodeError as e:
+                mother_ids = parse_mother_ids(data)
+                updated = complete_scheduled_events(mother_ids)
+                return JsonResponse({'status': 'success', 'updated': updated})
+            except json.JSONDecodeError:
                 return JsonResponse({'status': 'failed', 'error': 'Invalid JSON'}, status=400)
+            except ValueError as e:
+                return JsonResponse({'status': 'failed', 'error': str(e)}, status=400)
             except Exception as e:
                 return JsonResponse({'status': 'failed', 'error': str(e)}, status=500)
         return JsonResponse({'status': 'failed', 'error': 'Invalid request method'}, status=400)
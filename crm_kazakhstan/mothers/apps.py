@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SurrogateMothersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'mothers'
+
+    def ready(self):
+        from mothers.signals import connect_signals
+        connect_signals()
@@ -1,11 +1,11 @@
 from django.contrib import admin
-from django.db.models import Q
 from django.contrib.auth import get_user_model
+from django.db.models.functions import ExtractIsoWeekDay
 from django.utils.translation import gettext_lazy as _
-from guardian.shortcuts import get_objects_for_user
 
-from mothers.models import Mother
-from mothers.services.application import convert_utc_to_local
+from mothers.services.visibility import UserVisibility, get_request_visibility, get_managers_with_mothers, \
+    get_manager_display, APPLICATION
+from mothers.services.local_time import get_user_timezone
 
 User = get_user_model()
 
@@ -28,16 +28,12 @@ class DayOfWeekFilter(admin.SimpleListFilter):
     def queryset(self, request, queryset):
 
         if self.value():
-            day_of_week = int(self.value())
+            # Lookups count days from Monday as 0, ISO week days from Monday as 1
+            iso_week_day = int(self.value()) + 1
 
-            # Convert each created datetime to the user's local timezone and filter by day of week
-            matching_ids = []
-            for obj in queryset:
-                local_created = convert_utc_to_local(request, obj.created)
-                if local_created.weekday() == day_of_week:
-                    matching_ids.append(obj.id)
-
-            return queryset.filter(id__in=matching_ids)
+            # The day of week is taken from the created datetime in the user's local timezone
+            local_week_day = ExtractIsoWeekDay('created', tzinfo=get_user_timezone(request.user))
+            return queryset.annotate(created_iso_week_day=local_week_day).filter(created_iso_week_day=iso_week_day)
         return queryset
 
 
@@ -46,33 +42,17 @@ class UsersObjectsFilter(admin.SimpleListFilter):
     parameter_name = 'username'
 
     def lookups(self, request, model_admin):
-        users_with_country = User.objects.exclude(Q(country__isnull=True) | Q(country=''))
-
-        lookups_list = []
-        for user in users_with_country:
-            if bool(self.get_users_objs(user)):
-                lookups_tuple = (user.username, _(f'{user.get_country_display()} {user.username}'))
-                lookups_list.append(lookups_tuple)
-        return lookups_list
+        mothers_queryset = get_request_visibility(request).stage_queryset(APPLICATION)
+        managers = get_managers_with_mothers(mothers_queryset)
+        return [(user.username, get_manager_display(user)) for user in managers]
 
     def queryset(self, request, queryset):
         username = self.value()
         if username is not None:
             user = User.objects.filter(username=username).first()
-            users_objs = self.get_users_objs(user)
-            return users_objs
+            # Narrowed by primary key so the annotations and other filters of the changelist are kept
+            return queryset.filter(pk__in=self.get_users_objs(user).values('pk'))
 
     @staticmethod
     def get_users_objs(user):
-        from mothers.admin import MotherAdmin
-
-        mother_admin = MotherAdmin(Mother, admin.site)
-        mother_model_name = mother_admin.opts.model_name
-        custom_permission_name = f'{mother_model_name}_{user.username}'.lower()
-        klass = mother_admin.opts.model
-
-        users_objs = get_objects_for_user(user, perms=custom_permission_name, klass=klass).filter(
-            Q(age__isnull=True) | Q(residence__isnull=True) | Q(height__isnull=True) | Q(weight__isnull=True) |
-            Q(caesarean__isnull=True) | Q(children__isnull=True)
-        )
-        return users_objs
+        return UserVisibility(user).users_stage_queryset(APPLICATION)
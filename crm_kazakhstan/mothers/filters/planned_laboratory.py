@@ -1,9 +1,9 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
-from django.utils import timezone
-from django.db.models import Q
 from django.contrib.auth import get_user_model
-from mothers.services.planned_laboratory import get_filter_choices_for_laboratories, get_users_objs
+from mothers.services.planned_laboratory import get_filter_choices_for_laboratories, get_users_objs, \
+    get_mothers_by_visit, get_visit_counts, VISIT_LOOKUPS
+from mothers.services.visibility import get_managers_with_mothers, get_manager_display
 
 User = get_user_model()
 
@@ -13,28 +13,14 @@ class TimeToVisitLaboratoryFilter(admin.SimpleListFilter):
     parameter_name = 'time_new_visit'
 
     def lookups(self, request, model_admin):
-        mothers_queryset = model_admin.get_queryset(request)
-        choices = get_filter_choices_for_laboratories(mothers_queryset)
-        return [(choice['value'], choice['display']) for choice in choices]
+        counts = get_visit_counts(request.user, model_admin.get_queryset(request))
+        choices = get_filter_choices_for_laboratories(counts)
+        return [(choice['value'], f"{choice['display']} ({choice['count']})") for choice in choices]
 
     def queryset(self, request, queryset):
         value = self.value()
-        if value:
-            filter_method = {
-                'new_visit': Q(laboratories__is_completed=False) &
-                             Q(laboratories__is_came__exact='') &
-                             Q(laboratories__scheduled_time__lte=timezone.now()),
-
-                'not_visit': Q(laboratories__is_completed=False) &
-                             Q(laboratories__is_came=False) &
-                             Q(laboratories__scheduled_time__lte=timezone.now()),
-
-                'visit': Q(laboratories__is_completed=False) &
-                         Q(laboratories__is_came=True) &
-                         Q(laboratories__scheduled_time__lte=timezone.now())
-            }
-
-            return queryset.filter(filter_method.get(value, Q()))
+        if value in VISIT_LOOKUPS:
+            return get_mothers_by_visit(queryset, value)
 
         return queryset
 
@@ -56,15 +42,8 @@ class UsersObjectsFilter(admin.SimpleListFilter):
     parameter_name = 'username'
 
     def lookups(self, request, model_admin):
-        queryset = model_admin.get_queryset(request)
-        users_with_country = User.objects.exclude(Q(country__isnull=True) | Q(country=''))
-
-        lookups_list = []
-        for user in users_with_country:
-            if bool(get_users_objs(user, queryset)):
-                lookups_tuple = (user.username, _(f'{user.get_country_display()} {user.username}'))
-                lookups_list.append(lookups_tuple)
-        return lookups_list
+        managers = get_managers_with_mothers(model_admin.get_queryset(request))
+        return [(user.username, get_manager_display(user)) for user in managers]
 
     def queryset(self, request, queryset):
         username = self.value()
@@ -1,11 +1,11 @@
 from django.contrib import admin
-from django.db.models import Q, Count
+from django.db.models import Count
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
-from guardian.shortcuts import get_objects_for_user
 
-from mothers.models import Mother
-from mothers.services.questionnaire import get_mothers_without_incomplete_event
+from mothers.services.body_metrics import BMI_CLASSES, filter_by_bmi_class
+from mothers.services.visibility import UserVisibility, get_request_visibility, get_managers_with_mothers, \
+    get_manager_display, QUESTIONNAIRE
 
 User = get_user_model()
 
@@ -15,34 +15,20 @@ class UsersObjectsFilter(admin.SimpleListFilter):
     parameter_name = 'username'
 
     def lookups(self, request, model_admin):
-        users_with_country = User.objects.exclude(Q(country__isnull=True) | Q(country=''))
-
-        lookups_list = []
-        for user in users_with_country:
-            if bool(self.get_users_objs(user)):
-                lookups_tuple = (user.username, _(f'{user.get_country_display()} {user.username}'))
-                lookups_list.append(lookups_tuple)
-        return lookups_list
+        mothers_queryset = get_request_visibility(request).stage_queryset(QUESTIONNAIRE)
+        managers = get_managers_with_mothers(mothers_queryset)
+        return [(user.username, get_manager_display(user)) for user in managers]
 
     def queryset(self, request, queryset):
         username = self.value()
         if username is not None:
             user = User.objects.filter(username=username).first()
-            users_objs = self.get_users_objs(user)
-            return users_objs
+            # Narrowed by primary key so the annotations and other filters of the changelist are kept
+            return queryset.filter(pk__in=self.get_users_objs(user).values('pk'))
 
     @staticmethod
     def get_users_objs(user):
-        from mothers.admin import MotherAdmin
-
-        mother_admin = MotherAdmin(Mother, admin.site)
-        mother_model_name = mother_admin.opts.model_name
-        custom_permission_name = f'{mother_model_name}_{user.username}'.lower()
-        klass = mother_admin.opts.model
-
-        users_objs = get_objects_for_user(user, perms=custom_permission_name, klass=klass)
-        users_objs = get_mothers_without_incomplete_event(users_objs)
-        return users_objs
+        return UserVisibility(user).users_stage_queryset(QUESTIONNAIRE)
 
 
 class IsNewFilter(admin.SimpleListFilter):
@@ -62,3 +48,16 @@ class IsNewFilter(admin.SimpleListFilter):
         elif self.value() == 'new':
             return queryset.filter(scheduled_events_count=0)
         return queryset
+
+
+class BmiClassFilter(admin.SimpleListFilter):
+    title = _('body mass index')
+    parameter_name = 'bmi_class'
+
+    def lookups(self, request, model_admin):
+        return [(lookup, _(label)) for lookup, label, _lower, _upper in BMI_CLASSES]
+
+    def queryset(self, request, queryset):
+        if self.value() is not None:
+            return filter_by_bmi_class(queryset, self.value())
+        return queryset
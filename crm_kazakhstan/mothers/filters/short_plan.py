@@ -1,11 +1,11 @@
 from django.contrib import admin
-from django.db.models import Q, Count
+from django.db.models import Count
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
-from guardian.shortcuts import get_objects_for_user
 
-from mothers.models import Mother
-from mothers.services.short_plan import get_mothers_with_recent_incomplete_events, get_mother_that_event_time_has_come
+from mothers.services.visibility import UserVisibility, get_request_visibility, get_managers_with_mothers, \
+    get_manager_display, SHORT_PLAN
+from mothers.services.short_plan import get_mother_that_event_time_has_come
 
 User = get_user_model()
 
@@ -16,8 +16,7 @@ class NewEventOccursFilter(admin.SimpleListFilter):
 
     def lookups(self, request, model_admin):
         qs = model_admin.get_queryset(request)
-        new_event_occurs = get_mother_that_event_time_has_come(qs)
-        if new_event_occurs:
+        if get_mother_that_event_time_has_come(qs).exists():
             yield 'new_event', 'new event'
 
     def queryset(self, request, queryset):
@@ -30,34 +29,20 @@ class UsersObjectsFilter(admin.SimpleListFilter):
     parameter_name = 'username'
 
     def lookups(self, request, model_admin):
-        users_with_country = User.objects.exclude(Q(country__isnull=True) | Q(country=''))
-
-        lookups_list = []
-        for user in users_with_country:
-            if bool(self.get_users_objs(user)):
-                lookups_tuple = (user.username, _(f'{user.get_country_display()} {user.username}'))
-                lookups_list.append(lookups_tuple)
-        return lookups_list
+        mothers_queryset = get_request_visibility(request).stage_queryset(SHORT_PLAN)
+        managers = get_managers_with_mothers(mothers_queryset)
+        return [(user.username, get_manager_display(user)) for user in managers]
 
     def queryset(self, request, queryset):
         username = self.value()
         if username is not None:
             user = User.objects.filter(username=username).first()
-            users_objs = self.get_users_objs(user)
-            return users_objs
+            # Narrowed by primary key so the annotations and other filters of the changelist are kept
+            return queryset.filter(pk__in=self.get_users_objs(user).values('pk'))
 
     @staticmethod
     def get_users_objs(user):
-        from mothers.admin import MotherAdmin
-
-        mother_admin = MotherAdmin(Mother, admin.site)
-        mother_model_name = mother_admin.opts.model_name
-        custom_permission_name = f'{mother_model_name}_{user.username}'.lower()
-        klass = mother_admin.opts.model
-
-        users_objs = get_objects_for_user(user, perms=custom_permission_name, klass=klass)
-        users_objs = get_mothers_with_recent_incomplete_events(users_objs)
-        return users_objs
+        return UserVisibility(user).users_stage_queryset(SHORT_PLAN)
 
 
 class IsNewFilter(admin.SimpleListFilter):
@@ -71,9 +56,13 @@ class IsNewFilter(admin.SimpleListFilter):
         ]
 
     def queryset(self, request, queryset):
-        queryset = queryset.annotate(scheduled_events_count=Count('scheduled_event'))
+        if 'events_count' in queryset.query.annotations:
+            count_field = 'events_count'
+        else:
+            queryset = queryset.annotate(scheduled_events_count=Count('scheduled_event'))
+            count_field = 'scheduled_events_count'
         if self.value() == 'old':
-            return queryset.filter(scheduled_events_count__gte=2)
+            return queryset.filter(**{f'{count_field}__gte': 2})
         elif self.value() == 'new':
-            return queryset.filter(scheduled_events_count=1)
+            return queryset.filter(**{count_field: 1})
         return queryset
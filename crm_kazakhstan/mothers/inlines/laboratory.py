@@ -1,6 +1,9 @@
+from collections import defaultdict
+
 from django.contrib import admin
+from django.db.models import Prefetch
 from mothers.models.mother import Laboratory, LaboratoryFile
-from mothers.services.application import convert_utc_to_local
+from mothers.services.local_time import get_request_formatter
 from django.utils.html import format_html
 
 
@@ -13,8 +16,25 @@ class LaboratoryInline(admin.TabularInline):
         js = 'laboratory/js/hide_p_elements.js', 'laboratory/js/move_text_on_second_line.js'
 
     def get_queryset(self, request):
+        # Analysis types and files of all displayed laboratories are loaded by two queries
         self.request = request
-        return super().get_queryset(request)
+        return super().get_queryset(request).prefetch_related(
+            'analysis_types',
+            Prefetch('files_laboratory', queryset=LaboratoryFile.objects.order_by('id')),
+        )
+
+    @staticmethod
+    def group_files_by_analysis_type(laboratory):
+        """
+        Files of the laboratory grouped by their analysis type id, grouped once per laboratory.
+        """
+        grouped_files = getattr(laboratory, '_files_by_analysis_type', None)
+        if grouped_files is None:
+            grouped_files = defaultdict(list)
+            for laboratory_file in laboratory.files_laboratory.all():
+                grouped_files[laboratory_file.analysis_type_id].append(laboratory_file)
+            laboratory._files_by_analysis_type = grouped_files
+        return grouped_files
 
     def has_view_permission(self, request, obj=None):
         return True
@@ -29,20 +49,17 @@ class LaboratoryInline(admin.TabularInline):
         return False
 
     def custom_scheduled_time(self, obj):
-        local_datetime = convert_utc_to_local(self.request, obj.scheduled_time)
-        formatted_time = local_datetime.strftime("%d %B, %A %H:%M")
-        return formatted_time
+        return get_request_formatter(self.request).format(obj.scheduled_time, "%d %B, %A %H:%M")
 
     custom_scheduled_time.short_description = 'Scheduled Time'
 
     def custom_analysis_types(self, laboratory):
         files = ''
-        related_to_lab_analysis = laboratory.analysis_types.all()
-        for analysis in related_to_lab_analysis:
-            laboratory_files = LaboratoryFile.objects.filter(laboratory=laboratory, analysis_type=analysis)
-            for num, laboratory_file in enumerate(laboratory_files):
+        grouped_files = self.group_files_by_analysis_type(laboratory)
+        for analysis in laboratory.analysis_types.all():
+            for num, laboratory_file in enumerate(grouped_files.get(analysis.pk, [])):
                 if laboratory_file.file:
-                    name = laboratory_file.analysis_type.name
+                    name = analysis.name
                     files += f'{num + 1}. File: <a href="{laboratory_file.file.url}" target="_blank">{name}</a><br>'
         return format_html(files)
 
@@ -50,17 +67,13 @@ class LaboratoryInline(admin.TabularInline):
 
     def custom_video(self, laboratory):
         files = ''
-        laboratory_video_instances = laboratory.videos_laboratory.all()
-        for num, laboratory_video in enumerate(laboratory_video_instances):
-
-            if laboratory_video.ultrasound_video:
-                video_url = laboratory_video.ultrasound_video.url
-                video_name = laboratory_video.ultrasound_video.name.split('/')[-1]
-                files += f'{num + 1}. Video file: <a href="{video_url}" target="_blank">{video_name}</a><br>'
-
-            if laboratory_video.ultrasound_file:
-                name = laboratory_video.ultrasound_file.name.split('/')[-1]
-                files += f'{num + 1}. File: <a href="{laboratory_video.ultrasound_file.url}" target="_blank">{name}</a><br>'
+        grouped_files = self.group_files_by_analysis_type(laboratory)
+        # Videos of all analysis types are numbered one after another
+        videos = [laboratory_file.video for analysis in laboratory.analysis_types.all()
+                  for laboratory_file in grouped_files.get(analysis.pk, []) if laboratory_file.video]
+        for num, video in enumerate(videos, start=1):
+            video_name = video.name.split('/')[-1]
+            files += f'{num}. Video file: <a href="{video.url}" target="_blank">{video_name}</a><br>'
         return format_html(files)
 
     custom_video.short_description = 'Video'
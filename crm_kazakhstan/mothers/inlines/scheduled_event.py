@@ -2,7 +2,7 @@ from django.contrib import admin
 from mothers.models.mother import ScheduledEvent
 from django import forms
 
-from mothers.services.application import convert_utc_to_local
+from mothers.services.local_time import get_request_formatter
 
 
 class ScheduledEventForm(forms.ModelForm):
@@ -66,7 +66,6 @@ class ScheduledEventInline(admin.TabularInline):
         return True
 
     def custom_scheduled_time(self, obj):
-        local_datetime = convert_utc_to_local(self.request, obj.scheduled_time)
-        return local_datetime.strftime("%B %d, %Y, %H:%M")
+        return get_request_formatter(self.request).format(obj.scheduled_time, "%B %d, %Y, %H:%M")
 
     custom_scheduled_time.short_description = 'Scheduled Time'
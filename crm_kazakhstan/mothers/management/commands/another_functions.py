@@ -3,8 +3,8 @@ from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 import re
 from mothers.management.commands.record_to_the_file import save_new_message_for_laboratory
 from mothers.models.mother import LaboratoryFile
+from mothers.services.local_time import LocalTimeFormatter
 from asgiref.sync import sync_to_async
-import pytz
 from datetime import datetime
 from django.contrib.auth import get_user_model
 from aiogram.enums.parse_mode import ParseMode
@@ -296,23 +296,12 @@ async def construct_message(instance, analysis_types_list, user_id):
     )
 
 
-async def convert_utc_to_local(user_id: int, utc_datetime: datetime) -> datetime:
-    # Retrieve the user asynchronously
+async def get_user_formatter(user_id: int) -> LocalTimeFormatter:
+    """Local time formatter of the django user, fetched once for a whole batch of datetimes."""
     user = await User.objects.aget(id=user_id)
+    return LocalTimeFormatter.for_user(user)
 
-    # Get the user's timezone, defaulting to 'UTC' if not set
-    user_timezone = getattr(user, 'timezone', 'UTC')
-
-    # Convert the string timezone to a timezone object
-    user_timezone = pytz.timezone(str(user_timezone))
-
-    # Make the datetime object timezone-aware in UTC if it isn't already
-    if utc_datetime.tzinfo is None:
-        utc_datetime = pytz.utc.localize(utc_datetime)
-    else:
-        utc_datetime = utc_datetime.astimezone(pytz.utc)
-
-    # Convert the UTC timezone-aware datetime to the user's local timezone
-    local_datetime = utc_datetime.astimezone(user_timezone)
 
-    return local_datetime
+async def convert_utc_to_local(user_id: int, utc_datetime: datetime) -> datetime:
+    formatter = await get_user_formatter(user_id)
+    return formatter.localize(utc_datetime)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from mothers.services.retention import RETENTION_POLICIES, apply_retention_policy
+
+
+class Command(BaseCommand):
+    help = 'Delete the expired mothers of the retention policies, or report them with --dry-run'
+
+    def add_arguments(self, parser):
+        parser.add_argument('policies', nargs='*', help='Policies to apply, all of them when none is given')
+        parser.add_argument('--dry-run', action='store_true')
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        unknown = set(options['policies']) - set(RETENTION_POLICIES)
+        if unknown:
+            raise CommandError(f'Unknown retention policies: {", ".join(sorted(unknown))}')
+
+        for name in options['policies'] or RETENTION_POLICIES:
+            report = apply_retention_policy(RETENTION_POLICIES[name], dry_run=options['dry_run'],
+                                            chunk_size=options['chunk_size'])
+            if report.dry_run:
+                self.stdout.write(f'{name}: {report.matched} mothers and {report.files} files would be deleted')
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f'{name}: deleted {report.matched} mothers, {sum(report.deleted.values())} rows '
+                    f'and {report.files} files in {report.chunks} chunks'
+                ))
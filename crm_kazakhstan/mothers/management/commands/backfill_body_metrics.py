@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from mothers.models import Mother
+from mothers.services.body_metrics import parse_height_cm, parse_weight_kg
+
+
+class Command(BaseCommand):
+    help = 'Parse the legacy text height and weight of mothers into the numeric height_cm and weight_kg columns'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        pending = Mother.objects.filter(
+            Q(height_cm__isnull=True, height__isnull=False) | Q(weight_kg__isnull=True, weight__isnull=False)
+        ).order_by('pk').only('pk', 'height', 'weight', 'height_cm', 'weight_kg')
+
+        updated = unparsed = 0
+        last_pk = 0
+        while True:
+            batch = list(pending.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            changed = []
+            for mother in batch:
+                height_cm, weight_kg = parse_height_cm(mother.height), parse_weight_kg(mother.weight)
+                if (height_cm, weight_kg) == (mother.height_cm, mother.weight_kg):
+                    unparsed += 1
+                    continue
+                mother.height_cm, mother.weight_kg = height_cm, weight_kg
+                changed.append(mother)
+
+            # Mothers are written with bulk_update, so no stage or visibility signals are sent
+            with transaction.atomic():
+                Mother.objects.bulk_update(changed, ['height_cm', 'weight_kg'])
+            updated += len(changed)
+
+        self.stdout.write(self.style.SUCCESS(f'Backfilled {updated} mothers, {unparsed} could not be parsed'))
@@ -3,20 +3,23 @@ from aiogram import Bot, Router
 from aiogram.types import Message, InlineKeyboardButton, InlineKeyboardMarkup, CallbackQuery
 from mothers.management.commands.another_functions import get_analysis_button_pairs, send_upload_prompt, \
     handle_file_upload, update_video_uploaded_button, get_uploaded_files_count, update_file_uploaded_button, \
-    has_finalize_upload_button, convert_utc_to_local, check_all_uploaded_files
+    has_finalize_upload_button, get_user_formatter, check_all_uploaded_files
 from mothers.management.commands.record_to_the_file import save_uploaded_unique_file, save_uploaded_unique_video, \
-    save_new_message_for_laboratory, delete_all_messages_from_bot
+    save_new_message_for_laboratory, schedule_messages_cleanup
 from mothers.models.mother import AnalysisType, Laboratory, LaboratoryFile
 from decouple import config
 from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
 from aiogram.enums.parse_mode import ParseMode
 from aiogram.exceptions import TelegramBadRequest
-from aiogram.types import FSInputFile
+from mothers.services.telegram_dispatcher import install_dispatcher
+from mothers.services.telegram_files import send_cached_file
 
 User = get_user_model()
 
 bot = Bot(token=config("TELEGRAM_BOT_TOKEN_FOR_UZB"))
+# Every request of the bot, message.answer included, is rate limited by the dispatcher
+telegram_dispatcher = install_dispatcher(bot)
 
 router = Router()
 
@@ -403,7 +406,7 @@ async def handle_docs_photo_and_video(message: Message):
     # Store the original keyboard using a unique key (e.g., message_id)
     keyboards_store[message_id] = new_keyboard
 
-    await delete_all_messages_from_bot(laboratory_id, chat_id, message.from_user.id, bot, is_posted=False)
+    await schedule_messages_cleanup(laboratory_id, chat_id, message.from_user.id, is_posted=False)
 
 
 @router.callback_query(lambda c: c.data.startswith('show_uploaded_files'))
@@ -417,31 +420,32 @@ async def show_uploaded_files(callback_query: CallbackQuery):
     files = await sync_to_async(
         lambda: list(LaboratoryFile.objects.filter(laboratory_id=laboratory_id).order_by('-created')))()
 
+    # The user's timezone is resolved once for all files
+    formatter = await get_user_formatter(django_user_id)
+    formatted_times = formatter.format_many([file.created for file in files], "🗓️ %A, %d %B - ⏰ %H:%M")
+
     message = None
-    for file in files:
-        # Open the file using aiofiles and read its path
+    for file, formatted_time in zip(files, formatted_times):
+        # Files sent before are referenced by their Telegram file_id instead of being uploaded again
         if file.file:
-            input_file = FSInputFile(file.file.path)
-            local_scheduled_time = await convert_utc_to_local(django_user_id, file.created)
-            formatted_time = local_scheduled_time.strftime("🗓️ %A, %d %B - ⏰ %H:%M")
-            message = await bot.send_document(
+            message = await send_cached_file(
+                bot.send_document, 'document', file.file,
+                content_hash=file.hash,
                 chat_id=callback_query.from_user.id,
-                document=input_file,
                 caption=f"{file.file.name.split('/')[-1]}\n{formatted_time}"
             )
         if file.video:
-            input_file = FSInputFile(file.video.path)
-            local_scheduled_time = await convert_utc_to_local(django_user_id, file.created)
-            formatted_time = local_scheduled_time.strftime("🗓️ %A, %d %B - ⏰ %H:%M")
-            message = await bot.send_document(
+            message = await send_cached_file(
+                bot.send_document, 'document', file.video,
+                content_hash=file.hash,
                 chat_id=callback_query.from_user.id,
-                document=input_file,
                 caption=f"{file.video.name.split('/')[-1]}\n{formatted_time}"
             )
 
         await save_new_message_for_laboratory(laboratory_id, chat_id, message.message_id, is_posted=False)
 
-    await delete_all_messages_from_bot(laboratory_id, chat_id, message.from_user.id, bot, is_posted=False)
+    # The files were sent to the user, the last sent message belongs to the bot
+    await schedule_messages_cleanup(laboratory_id, chat_id, callback_query.from_user.id, is_posted=False)
 
 
 @router.callback_query(lambda c: c.data.startswith('finalize_upload'))
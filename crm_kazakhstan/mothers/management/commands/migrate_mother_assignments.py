@@ -0,0 +1,58 @@
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from guardian.models import UserObjectPermission
+
+from mothers.models import Mother, MotherAssignment
+from mothers.services.application import get_mother_codename
+from mothers.services.visibility import invalidate_module_visibility
+
+
+class Command(BaseCommand):
+    help = 'Copy legacy guardian "mother_<username>" grants into the MotherAssignment table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--delete-legacy', action='store_true',
+                            help='Remove the copied guardian grants and their per-user Permission rows')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        content_type = ContentType.objects.get_for_model(Mother)
+        legacy_grants = UserObjectPermission.objects.filter(
+            content_type=content_type,
+            permission__codename__startswith='mother_',
+        ).select_related('user', 'permission')
+
+        existing_mother_ids = set(Mother.objects.values_list('pk', flat=True))
+
+        assignments = []
+        copied_grant_ids = []
+        for grant in legacy_grants.iterator(chunk_size=batch_size):
+            # Only grants that were made by assign_user for this exact user are copied
+            if grant.permission.codename != get_mother_codename(grant.user):
+                continue
+            mother_id = int(grant.object_pk)
+            if mother_id not in existing_mother_ids:
+                continue
+            assignments.append(MotherAssignment(user_id=grant.user_id, mother_id=mother_id))
+            copied_grant_ids.append(grant.pk)
+
+        with transaction.atomic():
+            for start in range(0, len(assignments), batch_size):
+                MotherAssignment.objects.bulk_create(assignments[start:start + batch_size], ignore_conflicts=True)
+
+            if options['delete_legacy']:
+                for start in range(0, len(copied_grant_ids), batch_size):
+                    UserObjectPermission.objects.filter(pk__in=copied_grant_ids[start:start + batch_size]).delete()
+                Permission.objects.filter(
+                    content_type=content_type,
+                    codename__startswith='mother_',
+                    userobjectpermission__isnull=True,
+                ).delete()
+
+        if assignments:
+            # bulk_create sends no signals, the cached sidebars are dropped once for all the copied rows
+            invalidate_module_visibility()
+        self.stdout.write(self.style.SUCCESS(f'Copied {len(assignments)} mother assignments'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from mothers.models import Mother
+from mothers.services.stage import refresh_stages
+from mothers.services.visibility import invalidate_module_visibility
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the stored stage of every mother from her events, laboratories and doctor answers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        mother_ids = list(Mother.objects.order_by('pk').values_list('pk', flat=True))
+
+        moved = 0
+        for start in range(0, len(mother_ids), batch_size):
+            with transaction.atomic():
+                moved += len(refresh_stages(Mother.objects.filter(pk__in=mother_ids[start:start + batch_size])))
+
+        if moved:
+            invalidate_module_visibility()
+        self.stdout.write(self.style.SUCCESS(f'Moved {moved} of {len(mother_ids)} mothers to their current stage'))
@@ -8,13 +8,25 @@ from aiogram.enums.parse_mode import ParseMode
 from django.core.files.base import ContentFile
 from django.utils.text import get_valid_filename
 from asgiref.sync import sync_to_async
-from mothers.models.mother import AnalysisType, LaboratoryFile, LaboratoryMessage
+from mothers.models.mother import AnalysisType, LaboratoryFile, LaboratoryMessage, MessageCleanup
 from aiogram.exceptions import TelegramAPIError
 import hashlib
+from collections import defaultdict
+from datetime import timedelta
+from django.utils import timezone
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Time the bot messages of an upload stay in the user's chat
+CLEANUP_DELAY = timedelta(minutes=1)
+
+# Due messages removed by one sweep, deleteMessages accepts at most 100 ids of one chat
+CLEANUP_BATCH_SIZE = 500
+BULK_DELETE_LIMIT = 100
+
+CLEANUP_INTERVAL_SECONDS = 5
+
 
 async def calculate_file_hash(file_content):
     """
@@ -51,25 +63,64 @@ async def delete_laboratory_group_message(laboratory_id, group_id, bot, message_
             await laboratory_message.adelete()
 
 
-async def delete_all_messages_from_bot(laboratory_id, group_id, user_id, bot, is_posted=None):
-    # Delay execution by 1 minute
-    await asyncio.sleep(60)  # 60 seconds = 1 minute
-    async for laboratory_message in LaboratoryMessage.objects.filter(
-            laboratory_id=laboratory_id,
-            chat_id=group_id,
-            is_posted=is_posted
-    ).aiterator():
+async def schedule_messages_cleanup(laboratory_id, group_id, user_id, is_posted=None):
+    """
+    Schedules the recorded bot messages of the laboratory for deletion from the user's chat in a minute.
+    """
+    due_at = timezone.now() + CLEANUP_DELAY
+    laboratory_message_ids = LaboratoryMessage.objects.filter(
+        laboratory_id=laboratory_id,
+        chat_id=group_id,
+        is_posted=is_posted,
+        cleanup__isnull=True,
+    ).values_list('pk', flat=True)
+
+    await MessageCleanup.objects.abulk_create(
+        [MessageCleanup(laboratory_message_id=pk, chat_id=user_id, due_at=due_at)
+         async for pk in laboratory_message_ids],
+        ignore_conflicts=True,
+    )
 
-        if laboratory_message is not None:
-            message_id = laboratory_message.message_id
 
+async def sweep_due_messages(bot, now=None, batch_size=CLEANUP_BATCH_SIZE) -> int:
+    """
+    Deletes one batch of due messages, with one deleteMessages call per chat and 100 messages and one
+    DELETE of their rows. Returns the size of the batch.
+    """
+    due = MessageCleanup.objects.filter(due_at__lte=now or timezone.now()).order_by('due_at').values_list(
+        'laboratory_message_id', 'chat_id', 'laboratory_message__message_id'
+    )[:batch_size]
+
+    laboratory_message_ids = []
+    messages_by_chat = defaultdict(list)
+    async for laboratory_message_id, chat_id, message_id in due:
+        laboratory_message_ids.append(laboratory_message_id)
+        messages_by_chat[chat_id].append(message_id)
+
+    for chat_id, message_ids in messages_by_chat.items():
+        for start in range(0, len(message_ids), BULK_DELETE_LIMIT):
             try:
-                await bot.delete_message(chat_id=user_id, message_id=message_id)
-            except TelegramAPIError as e:
+                await bot.delete_messages(chat_id=chat_id, message_ids=message_ids[start:start + BULK_DELETE_LIMIT])
+            except TelegramAPIError as error:
+                # Messages already deleted by the user or too old to delete stay in the chat
+                logger.info('Could not delete messages of chat %s: %s', chat_id, error)
+
+    # The schedule rows are removed with their laboratory messages
+    await LaboratoryMessage.objects.filter(pk__in=laboratory_message_ids).adelete()
+    return len(laboratory_message_ids)
+
+
+async def run_messages_cleanup(bot, interval=CLEANUP_INTERVAL_SECONDS):
+    """
+    Sweeps the due messages until it is cancelled, started next to the polling of the bot.
+    """
+    while True:
+        try:
+            while await sweep_due_messages(bot) == CLEANUP_BATCH_SIZE:
                 pass
-            finally:
-                # Delete the record from the database after attempting to delete the message from Telegram
-                await laboratory_message.adelete()
+        except Exception:
+            logger.exception('Messages cleanup failed')
+        await asyncio.sleep(interval)
 
 
 async def save_new_message_for_laboratory(laboratory_id, group_id, message_id, is_posted=None):
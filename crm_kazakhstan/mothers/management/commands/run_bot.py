@@ -2,13 +2,18 @@ from aiogram import Dispatcher
 from django.core.management.base import BaseCommand
 import asyncio
 from mothers.management.commands.handlers import bot, router
+from mothers.management.commands.record_to_the_file import run_messages_cleanup
 
 dp = Dispatcher()
 
 
 async def main():
     dp.include_router(router)
-    await dp.start_polling(bot)
+    cleanup = asyncio.create_task(run_messages_cleanup(bot))
+    try:
+        await dp.start_polling(bot)
+    finally:
+        cleanup.cancel()
 
 
 class Command(BaseCommand):
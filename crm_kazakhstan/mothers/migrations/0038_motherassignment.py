@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-17 10:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('mothers', '0037_rename_is_coming_laboratory_is_came'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MotherAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assigned_at', models.DateTimeField(auto_now_add=True)),
+                ('mother', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='mothers.mother')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mother_assignments', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='motherassignment',
+            index=models.Index(fields=['mother', 'user'], name='mother_assignment_mother_user'),
+        ),
+        migrations.AddConstraint(
+            model_name='motherassignment',
+            constraint=models.UniqueConstraint(fields=('user', 'mother'), name='unique_mother_assignment'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2 on 2026-10-17 10:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mothers', '0038_motherassignment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mother',
+            name='stage',
+            field=models.CharField(blank=True, choices=[('APPLICATION', 'Application'), ('QUESTIONNAIRE', 'Questionnaire'), ('SHORT_PLAN', 'Short plan'), ('LABORATORY', 'Laboratory')], editable=False, max_length=15, null=True),
+        ),
+        migrations.AddField(
+            model_name='mother',
+            name='stage_changed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='mother',
+            index=models.Index(fields=['stage', 'created'], name='mother_stage_created'),
+        ),
+    ]
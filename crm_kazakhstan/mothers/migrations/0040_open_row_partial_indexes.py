@@ -0,0 +1,29 @@
+# Generated by Django 4.2 on 2026-10-17 10:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mothers', '0039_mother_stage'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='doctoranswer',
+            index=models.Index(condition=models.Q(('is_completed', False)), fields=['laboratory'], name='open_answer_laboratory'),
+        ),
+        migrations.AddIndex(
+            model_name='laboratory',
+            index=models.Index(condition=models.Q(('is_completed', False)), fields=['mother', 'scheduled_time'], name='open_laboratory_mother_time'),
+        ),
+        migrations.AddIndex(
+            model_name='mother',
+            index=models.Index(condition=models.Q(('age__isnull', True), ('residence__isnull', True), ('height__isnull', True), ('weight__isnull', True), ('caesarean__isnull', True), ('children__isnull', True), _connector='OR'), fields=['created'], name='mother_incomplete_created'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduledevent',
+            index=models.Index(condition=models.Q(('is_completed', False)), fields=['mother', 'scheduled_time'], name='open_event_mother_time'),
+        ),
+    ]
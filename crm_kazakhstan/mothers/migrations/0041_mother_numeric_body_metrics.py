@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-17 11:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mothers', '0040_open_row_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mother',
+            name='height_cm',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='mother',
+            name='weight_kg',
+            field=models.DecimalField(blank=True, decimal_places=1, editable=False, max_digits=4, null=True),
+        ),
+    ]
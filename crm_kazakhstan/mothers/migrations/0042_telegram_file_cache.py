@@ -0,0 +1,27 @@
+# Generated by Django 4.2 on 2026-10-17 11:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mothers', '0041_mother_numeric_body_metrics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TelegramFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('file_id', models.CharField(max_length=255)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='telegramfile',
+            constraint=models.UniqueConstraint(fields=('path', 'content_hash'), name='unique_telegram_file'),
+        ),
+    ]
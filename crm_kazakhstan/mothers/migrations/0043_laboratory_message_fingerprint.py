@@ -0,0 +1,22 @@
+# Generated by Django 4.2 on 2026-10-17 11:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mothers', '0042_telegram_file_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='laboratorymessage',
+            name='fingerprint',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='laboratorymessage',
+            index=models.Index(fields=['laboratory', 'fingerprint'], name='laboratory_message_fingerprint'),
+        ),
+    ]
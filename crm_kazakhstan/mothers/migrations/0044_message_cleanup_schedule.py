@@ -0,0 +1,27 @@
+# Generated by Django 4.2 on 2026-10-17 11:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mothers', '0043_laboratory_message_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MessageCleanup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chat_id', models.BigIntegerField()),
+                ('due_at', models.DateTimeField()),
+                ('laboratory_message', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='cleanup', to='mothers.laboratorymessage')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='messagecleanup',
+            index=models.Index(fields=['due_at'], name='message_cleanup_due_at'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations
+from django.db.models import Case, CharField, Exists, F, OuterRef, Q, Value, When
+from django.utils import timezone
+
+APPLICATION_FIELDS = 'age', 'residence', 'height', 'weight', 'caesarean', 'children'
+
+
+def backfill_mother_stage(apps, schema_editor):
+    """
+    Stores the stage on the mothers which existed before the stage column, so the stage admins show them
+    without running recompute_stages. The stage predicates are frozen here as they were when the column
+    was added.
+    """
+    Mother = apps.get_model('mothers', 'Mother')
+    ScheduledEvent = apps.get_model('mothers', 'ScheduledEvent')
+    Laboratory = apps.get_model('mothers', 'Laboratory')
+    DoctorAnswer = apps.get_model('mothers', 'DoctorAnswer')
+
+    application_complete = Q(**{f'{field}__isnull': False for field in APPLICATION_FIELDS})
+    application_incomplete = Q()
+    for field in APPLICATION_FIELDS:
+        application_incomplete |= Q(**{f'{field}__isnull': True})
+    open_event = ScheduledEvent.objects.filter(mother=OuterRef('pk'), is_completed=False)
+    has_open_event = Exists(open_event)
+    has_recent_open_event = Exists(open_event.filter(scheduled_time__lte=F('created')))
+    has_open_laboratory = Exists(Laboratory.objects.filter(mother=OuterRef('pk'), is_completed=False))
+    has_open_doctor_answer = Exists(DoctorAnswer.objects.filter(laboratory__mother=OuterRef('pk'),
+                                                                is_completed=False))
+
+    stage = Case(
+        When(Q(has_open_laboratory) | Q(has_open_doctor_answer), then=Value('LABORATORY')),
+        When(application_complete & has_recent_open_event, then=Value('SHORT_PLAN')),
+        When(application_complete & ~has_open_event & ~has_open_laboratory & ~has_open_doctor_answer,
+             then=Value('QUESTIONNAIRE')),
+        When(application_incomplete, then=Value('APPLICATION')),
+        default=None,
+        output_field=CharField(),
+    )
+    Mother.objects.filter(stage__isnull=True).update(stage=stage, stage_changed_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mothers', '0044_message_cleanup_schedule'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_mother_stage, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,3 @@
 from .mother import Mother
 from .mother import ScheduledEvent
-
+from .mother import MotherAssignment
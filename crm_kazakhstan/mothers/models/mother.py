@@ -1,6 +1,9 @@
+from django.conf import settings
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils.translation import gettext_lazy as _
 from documents.services import validate_max_length
+from mothers.services.body_metrics import parse_height_cm, parse_weight_kg
 import re
 import logging
 
@@ -36,6 +39,13 @@ class ScheduledEvent(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     is_completed = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Only open events are looked up by the stage predicates
+            models.Index(fields=['mother', 'scheduled_time'], condition=models.Q(is_completed=False),
+                         name='open_event_mother_time'),
+        ]
+
 
 class LaboratoryFile(models.Model):
     laboratory = models.ForeignKey("Laboratory", on_delete=models.CASCADE, related_name='files_laboratory')
@@ -54,6 +64,46 @@ class LaboratoryMessage(models.Model):
     message_id = models.IntegerField()
     is_posted = models.BooleanField(null=True, blank=True)
     sent_at = models.DateTimeField(auto_now_add=True)
+    # Photo, text and keyboard the posted message shows, see mothers.services.laboratory_notification
+    fingerprint = models.CharField(max_length=64, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['laboratory', 'fingerprint'], name='laboratory_message_fingerprint'),
+        ]
+
+
+class MessageCleanup(models.Model):
+    """
+    Bot message which is deleted from the chat, together with its LaboratoryMessage, once it is due.
+    """
+    laboratory_message = models.OneToOneField(LaboratoryMessage, on_delete=models.CASCADE, related_name='cleanup')
+    chat_id = models.BigIntegerField()
+    due_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['due_at'], name='message_cleanup_due_at'),
+        ]
+
+
+class TelegramFile(models.Model):
+    """
+    Telegram file_id of a stored file, which is sent again by its id instead of uploading the file.
+    """
+    path = models.CharField(max_length=500)
+    content_hash = models.CharField(max_length=64)
+    file_id = models.CharField(max_length=255)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['path', 'content_hash'], name='unique_telegram_file'),
+        ]
+
+    def __str__(self):
+        return self.path
+
 
 class AnalysisType(models.Model):
     SEROLOGY = 'SEROLOGY'
@@ -76,6 +126,12 @@ class DoctorAnswer(models.Model):
     is_completed = models.BooleanField(default=False)
     sent_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['laboratory'], condition=models.Q(is_completed=False),
+                         name='open_answer_laboratory'),
+        ]
+
 
 class Laboratory(models.Model):
     mother = models.ForeignKey("Mother", on_delete=models.CASCADE, related_name='laboratories')
@@ -87,11 +143,31 @@ class Laboratory(models.Model):
     is_completed = models.BooleanField(default=False)
     analysis_types = models.ManyToManyField(AnalysisType, related_name='analysis_types')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['mother', 'scheduled_time'], condition=models.Q(is_completed=False),
+                         name='open_laboratory_mother_time'),
+        ]
+
     def __str__(self):
         return f"Planning a visit Laboratory for {self.mother.name}"
 
 
+class MotherQuerySet(models.QuerySet):
+    def assigned_to(self, user):
+        """
+        Mothers assigned to the user, resolved through the indexed MotherAssignment table.
+        """
+        return self.filter(assignments__user=user)
+
+
 class Mother(models.Model):
+    class StageChoices(models.TextChoices):
+        APPLICATION = 'APPLICATION', _('Application')
+        QUESTIONNAIRE = 'QUESTIONNAIRE', _('Questionnaire')
+        SHORT_PLAN = 'SHORT_PLAN', _('Short plan')
+        LABORATORY = 'LABORATORY', _('Laboratory')
+
     class BloodChoice(models.TextChoices):
         FIRST_POSITIVE = 'FIRST_POSITIVE', '(I)+'
         SECOND_POSITIVE = 'SECOND_POSITIVE', '(II)+'
@@ -108,11 +184,32 @@ class Mother(models.Model):
     residence = models.CharField(max_length=100, blank=True, null=True)
     height = models.CharField(max_length=100, blank=True, null=True)
     weight = models.CharField(max_length=100, blank=True, null=True)
+    # Numeric copies of height and weight parsed on save, used to compute the body mass index in the database
+    height_cm = models.PositiveSmallIntegerField(blank=True, null=True, editable=False)
+    weight_kg = models.DecimalField(max_digits=4, decimal_places=1, blank=True, null=True, editable=False)
     caesarean = models.SmallIntegerField(validators=[MinValueValidator(0), MaxValueValidator(2)], blank=True, null=True)
     children = models.SmallIntegerField(validators=[MinValueValidator(0), MaxValueValidator(5)], blank=True, null=True)
     blood = models.CharField(max_length=15, choices=BloodChoice.choices, default=BloodChoice.UNKNOWN)
     maried = models.BooleanField(default=False)
     created = models.DateTimeField(auto_now_add=True)
+    # Maintained by mothers.services.stage whenever the mother or her events, laboratories or answers change
+    stage = models.CharField(max_length=15, choices=StageChoices.choices, null=True, blank=True, editable=False)
+    stage_changed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = MotherQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        self.height_cm = parse_height_cm(self.height)
+        self.weight_kg = parse_weight_kg(self.weight)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            if 'height' in update_fields:
+                update_fields = {*update_fields, 'height_cm'}
+            if 'weight' in update_fields:
+                update_fields = {*update_fields, 'weight_kg'}
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
 
     @property
     def has_related_documents(self):
@@ -121,12 +218,38 @@ class Mother(models.Model):
     class Meta:
         verbose_name = 'Application'
         verbose_name_plural = 'Applications'
+        indexes = [
+            models.Index(fields=['stage', 'created'], name='mother_stage_created'),
+            # Serves the incomplete application predicate of the application stage and the cleanup tasks
+            models.Index(fields=['created'], name='mother_incomplete_created', condition=(
+                    models.Q(age__isnull=True) | models.Q(residence__isnull=True) | models.Q(height__isnull=True) |
+                    models.Q(weight__isnull=True) | models.Q(caesarean__isnull=True) |
+                    models.Q(children__isnull=True)
+            )),
+        ]
 
     def __str__(self):
         # if self is None must return '' because if add new document from inline without '' the error raise
         return self.name if self.name else ''
 
 
+class MotherAssignment(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='mother_assignments')
+    mother = models.ForeignKey(Mother, on_delete=models.CASCADE, related_name='assignments')
+    assigned_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'mother'], name='unique_mother_assignment'),
+        ]
+        indexes = [
+            models.Index(fields=['mother', 'user'], name='mother_assignment_mother_user'),
+        ]
+
+    def __str__(self):
+        return f'{self.mother} assigned to {self.user}'
+
+
 class Questionnaire(Mother):
     class Meta:
         proxy = True
@@ -0,0 +1,178 @@
+"""
+Changelist pagination for the large Mother tables.
+
+`KeysetPaginationMixin` is mixed into a ModelAdmin to page its changelist by `(created, id)` cursors
+instead of OFFSET, so a deep page costs the same as the first one. Counts above
+`estimated_count_threshold` are read from the planner statistics instead of a full `COUNT(*)`.
+"""
+import json
+from datetime import datetime
+
+from django.contrib.admin.views.main import ChangeList, ORDER_VAR, PAGE_VAR
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+CURSOR_VAR = 'cursor'
+NEXT, PREVIOUS = 'next', 'previous'
+
+
+def estimate_count(queryset: QuerySet):
+    """
+    Number of rows the PostgreSQL planner expects the queryset to return, None on other databases.
+    """
+    if connections[queryset.db].vendor != 'postgresql':
+        return None
+    plan = queryset.order_by().explain(format='json')
+    return int(json.loads(plan)[0]['Plan']['Plan Rows'])
+
+
+def count_rows(queryset: QuerySet, estimate_threshold=None) -> tuple[int, bool]:
+    """
+    Number of rows of the queryset and whether it is estimated, the estimate is used when it is above
+    the threshold and the exact count otherwise.
+    """
+    if estimate_threshold is not None:
+        estimate = estimate_count(queryset)
+        if estimate is not None and estimate >= estimate_threshold:
+            return estimate, True
+    return queryset.count(), False
+
+
+class EstimatedCountPaginator(Paginator):
+    def __init__(self, *args, estimate_threshold=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.estimate_threshold = estimate_threshold
+        self.is_estimate = False
+
+    @cached_property
+    def count(self):
+        count, self.is_estimate = count_rows(self.object_list, self.estimate_threshold)
+        return count
+
+
+def encode_cursor(direction: str, mother) -> str:
+    return f'{direction}_{mother.pk}_{mother.created.isoformat()}'
+
+
+def decode_cursor(value: str):
+    """
+    Direction, primary key and creation time of a cursor, None when the cursor is malformed.
+    """
+    try:
+        direction, pk, created = value.split('_', 2)
+        if direction not in (NEXT, PREVIOUS):
+            return None
+        return direction, int(pk), datetime.fromisoformat(created)
+    except (AttributeError, ValueError):
+        return None
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Changelist which pages by `(created, id)` cursors while the default ordering is used and falls back to
+    page numbers when the user sorts by a column or shows all rows.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.keyset_page = False
+        self.next_cursor = self.previous_cursor = None
+        self.result_count_is_estimate = self.full_result_count_is_estimate = False
+        super().__init__(request, *args, **kwargs)
+        # Filter, search and sorting links start from the first page
+        self.params.pop(CURSOR_VAR, None)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_results(self, request):
+        if ORDER_VAR in request.GET or self.show_all:
+            super().get_results(request)
+            self.result_count_is_estimate = getattr(self.paginator, 'is_estimate', False)
+            return
+
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        result_count = paginator.count
+
+        full_result_count, full_result_count_is_estimate = None, False
+        if self.model_admin.show_full_result_count:
+            if self.query or self.get_filters_params():
+                full_result_count, full_result_count_is_estimate = count_rows(
+                    self.root_queryset, self.model_admin.estimated_count_threshold
+                )
+            else:
+                # Neither a filter nor a search narrows the changelist, its own count is the full count
+                full_result_count, full_result_count_is_estimate = result_count, paginator.is_estimate
+
+        result_list = self.get_keyset_page(decode_cursor(request.GET.get(CURSOR_VAR, '')))
+
+        self.keyset_page = True
+        self.result_count = result_count
+        self.result_count_is_estimate = paginator.is_estimate
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        self.show_admin_actions = not self.show_full_result_count or bool(full_result_count)
+        self.full_result_count = full_result_count
+        self.full_result_count_is_estimate = full_result_count_is_estimate
+        self.result_list = result_list
+        self.can_show_all = False
+        self.multi_page = bool(self.next_cursor or self.previous_cursor)
+        self.paginator = paginator
+
+    def get_keyset_page(self, cursor) -> list:
+        """
+        Rows of the page next to or before the cursor, the first page without a cursor.
+        """
+        queryset = self.queryset.order_by('-created', '-pk')
+        direction = None
+        if cursor is not None:
+            direction, pk, created = cursor
+            if direction == NEXT:
+                queryset = queryset.filter(Q(created__lt=created) | Q(created=created, pk__lt=pk))
+            else:
+                queryset = queryset.filter(Q(created__gt=created) | Q(created=created, pk__gt=pk))
+                queryset = queryset.order_by('created', 'pk')
+
+        # One more row tells whether there is a page further in the same direction
+        rows = list(queryset[:self.list_per_page + 1])
+        has_more = len(rows) > self.list_per_page
+        rows = rows[:self.list_per_page]
+        if direction == PREVIOUS:
+            rows.reverse()
+
+        has_next = has_more if direction != PREVIOUS else True
+        has_previous = has_more if direction == PREVIOUS else direction == NEXT
+        if rows:
+            self.next_cursor = encode_cursor(NEXT, rows[-1]) if has_next else None
+            self.previous_cursor = encode_cursor(PREVIOUS, rows[0]) if has_previous else None
+        return rows
+
+    @property
+    def next_page_url(self):
+        if self.next_cursor:
+            return self.get_query_string({CURSOR_VAR: self.next_cursor}, [PAGE_VAR])
+
+    @property
+    def previous_page_url(self):
+        if self.previous_cursor:
+            return self.get_query_string({CURSOR_VAR: self.previous_cursor}, [PAGE_VAR])
+
+
+class KeysetPaginationMixin:
+    """
+    Opt-in keyset pagination and estimated counts for a ModelAdmin of Mother or one of its proxies.
+
+    `estimated_count_threshold` set to None always counts exactly, `show_full_result_count` set to False
+    skips the count of the unfiltered changelist.
+    """
+    estimated_count_threshold = 10000
+    show_full_result_count = True
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        return EstimatedCountPaginator(queryset, per_page, orphans, allow_empty_first_page,
+                                       estimate_threshold=self.estimated_count_threshold)
@@ -0,0 +1,99 @@
+import math
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import F, FloatField, QuerySet
+from django.db.models.functions import Cast, NullIf
+
+NUMBER_PATTERN = re.compile(r'\d+(?:[.,]\d+)?')
+
+# (lookup value, label, lower bound inclusive, upper bound exclusive)
+BMI_CLASSES = [
+    ('underweight', 'Underweight (less than 18.5) - Low', None, 18.5),
+    ('normal', 'Normal weight (18.5-24.9) - Normal', 18.5, 25),
+    ('overweight', 'Overweight (pre-obesity) (25.0-29.9) - Increased', 25, 30),
+    ('obesity_1', 'Obesity Class I (30.0-34.9) - High', 30, 35),
+    ('obesity_2', 'Obesity Class II (35.0-39.9) - Very High', 35, 40),
+    ('obesity_3', 'Obesity Class III (40.0 and above) - Extremely High', 40, None),
+]
+
+
+def parse_number(value):
+    """
+    First number written in a free text application field, '65,5 kg' gives 65.5.
+    """
+    if value is None:
+        return None
+    match = NUMBER_PATTERN.search(str(value))
+    if match is None:
+        return None
+    try:
+        return Decimal(match.group().replace(',', '.'))
+    except InvalidOperation:
+        return None
+
+
+def parse_height_cm(value):
+    """
+    Height in centimeters, heights written in meters such as '1.70' are converted.
+    """
+    height = parse_number(value)
+    if not height:
+        return None
+    if height < 3:
+        height *= 100
+    height = int(height.to_integral_value())
+    return height if 50 <= height <= 250 else None
+
+
+def parse_weight_kg(value):
+    weight = parse_number(value)
+    if not weight:
+        return None
+    weight = weight.quantize(Decimal('0.1'))
+    return weight if 20 <= weight <= 300 else None
+
+
+def bmi_expression():
+    """
+    Body mass index computed by the database from the numeric height and weight, NULL when one is missing.
+    """
+    height = Cast(NullIf(F('height_cm'), 0), FloatField())
+    return Cast(F('weight_kg'), FloatField()) * 10000.0 / (height * height)
+
+
+def annotate_bmi(queryset: QuerySet) -> QuerySet:
+    if 'bmi' in queryset.query.annotations:
+        return queryset
+    return queryset.annotate(bmi=bmi_expression())
+
+
+def calculate_bmi(weight_kg, height_cm):
+    if not weight_kg or not height_cm:
+        return None
+    return float(weight_kg) * 10000.0 / (height_cm * height_cm)
+
+
+def truncate_bmi(bmi: float) -> float:
+    """
+    BMI shown with one decimal, which is cut and not rounded like in the questionnaires.
+    """
+    return math.floor(round(bmi * 10, 6)) / 10
+
+
+def classify_bmi(bmi: float) -> str:
+    for _, label, lower, upper in BMI_CLASSES:
+        if (lower is None or bmi >= lower) and (upper is None or bmi < upper):
+            return label
+
+
+def filter_by_bmi_class(queryset: QuerySet, value: str) -> QuerySet:
+    for lookup, _, lower, upper in BMI_CLASSES:
+        if lookup == value:
+            queryset = annotate_bmi(queryset)
+            if lower is not None:
+                queryset = queryset.filter(bmi__gte=lower)
+            if upper is not None:
+                queryset = queryset.filter(bmi__lt=upper)
+            return queryset
+    return queryset
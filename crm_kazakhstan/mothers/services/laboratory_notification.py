@@ -0,0 +1,115 @@
+"""
+Idempotent laboratory posts in the Telegram group.
+
+A post is identified by the laboratory and the fingerprint of its content, the hashes of the passport
+photo, the caption and the keyboard. Sending content that is already posted or being posted does
+nothing, a changed caption or keyboard edits the posted message in place, and only a new photo or a
+post which can not be edited any more is replaced by a new message.
+"""
+import hashlib
+import logging
+from typing import NamedTuple
+
+from aiogram.enums.parse_mode import ParseMode
+from aiogram.exceptions import TelegramBadRequest
+from django.core.cache import cache
+
+from mothers.management.commands.record_to_the_file import delete_laboratory_group_message
+from mothers.models.mother import LaboratoryMessage
+from mothers.services.telegram_files import calculate_content_hash, send_cached_file
+
+logger = logging.getLogger(__name__)
+
+# Seconds a notification is considered in flight, a crashed task frees its content after this time
+IN_FLIGHT_TIMEOUT = 120
+
+SKIPPED, COALESCED, EDITED, POSTED = 'skipped', 'coalesced', 'edited', 'posted'
+
+
+def short_hash(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()[:16]
+
+
+class NotificationFingerprint(NamedTuple):
+    photo: str
+    caption: str
+    markup: str
+
+    @property
+    def key(self) -> str:
+        return ':'.join(self)
+
+    @classmethod
+    def from_key(cls, key):
+        parts = (key or '').split(':')
+        return cls(*parts) if len(parts) == len(cls._fields) else None
+
+
+def fingerprint_notification(photo_key: str, caption: str, keyboard) -> NotificationFingerprint:
+    return NotificationFingerprint(short_hash(photo_key), short_hash(caption),
+                                   short_hash(keyboard.model_dump_json() if keyboard else ''))
+
+
+async def edit_posted_message(bot, posted, fingerprint, previous, caption, keyboard) -> bool:
+    """
+    Edits the caption or only the keyboard of the posted message, False when Telegram refuses the edit.
+    """
+    try:
+        if fingerprint.caption != previous.caption:
+            await bot.edit_message_caption(chat_id=posted.chat_id, message_id=posted.message_id, caption=caption,
+                                           reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
+        else:
+            await bot.edit_message_reply_markup(chat_id=posted.chat_id, message_id=posted.message_id,
+                                                reply_markup=keyboard)
+    except TelegramBadRequest as error:
+        if 'message is not modified' in str(error):
+            return True
+        logger.info('Laboratory post %s can not be edited, posting it again: %s', posted.message_id, error)
+        return False
+    return True
+
+
+async def post_laboratory_notification(bot, laboratory_id, chat_id, caption, keyboard, passport_file) -> str:
+    """
+    Posts the laboratory with the passport photo to the chat unless the same content is posted already,
+    returns what was done.
+    """
+    photo_hash = await calculate_content_hash(passport_file.path)
+    fingerprint = fingerprint_notification(f'{passport_file.name}:{photo_hash}', caption, keyboard)
+
+    posted = await LaboratoryMessage.objects.filter(
+        laboratory_id=laboratory_id, chat_id=chat_id, is_posted=True
+    ).order_by('-id').afirst()
+    if posted is not None and posted.fingerprint == fingerprint.key:
+        return SKIPPED
+
+    # A double submit or a retried task sending the same content while it is being posted
+    in_flight_key = f'laboratory_notification:{laboratory_id}:{chat_id}:{fingerprint.key}'
+    if not await cache.aadd(in_flight_key, True, IN_FLIGHT_TIMEOUT):
+        return COALESCED
+
+    try:
+        previous = NotificationFingerprint.from_key(posted.fingerprint) if posted is not None else None
+        if previous is not None and previous.photo == fingerprint.photo:
+            if await edit_posted_message(bot, posted, fingerprint, previous, caption, keyboard):
+                posted.fingerprint = fingerprint.key
+                await posted.asave(update_fields=['fingerprint'])
+                return EDITED
+
+        await delete_laboratory_group_message(laboratory_id, chat_id, bot, is_posted=True)
+
+        sent_message = await send_cached_file(
+            bot.send_photo, 'photo', passport_file,
+            content_hash=photo_hash,
+            filename=passport_file.name.split('/')[-1],
+            chat_id=chat_id,
+            caption=caption,
+            reply_markup=keyboard,
+            parse_mode=ParseMode.MARKDOWN
+        )
+        await LaboratoryMessage.objects.acreate(laboratory_id=laboratory_id, chat_id=chat_id,
+                                                message_id=sent_message.message_id, is_posted=True,
+                                                fingerprint=fingerprint.key)
+        return POSTED
+    finally:
+        await cache.adelete(in_flight_key)
@@ -0,0 +1,67 @@
+from datetime import datetime
+
+import pytz
+
+
+def get_user_timezone(user):
+    """
+    Timezone object of the user, UTC when the user has none.
+    """
+    return pytz.timezone(str(getattr(user, 'timezone', None) or 'UTC'))
+
+
+class LocalTimeFormatter:
+    """
+    Converts UTC datetimes to one timezone and formats them.
+
+    The timezone is resolved once and every converted datetime and formatted string is kept,
+    so a changelist showing the same dates in several columns or rows converts each of them once.
+    """
+
+    def __init__(self, timezone, user=None):
+        self.timezone = timezone
+        self.user = user
+        self._local = {}
+        self._formatted = {}
+
+    @classmethod
+    def for_user(cls, user) -> 'LocalTimeFormatter':
+        return cls(get_user_timezone(user), user)
+
+    def localize(self, utc_datetime: datetime) -> datetime:
+        local_datetime = self._local.get(utc_datetime)
+        if local_datetime is None:
+            # Naive datetimes are stored in UTC
+            if utc_datetime.tzinfo is None:
+                aware_datetime = pytz.utc.localize(utc_datetime)
+            else:
+                aware_datetime = utc_datetime.astimezone(pytz.utc)
+            local_datetime = self._local[utc_datetime] = aware_datetime.astimezone(self.timezone)
+        return local_datetime
+
+    def format(self, utc_datetime: datetime, date_format: str) -> str:
+        key = utc_datetime, date_format
+        formatted = self._formatted.get(key)
+        if formatted is None:
+            formatted = self._formatted[key] = self.localize(utc_datetime).strftime(date_format)
+        return formatted
+
+    def localize_many(self, utc_datetimes) -> list:
+        return [self.localize(utc_datetime) for utc_datetime in utc_datetimes]
+
+    def format_many(self, utc_datetimes, date_format: str) -> list:
+        """
+        Formats a whole page of datetimes at once, repeated values are converted once.
+        """
+        return [self.format(utc_datetime, date_format) for utc_datetime in utc_datetimes]
+
+
+def get_request_formatter(request) -> LocalTimeFormatter:
+    """
+    Returns the local time formatter of the request user, building it on first use.
+    """
+    formatter = getattr(request, '_local_time_formatter', None)
+    if formatter is None or formatter.user is not request.user:
+        formatter = LocalTimeFormatter.for_user(request.user)
+        request._local_time_formatter = formatter
+    return formatter
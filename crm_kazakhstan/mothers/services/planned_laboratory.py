@@ -1,66 +1,104 @@
-from django.db.models import Q, QuerySet
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import QuerySet, Prefetch, OuterRef, Subquery, Count
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from mothers.admin import MotherAdmin
-from mothers.models import Mother
-from guardian.shortcuts import get_objects_for_user
-from django.contrib import admin
+
+from mothers.models.mother import Laboratory
+from mothers.services.predicates import on_laboratory_stage, has_due_laboratory
+from mothers.services.visibility import get_module_visibility_version, UserVisibility
+
+# Lookups of the open laboratory which time has come for every visit filter choice
+VISIT_LOOKUPS = {
+    'not_visit': {'is_came': False},
+    'visit': {'is_came': True},
+    'new_visit': {'is_came__isnull': True},
+}
+
+VISIT_LABELS = {
+    'not_visit': _('Did not visit'),
+    'visit': _('Already visit'),
+    'new_visit': _('New visit'),
+}
 
 
 def mothers_which_on_laboratory_stage(Mothers_queryset: QuerySet) -> QuerySet:
     """
     Retrieves Mother instances which planned laboratory visit or wait doctor answer.
     """
+    return Mothers_queryset.filter(on_laboratory_stage())
 
-    queryset = Mothers_queryset.filter(
-        Q(laboratories__is_completed=False) |
-        Q(laboratories__doctoranswer__is_completed=False)
-    )
 
-    return queryset
+def get_mothers_by_visit(queryset: QuerySet, value: str) -> QuerySet:
+    """
+    Mothers with an open laboratory which time has come and which visit state matches the filter choice.
+    """
+    return queryset.filter(has_due_laboratory(**VISIT_LOOKUPS[value]))
 
 
-def get_filter_choices_for_laboratories(queryset):
-    choices = []
+def with_current_laboratory(queryset: QuerySet) -> QuerySet:
+    """
+    Mothers carrying the id of their latest laboratory and their open laboratories with the analysis types,
+    so the laboratory columns of a changelist cost the same queries for any page size.
+    """
+    latest_laboratory = Laboratory.objects.filter(mother=OuterRef('pk')).order_by('-id').values('id')[:1]
+    open_laboratories = Laboratory.objects.filter(is_completed=False).order_by('id').prefetch_related('analysis_types')
 
-    # Check if 'not_visit' condition has results
-    not_visit = queryset.filter(
-        Q(laboratories__is_completed=False) &
-        Q(laboratories__is_came=False) &
-        Q(laboratories__scheduled_time__lte=timezone.now())
-    )
-    if not_visit.exists():
-        choices.append({'value': 'not_visit', 'display': _('Did not visit')})
-
-    # Check if 'visit' condition has results
-    already_visit = queryset.filter(
-        Q(laboratories__is_completed=False) &
-        Q(laboratories__is_came=True) &
-        Q(laboratories__scheduled_time__lte=timezone.now())
-    )
-    if already_visit.exists():
-        choices.append({'value': 'visit', 'display': _('Already visit')})
-
-    # Check if 'new_visit' condition has results
-    new_visit = queryset.filter(
-        Q(laboratories__is_completed=False) &
-        Q(laboratories__is_came__exact='') &
-        Q(laboratories__scheduled_time__lte=timezone.now())
+    return queryset.annotate(latest_laboratory_id=Subquery(latest_laboratory)).prefetch_related(
+        Prefetch('laboratories', queryset=open_laboratories, to_attr='open_laboratories')
     )
-    if new_visit.exists():
-        choices.append({'value': 'new_visit', 'display': _('New visit')})
 
-    return choices
+
+def get_current_laboratory(mother) -> Optional[Laboratory]:
+    """
+    The open laboratory of the mother, read from `with_current_laboratory` when the mother was fetched with it.
+    """
+    open_laboratories = getattr(mother, 'open_laboratories', None)
+    if open_laboratories is None:
+        return mother.laboratories.filter(is_completed=False).order_by('id').first()
+    return open_laboratories[0] if open_laboratories else None
+
+
+def count_mothers_by_visit(queryset: QuerySet) -> dict:
+    """
+    Number of mothers for every visit filter choice, counted by one conditional aggregation.
+    """
+    now = timezone.now()
+    return queryset.order_by().aggregate(**{
+        value: Count('pk', filter=has_due_laboratory(now, **lookups)) for value, lookups in VISIT_LOOKUPS.items()
+    })
+
+
+def get_visit_counts(user, queryset: QuerySet) -> dict:
+    """
+    `count_mothers_by_visit` of the user's planned laboratory queryset, shared between the user's requests for
+    a few seconds. Writes of laboratories and the other stage rows move the module visibility version
+    and drop the counts earlier.
+    """
+    cache_key = f'laboratory_visit_counts:{get_module_visibility_version()}:{user.pk}'
+    counts = cache.get(cache_key)
+    if counts is None:
+        counts = count_mothers_by_visit(queryset)
+        cache.set(cache_key, counts, settings.LABORATORY_VISIT_COUNTS_CACHE_TIMEOUT)
+    return counts
+
+
+def get_filter_choices_for_laboratories(counts: dict) -> list:
+    """
+    Visit filter choices which have mothers, with their number.
+    """
+    return [
+        {'value': value, 'display': label, 'count': counts[value]}
+        for value, label in VISIT_LABELS.items() if counts.get(value)
+    ]
 
 
 def get_users_objs(user, queryset):
     """
     Get all mothers instance that belong to specific user.
     """
-    mother_admin = MotherAdmin(Mother, admin.site)
-    mother_model_name = mother_admin.opts.model_name
-    custom_permission_name = f'{mother_model_name}_{user.username}'.lower()
-
-    users_objs = get_objects_for_user(user, perms=custom_permission_name, klass=queryset)
+    users_objs = queryset.filter(pk__in=UserVisibility(user).assigned_mothers.values('pk'))
     users_objs = mothers_which_on_laboratory_stage(users_objs)
     return users_objs
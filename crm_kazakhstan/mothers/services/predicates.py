@@ -0,0 +1,68 @@
+"""
+Composable stage predicates.
+
+Every predicate is a boolean expression over Mother which can be passed to `filter()`/`exclude()`
+and combined with `&`, `|` and `~`. Related rows are checked with EXISTS subqueries, so the
+mothers are never multiplied by their events or laboratories and no DISTINCT is needed.
+"""
+from django.db.models import Exists, OuterRef, Q, F
+from django.utils import timezone
+
+from mothers.models import ScheduledEvent
+from mothers.models.mother import Laboratory, DoctorAnswer
+
+APPLICATION_FIELDS = 'age', 'residence', 'height', 'weight', 'caesarean', 'children'
+
+
+def application_complete() -> Q:
+    return Q(**{f'{field}__isnull': False for field in APPLICATION_FIELDS})
+
+
+def application_incomplete() -> Q:
+    condition = Q()
+    for field in APPLICATION_FIELDS:
+        condition |= Q(**{f'{field}__isnull': True})
+    return condition
+
+
+def has_open_event(**lookups) -> Exists:
+    return Exists(ScheduledEvent.objects.filter(mother=OuterRef('pk'), is_completed=False, **lookups))
+
+
+def has_open_laboratory(**lookups) -> Exists:
+    return Exists(Laboratory.objects.filter(mother=OuterRef('pk'), is_completed=False, **lookups))
+
+
+def has_open_doctor_answer() -> Exists:
+    return Exists(DoctorAnswer.objects.filter(laboratory__mother=OuterRef('pk'), is_completed=False))
+
+
+def has_recent_open_event() -> Exists:
+    """
+    Open event planned for a time not later than when it was created.
+    """
+    return has_open_event(scheduled_time__lte=F('created'))
+
+
+def has_due_event(now=None) -> Exists:
+    return has_open_event(scheduled_time__lte=now or timezone.now())
+
+
+def has_due_laboratory(now=None, **lookups) -> Exists:
+    return has_open_laboratory(scheduled_time__lte=now or timezone.now(), **lookups)
+
+
+def on_application_stage() -> Q:
+    return application_incomplete()
+
+
+def on_questionnaire_stage() -> Q:
+    return application_complete() & ~has_open_event() & ~has_open_laboratory() & ~has_open_doctor_answer()
+
+
+def on_short_plan_stage() -> Q:
+    return application_complete() & has_recent_open_event()
+
+
+def on_laboratory_stage() -> Q:
+    return Q(has_open_laboratory()) | Q(has_open_doctor_answer())
@@ -0,0 +1,183 @@
+"""
+Retention policies for mothers which are not worth keeping.
+
+A `RetentionPolicy` declares which mothers expire: a predicate over Mother, the weekdays on which they
+were created, how many days they are kept and the timezone those days are counted in. The matching
+mothers are selected by the database and deleted in chunks, each chunk in its own short transaction,
+so neither the whole table nor long cascading locks are held. Files of the deleted documents and
+laboratory files are removed from the storage and the cached module visibility is dropped once their
+chunk is committed.
+"""
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable
+
+import pytz
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.db.models.functions import ExtractIsoWeekDay
+from django.utils import timezone
+
+from documents.models import MainDocument, AdditionalDocument
+from mothers.models import Mother
+from mothers.models.mother import LaboratoryFile, TelegramFile
+from mothers.services.predicates import on_application_stage
+from mothers.services.visibility import invalidate_module_visibility
+from mothers.signals import suppress_module_visibility_drops
+
+logger = logging.getLogger(__name__)
+
+MONDAY, TUESDAY, WEDNESDAY, THURSDAY, FRIDAY, SATURDAY, SUNDAY = range(7)
+
+# Models with files of a mother, the lookup from the model to the mother and the file fields
+MEDIA_MODELS = [
+    (MainDocument, 'mother', ('file',)),
+    (AdditionalDocument, 'mother', ('file',)),
+    (LaboratoryFile, 'laboratory__mother', ('file', 'video')),
+]
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """
+    Mothers matching `predicate` which were created on one of `weekdays` (Monday is 0) in `timezone`
+    before today, `keep_days` keeps them that many whole days longer.
+    """
+    name: str
+    predicate: Callable[[], Q]
+    weekdays: frozenset
+    keep_days: int = 0
+    timezone: str = 'UTC'
+
+    def cutoff(self, now=None) -> datetime:
+        """
+        Local midnight from which the mothers are kept.
+        """
+        tz = pytz.timezone(self.timezone)
+        today = (now or timezone.now()).astimezone(tz).date() - timedelta(days=self.keep_days)
+        return tz.localize(datetime.combine(today, datetime.min.time()))
+
+    def condition(self) -> Q:
+        return self.predicate() & Q(retention_weekday__in=[weekday + 1 for weekday in self.weekdays])
+
+    def queryset(self, now=None) -> QuerySet:
+        """
+        Expired mothers of the policy, the weekday of creation is extracted by the database.
+        """
+        weekday = ExtractIsoWeekDay('created', tzinfo=pytz.timezone(self.timezone))
+        return Mother.objects.filter(created__lt=self.cutoff(now)).alias(
+            retention_weekday=weekday
+        ).filter(self.condition())
+
+
+@dataclass
+class RetentionReport:
+    policy: str
+    dry_run: bool
+    matched: int = 0
+    chunks: int = 0
+    deleted: dict = field(default_factory=dict)
+    files: int = 0
+    seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'policy': self.policy,
+            'dry_run': self.dry_run,
+            'matched': self.matched,
+            'chunks': self.chunks,
+            'deleted': self.deleted,
+            'files': self.files,
+            'seconds': round(self.seconds, 3),
+        }
+
+
+def get_media_files(mother_ids) -> list:
+    """
+    Storage and name of every stored file of the mothers.
+    """
+    files = []
+    for model, mother_lookup, field_names in MEDIA_MODELS:
+        rows = model.objects.filter(**{f'{mother_lookup}__in': mother_ids}).values_list(*field_names)
+        for names in rows:
+            for field_name, name in zip(field_names, names):
+                if name:
+                    files.append((model._meta.get_field(field_name).storage, name))
+    return files
+
+
+def delete_media_files(files) -> int:
+    """
+    Removes the files from their storage together with their Telegram file_ids.
+    """
+    TelegramFile.objects.filter(path__in=[name for _, name in files]).delete()
+    deleted = 0
+    for storage, name in files:
+        try:
+            if storage.exists(name):
+                storage.delete(name)
+                deleted += 1
+        except OSError:
+            logger.exception('Could not delete the retention file %s', name)
+    return deleted
+
+
+def apply_retention_policy(policy: RetentionPolicy, dry_run=False, chunk_size=500, now=None) -> RetentionReport:
+    """
+    Deletes the expired mothers of the policy `chunk_size` at a time, or only counts them and their files
+    with `dry_run`. Every run is logged with its metrics.
+    """
+    started = time.perf_counter()
+    report = RetentionReport(policy=policy.name, dry_run=dry_run)
+    expired = policy.queryset(now).order_by('pk').values_list('pk', flat=True)
+
+    last_pk = 0
+    while True:
+        mother_ids = list(expired.filter(pk__gt=last_pk)[:chunk_size])
+        if not mother_ids:
+            break
+        last_pk = mother_ids[-1]
+        report.chunks += 1
+
+        if dry_run:
+            report.matched += len(mother_ids)
+            report.files += len(get_media_files(mother_ids))
+            continue
+
+        with transaction.atomic():
+            # The policy is checked again, a mother may have been completed since the chunk was selected
+            mother_ids = list(policy.queryset(now).filter(pk__in=mother_ids).select_for_update()
+                              .values_list('pk', flat=True))
+            files = get_media_files(mother_ids)
+            # The cascade would drop the cached module visibility once for every deleted row
+            with suppress_module_visibility_drops():
+                _, deleted = Mother.objects.filter(pk__in=mother_ids).delete()
+        invalidate_module_visibility()
+
+        report.matched += len(mother_ids)
+        for label, count in deleted.items():
+            report.deleted[label] = report.deleted.get(label, 0) + count
+        # Files are removed only after their rows are gone for good
+        report.files += delete_media_files(files)
+
+    report.seconds = time.perf_counter() - started
+    logger.info('Retention policy %s: %s', policy.name, report.as_dict())
+    return report
+
+
+INCOMPLETE_WEEKDAY_APPLICATIONS = RetentionPolicy(
+    name='incomplete_weekday_applications',
+    predicate=on_application_stage,
+    weekdays=frozenset({MONDAY, TUESDAY, WEDNESDAY, THURSDAY, FRIDAY}),
+)
+
+INCOMPLETE_WEEKEND_APPLICATIONS = RetentionPolicy(
+    name='incomplete_weekend_applications',
+    predicate=on_application_stage,
+    weekdays=frozenset({SATURDAY, SUNDAY}),
+)
+
+RETENTION_POLICIES = {policy.name: policy for policy in (INCOMPLETE_WEEKDAY_APPLICATIONS,
+                                                         INCOMPLETE_WEEKEND_APPLICATIONS)}
@@ -1,5 +1,8 @@
-from django.db.models import Q, F, QuerySet
-from django.utils import timezone
+from django.db.models import QuerySet, Subquery, OuterRef, Count, Value, IntegerField
+from django.db.models.functions import Coalesce
+
+from mothers.models import ScheduledEvent
+from mothers.services.predicates import on_short_plan_stage, has_due_event
 
 
 def get_mothers_with_recent_incomplete_events(mothers_queryset: QuerySet) -> QuerySet:
@@ -7,29 +10,31 @@ def get_mothers_with_recent_incomplete_events(mothers_queryset: QuerySet) -> Que
     Retrieves Mother instances that have incomplete ScheduledEvent instances
     with a scheduled time equal to or later than the creation time of the event.
     """
-    # Define conditions for non-null fields
-    non_null_conditions = Q(
-        age__isnull=False,
-        residence__isnull=False,
-        height__isnull=False,
-        weight__isnull=False,
-        caesarean__isnull=False,
-        children__isnull=False
-    )
-
-    # Define conditions for incomplete events with valid scheduling
-    recent_incomplete_events = Q(
-        scheduled_event__scheduled_time__lte=F('scheduled_event__created'),
-        scheduled_event__is_completed=False
-    )
-
-    # Apply filters to the queryset
-    return mothers_queryset.filter(non_null_conditions, recent_incomplete_events).distinct()
+    return mothers_queryset.filter(on_short_plan_stage())
 
 
 def get_mother_that_event_time_has_come(qs: QuerySet) -> QuerySet:
     """
     Get queryset when time of scheduled event has come
     """
-    return qs.filter(Q(scheduled_event__is_completed=False) & Q(
-        scheduled_event__scheduled_time__lte=timezone.now()))
+    if 'event_is_due' in qs.query.annotations:
+        return qs.filter(event_is_due=True)
+    return qs.filter(has_due_event())
+
+
+def annotate_events(queryset: QuerySet) -> QuerySet:
+    """
+    Annotates the note and scheduled time of the open event, the number of events and whether the open event
+    is due, each by a subquery so the changelist columns read them without a query per row.
+    """
+    open_event = ScheduledEvent.objects.filter(mother=OuterRef('pk'), is_completed=False).order_by('id')
+    events_count = ScheduledEvent.objects.filter(mother=OuterRef('pk')).order_by().values('mother').annotate(
+        amount=Count('pk')
+    ).values('amount')
+
+    return queryset.annotate(
+        open_event_note=Subquery(open_event.values('note')[:1]),
+        open_event_scheduled_time=Subquery(open_event.values('scheduled_time')[:1]),
+        events_count=Coalesce(Subquery(events_count, output_field=IntegerField()), Value(0)),
+        event_is_due=has_due_event(),
+    )
@@ -0,0 +1,76 @@
+from collections import defaultdict
+
+from django.db.models import QuerySet, Case, When, Value, CharField, Q
+from django.utils import timezone
+
+from mothers.models import Mother
+from mothers.services.predicates import on_application_stage, on_questionnaire_stage, on_short_plan_stage, \
+    on_laboratory_stage
+
+APPLICATION = Mother.StageChoices.APPLICATION
+QUESTIONNAIRE = Mother.StageChoices.QUESTIONNAIRE
+SHORT_PLAN = Mother.StageChoices.SHORT_PLAN
+LABORATORY = Mother.StageChoices.LABORATORY
+
+STAGE_PREDICATES = {
+    APPLICATION: on_application_stage,
+    QUESTIONNAIRE: on_questionnaire_stage,
+    SHORT_PLAN: on_short_plan_stage,
+    LABORATORY: on_laboratory_stage,
+}
+
+# A mother matching several predicates is stored on the latest stage of the workflow
+STAGE_PRECEDENCE = APPLICATION, QUESTIONNAIRE, SHORT_PLAN, LABORATORY
+
+# Stages whose predicate overlaps a later one: an incomplete application or a short plan with an open
+# laboratory is stored on the laboratory stage and still listed by the earlier admin
+OVERLAPPING_STAGES = {
+    APPLICATION: LABORATORY,
+    SHORT_PLAN: LABORATORY,
+}
+
+
+def stage_expression() -> Case:
+    """
+    Stage of the mother computed from her related rows, NULL when no stage predicate matches.
+    """
+    return Case(
+        *[When(STAGE_PREDICATES[stage](), then=Value(stage)) for stage in reversed(STAGE_PRECEDENCE)],
+        default=None,
+        output_field=CharField(),
+    )
+
+
+def stage_condition(stage: str) -> Q:
+    """
+    Mothers listed on the stage: the ones stored on it and the ones stored on an overlapping later stage
+    which still match its predicate.
+    """
+    condition = Q(stage=stage)
+    later_stage = OVERLAPPING_STAGES.get(stage)
+    if later_stage is not None:
+        condition |= Q(stage=later_stage) & STAGE_PREDICATES[stage]()
+    return condition
+
+
+def refresh_stages(mothers_queryset: QuerySet) -> dict:
+    """
+    Stores the computed stage on the given mothers and returns {pk: stage} of the ones which moved.
+
+    Stages are computed in one query and written with one UPDATE per target stage, so no save
+    signals are sent.
+    """
+    rows = mothers_queryset.order_by().annotate(computed_stage=stage_expression())
+    changed = {
+        pk: computed_stage for pk, stage, computed_stage in rows.values_list('pk', 'stage', 'computed_stage')
+        if stage != computed_stage
+    }
+
+    moved = defaultdict(list)
+    for pk, stage in changed.items():
+        moved[stage].append(pk)
+
+    now = timezone.now()
+    for stage, pks in moved.items():
+        Mother.objects.filter(pk__in=pks).update(stage=stage, stage_changed_at=now)
+    return changed
@@ -0,0 +1,313 @@
+"""
+Flow control of every request a bot sends to the Telegram API.
+
+`TelegramDispatcher` is installed as a request middleware of the bot session, so handlers, helpers and
+tasks keep calling `bot.send_photo`, `message.answer` and the others while each request first waits for
+a token of the global bucket and, for messages, of the bucket of its chat. Waiting requests are served
+by priority lane, interactive answers and edits first and cleanup deletes last. A 429 answer pauses the
+chat, or the whole bot, for its `retry_after` and the request is sent again.
+
+The buckets order and smooth the requests of one process. Every Celery worker process and the polling
+process have their own, so the limits of the Bot API are enforced across all of them by `SharedWindow`
+counters in the Django cache, which a request passes after its local buckets. The counters are shared
+only when the cache is, with the default per-process cache each process keeps the limits by itself.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+from aiogram import methods
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramRetryAfter
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE, NOTIFICATION, CLEANUP = range(3)
+LANES = {INTERACTIVE: 'interactive', NOTIFICATION: 'notification', CLEANUP: 'cleanup'}
+
+METHOD_LANES = {
+    methods.AnswerCallbackQuery: INTERACTIVE,
+    methods.EditMessageReplyMarkup: INTERACTIVE,
+    methods.EditMessageText: INTERACTIVE,
+    methods.EditMessageCaption: INTERACTIVE,
+    methods.SendMessage: INTERACTIVE,
+    methods.DeleteMessage: CLEANUP,
+    methods.DeleteMessages: CLEANUP,
+}
+
+# Telegram limits the messages sent to one chat, edits, answers and deletes only count globally
+CHAT_LIMITED_METHODS = (
+    methods.SendMessage, methods.SendPhoto, methods.SendDocument, methods.SendVideo, methods.SendMediaGroup,
+)
+
+# Long polling waits on the server and is never throttled
+UNTHROTTLED_METHODS = (methods.GetUpdates,)
+
+# A request waiting longer than this is logged with the state of the queue
+SLOW_WAIT_SECONDS = 1.0
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+        self.paused_until = 0.0
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """
+        Seconds until a token can be taken, 0 when one is available.
+        """
+        self.refill(now)
+        paused = max(0.0, self.paused_until - now)
+        return max(paused, (1 - self.tokens) / self.rate if self.tokens < 1 else 0.0)
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, self.clock() + seconds)
+
+
+class SharedWindow:
+    """
+    At most `limit` requests in every `period` seconds of the wall clock, counted in the cache shared by
+    the processes of the bot.
+    """
+
+    def __init__(self, key: str, limit: int, period: float, clock=time.time):
+        self.key = key
+        self.limit = limit
+        self.period = period
+        self.clock = clock
+
+    async def delay(self) -> float:
+        """
+        Counts the request in the current window and returns 0, or the seconds until the window which
+        may take it when the current one is full or the scope is paused.
+        """
+        now = self.clock()
+        paused_until = await cache.aget(f'{self.key}:paused', 0)
+        if paused_until > now:
+            return paused_until - now
+
+        window = int(now // self.period)
+        window_key = f'{self.key}:{window}'
+        # Kept for two periods, a window is read only while it is current
+        await cache.aadd(window_key, 0, int(self.period * 2) + 1)
+        try:
+            count = await cache.aincr(window_key)
+        except ValueError:
+            # The window expired in between, the request is counted in the next one
+            return (window + 1) * self.period - now
+        if count <= self.limit:
+            return 0.0
+        return (window + 1) * self.period - now
+
+    async def pause(self, seconds: float) -> None:
+        if seconds > 0:
+            await cache.aset(f'{self.key}:paused', self.clock() + seconds, int(seconds) + 1)
+
+
+@dataclass
+class LaneMetrics:
+    sent: int = 0
+    retried: int = 0
+    waited: float = 0.0
+    max_wait: float = 0.0
+    shared_waited: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'sent': self.sent,
+            'retried': self.retried,
+            'average_wait': round(self.waited / self.sent, 3) if self.sent else 0.0,
+            'max_wait': round(self.max_wait, 3),
+            'average_shared_wait': round(self.shared_waited / self.sent, 3) if self.sent else 0.0,
+        }
+
+
+@dataclass
+class DispatcherMetrics:
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    lanes: dict = field(default_factory=lambda: {lane: LaneMetrics() for lane in LANES})
+
+    def as_dict(self) -> dict:
+        return {
+            'queue_depth': self.queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+            **{LANES[lane]: metrics.as_dict() for lane, metrics in self.lanes.items()},
+        }
+
+
+class TelegramDispatcher(BaseRequestMiddleware):
+    """
+    Token buckets, priority lanes and 429 retries for the requests of one bot.
+
+    The defaults follow the limits of the Bot API: about 30 messages a second overall, one a second to
+    a private chat and 20 a minute to a group.
+    """
+
+    def __init__(self, global_rate=30, chat_rate=1, group_rate=20 / 60, max_retries=3, clock=time.monotonic,
+                 name='bot'):
+        self.global_bucket = TokenBucket(global_rate, global_rate, clock)
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+        self.clock = clock
+        self.chat_buckets = {}
+        self.key = f'telegram_dispatcher:{name}'
+        self.global_window = SharedWindow(f'{self.key}:global', global_rate, 1)
+        self.chat_windows = {}
+        self.metrics = DispatcherMetrics()
+        self._waiters = []
+        self._sequence = 0
+        self._loop = None
+        self._wakeup = None
+        self._pump = None
+
+    async def __call__(self, make_request, bot, method):
+        if isinstance(method, UNTHROTTLED_METHODS):
+            return await make_request(bot, method)
+
+        lane = METHOD_LANES.get(type(method), NOTIFICATION)
+        chat_id = getattr(method, 'chat_id', None) if isinstance(method, CHAT_LIMITED_METHODS) else None
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(lane, chat_id)
+            await self.acquire_shared(lane, chat_id)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as error:
+                if attempt == self.max_retries:
+                    raise
+                self.metrics.lanes[lane].retried += 1
+                logger.warning('Telegram asked to retry %s after %s seconds', type(method).__name__,
+                               error.retry_after)
+                if chat_id is not None:
+                    self.chat_bucket(chat_id).pause(error.retry_after)
+                    await self.chat_window(chat_id).pause(error.retry_after)
+                else:
+                    self.global_bucket.pause(error.retry_after)
+                    await self.global_window.pause(error.retry_after)
+
+    def chat_bucket(self, chat_id) -> TokenBucket:
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            # Groups and channels have negative ids
+            rate = self.group_rate if str(chat_id).startswith('-') else self.chat_rate
+            bucket = self.chat_buckets[chat_id] = TokenBucket(rate, 1, self.clock)
+        return bucket
+
+    def chat_window(self, chat_id) -> SharedWindow:
+        window = self.chat_windows.get(chat_id)
+        if window is None:
+            if str(chat_id).startswith('-'):
+                window = SharedWindow(f'{self.key}:chat:{chat_id}', max(1, round(self.group_rate * 60)), 60)
+            else:
+                window = SharedWindow(f'{self.key}:chat:{chat_id}', max(1, round(self.chat_rate)), 1)
+            self.chat_windows[chat_id] = window
+        return window
+
+    async def acquire_shared(self, lane: int, chat_id=None) -> None:
+        """
+        Waits until the windows shared with the other processes of the bot take the request.
+        """
+        windows = [self.chat_window(chat_id)] if chat_id is not None else []
+        windows.append(self.global_window)
+        started = self.clock()
+        for window in windows:
+            while delay := await window.delay():
+                await asyncio.sleep(delay)
+
+        waited = self.clock() - started
+        self.metrics.lanes[lane].shared_waited += waited
+        if waited > SLOW_WAIT_SECONDS:
+            logger.info('Telegram %s request waited %.1f seconds for the other processes', LANES[lane], waited)
+
+    async def acquire(self, lane: int, chat_id=None) -> None:
+        """
+        Waits until the request may be sent, requests of a lower lane number are let through first.
+        """
+        self._bind_loop()
+        started = self.clock()
+        future = self._loop.create_future()
+        self._sequence += 1
+        self._waiters.append((lane, self._sequence, chat_id, future))
+        self.metrics.queue_depth = len(self._waiters)
+        self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, self.metrics.queue_depth)
+        self._wakeup.set()
+        if self._pump is None or self._pump.done():
+            self._pump = self._loop.create_task(self._serve())
+
+        await future
+
+        waited = self.clock() - started
+        metrics = self.metrics.lanes[lane]
+        metrics.sent += 1
+        metrics.waited += waited
+        metrics.max_wait = max(metrics.max_wait, waited)
+        if waited > SLOW_WAIT_SECONDS:
+            logger.info('Telegram %s request waited %.1f seconds: %s', LANES[lane], waited, self.metrics.as_dict())
+
+    def _bind_loop(self) -> None:
+        # The state belongs to the loop it was created on, a new loop starts with an empty queue
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._wakeup, self._pump, self._waiters = loop, asyncio.Event(), None, []
+
+    async def _serve(self) -> None:
+        while self._waiters:
+            self._wakeup.clear()
+            delay = self._grant(self.clock())
+            self.metrics.queue_depth = len(self._waiters)
+            if delay is None:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _grant(self, now: float):
+        """
+        Lets the first waiting request whose buckets have a token through and returns None, otherwise
+        returns the seconds until the next token.
+        """
+        delay = None
+        for waiter in sorted(self._waiters, key=lambda waiter: waiter[:2]):
+            lane, _, chat_id, future = waiter
+            if future.done():
+                # The request was cancelled while waiting
+                self._waiters.remove(waiter)
+                return None
+
+            wait = self.global_bucket.delay(now)
+            if chat_id is not None:
+                wait = max(wait, self.chat_bucket(chat_id).delay(now))
+            if wait == 0:
+                self.global_bucket.take()
+                if chat_id is not None:
+                    self.chat_bucket(chat_id).take()
+                self._waiters.remove(waiter)
+                future.set_result(None)
+                return None
+            delay = wait if delay is None else min(delay, wait)
+        return delay
+
+
+def install_dispatcher(bot, **options) -> TelegramDispatcher:
+    """
+    Sends every request of the bot through a new dispatcher, the shared windows are kept per bot.
+    """
+    options.setdefault('name', bot.id)
+    dispatcher = TelegramDispatcher(**options)
+    bot.session.middleware(dispatcher)
+    return dispatcher
@@ -0,0 +1,82 @@
+"""
+Sending stored files to Telegram by their file_id.
+
+The first send of a file uploads it, the file_id Telegram returns is kept in `TelegramFile` under the
+storage name and the hash of the content, and every later send of the same content only references
+that id. A changed file gets a new hash and is uploaded again, an id Telegram does not accept any more
+is dropped and the file is uploaded again too.
+"""
+import hashlib
+import logging
+
+import aiofiles
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import FSInputFile
+
+from mothers.models.mother import TelegramFile
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Parts of the Bad Request answers which mean Telegram does not accept the file_id any more
+STALE_FILE_ID_ERRORS = (
+    'wrong file identifier', 'wrong remote file identifier', 'file reference expired', 'file_reference_expired',
+    'file_id_invalid', 'wrong padding in the string',
+)
+
+
+def is_stale_file_id_error(error: TelegramBadRequest) -> bool:
+    message = error.message.lower()
+    return any(part in message for part in STALE_FILE_ID_ERRORS)
+
+
+async def calculate_content_hash(path) -> str:
+    """
+    SHA-256 of the file, read in chunks so large videos are never held in memory.
+    """
+    sha256_hash = hashlib.sha256()
+    async with aiofiles.open(path, 'rb') as file:
+        while chunk := await file.read(CHUNK_SIZE):
+            sha256_hash.update(chunk)
+    return sha256_hash.hexdigest()
+
+
+def get_sent_file_id(message, field: str):
+    sent = getattr(message, field, None)
+    if isinstance(sent, list):
+        # Photos are returned in every size, the largest one is the sent photo
+        sent = sent[-1] if sent else None
+    return getattr(sent, 'file_id', None)
+
+
+async def send_cached_file(send, field: str, stored_file, content_hash=None, filename=None, **kwargs):
+    """
+    Sends a FieldFile through a bot method such as `bot.send_photo` with the file as its `field` argument.
+
+    `content_hash` saves reading the file when the hash is already known, like the one of a LaboratoryFile.
+    """
+    path = stored_file.name
+    content_hash = content_hash or await calculate_content_hash(stored_file.path)
+
+    cached = await TelegramFile.objects.filter(path=path, content_hash=content_hash).afirst()
+    if cached is not None:
+        try:
+            return await send(**{field: cached.file_id}, **kwargs)
+        except TelegramBadRequest as error:
+            # Another bad request, such as a wrong chat or caption, would fail the upload the same way
+            if not is_stale_file_id_error(error):
+                raise
+            logger.info('Telegram file_id of %s is stale, uploading it again: %s', path, error)
+            await cached.adelete()
+
+    # The upload is streamed from the disk by aiogram
+    message = await send(**{field: FSInputFile(stored_file.path, filename=filename)}, **kwargs)
+
+    file_id = get_sent_file_id(message, field)
+    if file_id:
+        # Ids of the earlier contents of the path are never sent again
+        await TelegramFile.objects.filter(path=path).exclude(content_hash=content_hash).adelete()
+        await TelegramFile.objects.aupdate_or_create(path=path, content_hash=content_hash,
+                                                     defaults={'file_id': file_id})
+    return message
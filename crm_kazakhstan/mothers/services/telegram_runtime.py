@@ -0,0 +1,120 @@
+"""
+Asyncio runtime shared by the Telegram tasks of a Celery worker process.
+
+The runtime keeps one event loop running in a background thread and one Bot whose aiohttp session
+pools its connections to the Telegram API. Tasks submit their coroutines with `run` and wait for the
+result, so neither a loop nor a cold HTTPS connection is set up for every task. The Celery signals in
+`mothers.tasks` start the runtime when a worker process starts and close the session and the loop
+when it stops.
+
+The ORM calls of the coroutines run through `sync_to_async` on a thread of asgiref which outlives the
+tasks, so its database connections are checked before and after every task as Django does around a
+request, and a connection past CONN_MAX_AGE or broken by a database restart is closed.
+"""
+import asyncio
+import logging
+import os
+import threading
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from asgiref.sync import sync_to_async
+from decouple import config
+from django.db import close_old_connections
+
+from mothers.services.telegram_dispatcher import install_dispatcher
+
+logger = logging.getLogger(__name__)
+
+
+def create_bot() -> Bot:
+    bot = Bot(token=config('TELEGRAM_BOT_TOKEN_FOR_UZB'), session=AiohttpSession())
+    install_dispatcher(bot)
+    return bot
+
+
+class TelegramRuntime:
+    def __init__(self, bot_factory=create_bot):
+        self.bot_factory = bot_factory
+        self._lock = threading.Lock()
+        self._pid = None
+        self._loop = None
+        self._thread = None
+        self._bot = None
+
+    @property
+    def is_running(self) -> bool:
+        # A forked worker process inherits the attributes but not the thread of its parent
+        return self._pid == os.getpid() and self._thread is not None and self._thread.is_alive()
+
+    @property
+    def bot(self) -> Bot:
+        self.start()
+        return self._bot
+
+    def start(self) -> None:
+        with self._lock:
+            if self.is_running:
+                return
+            bot = self.bot_factory()
+            loop = asyncio.new_event_loop()
+            started = threading.Event()
+            thread = threading.Thread(target=self._run_loop, args=(loop, started), name='telegram-runtime',
+                                      daemon=True)
+            thread.start()
+            started.wait()
+            self._pid, self._loop, self._thread, self._bot = os.getpid(), loop, thread, bot
+            logger.info('Telegram runtime started in process %s', self._pid)
+
+    @staticmethod
+    def _run_loop(loop, started):
+        asyncio.set_event_loop(loop)
+        loop.call_soon(started.set)
+        loop.run_forever()
+
+    def run(self, coroutine, timeout=None):
+        """
+        Runs the coroutine on the runtime loop and returns its result, exceptions are raised in the caller.
+        """
+        self.start()
+        return asyncio.run_coroutine_threadsafe(self._run_task(coroutine), self._loop).result(timeout)
+
+    @staticmethod
+    async def _run_task(coroutine):
+        await sync_to_async(close_old_connections)()
+        try:
+            return await coroutine
+        finally:
+            await sync_to_async(close_old_connections)()
+
+    def stop(self, timeout=10) -> None:
+        """
+        Closes the bot session, cancels what is still running on the loop and stops its thread.
+        """
+        with self._lock:
+            if not self.is_running:
+                return
+            loop, thread, bot = self._loop, self._thread, self._bot
+            self._pid = self._loop = self._thread = self._bot = None
+
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(bot), loop).result(timeout)
+        except Exception:
+            logger.exception('Telegram runtime did not shut down cleanly')
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
+        logger.info('Telegram runtime stopped')
+
+    @staticmethod
+    async def _shutdown(bot):
+        current = asyncio.current_task()
+        pending = [task for task in asyncio.all_tasks() if task is not current]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        await bot.session.close()
+
+
+telegram_runtime = TelegramRuntime()
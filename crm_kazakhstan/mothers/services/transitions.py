@@ -0,0 +1,52 @@
+from django.db import transaction
+from django.db.models import Min
+
+from mothers.models import ScheduledEvent
+from mothers.models.mother import Laboratory
+
+
+def parse_mother_ids(data) -> list:
+    """
+    Primary keys posted by the changelist checkboxes as {"mother_ids": [...]}, ValueError when the body has
+    another shape or an id is not a number.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('The body must be an object')
+    mother_ids = data.get('mother_ids', [])
+    if not isinstance(mother_ids, list):
+        raise ValueError('mother_ids must be a list')
+    try:
+        return [int(mother_id) for mother_id in mother_ids]
+    except TypeError:
+        raise ValueError('mother_ids must be numbers')
+
+
+def complete_open_rows(model, mother_ids, **lookups) -> int:
+    """
+    Completes the first open row of each given mother with one UPDATE and returns how many changed,
+    later open rows of a mother stay open.
+
+    The UPDATE sends no save signals, so `rows_completed` is sent once for the whole batch inside the same
+    transaction to refresh the stages and drop the caches.
+    """
+    from mothers.signals import rows_completed
+
+    with transaction.atomic():
+        first_open = model.objects.filter(mother_id__in=mother_ids, is_completed=False, **lookups).order_by().values(
+            'mother_id'
+        ).annotate(first_pk=Min('pk')).values('first_pk')
+        completed = model.objects.filter(pk__in=first_open).update(is_completed=True)
+        if completed:
+            rows_completed.send(sender=model, mother_ids=mother_ids)
+    return completed
+
+
+def complete_scheduled_events(mother_ids) -> int:
+    return complete_open_rows(ScheduledEvent, mother_ids)
+
+
+def complete_missed_laboratories(mother_ids) -> int:
+    """
+    Completes the open laboratories the mothers did not come to.
+    """
+    return complete_open_rows(Laboratory, mother_ids, is_came=False)
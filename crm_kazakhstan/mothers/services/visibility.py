@@ -0,0 +1,157 @@
+import time
+from functools import cached_property
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count, Q, QuerySet
+from django.utils.translation import gettext_lazy as _
+
+from mothers.models import Mother
+from mothers.services.stage import stage_condition
+
+APPLICATION = Mother.StageChoices.APPLICATION
+QUESTIONNAIRE = Mother.StageChoices.QUESTIONNAIRE
+SHORT_PLAN = Mother.StageChoices.SHORT_PLAN
+LABORATORY = Mother.StageChoices.LABORATORY
+
+User = get_user_model()
+
+MODULE_VISIBILITY_VERSION_KEY = 'module_visibility:version'
+
+
+class UserVisibility:
+    """
+    Everything the stage admins need to know about which mothers a user can see.
+
+    Each value is resolved on first use and then kept for the lifetime of the object, so
+    permission lookups and stage querysets are built once instead of in every admin hook
+    and per-row display method.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._stage_querysets = {}
+        self._users_stage_querysets = {}
+        self._assigned = {}
+
+    @cached_property
+    def permission_codenames(self) -> frozenset:
+        return frozenset(self.user.user_permissions.order_by().values_list('codename', flat=True))
+
+    def is_view_only(self, view_codename: str) -> bool:
+        """
+        True when the user has `view_codename` and every model permission the user owns is a 'view' one.
+        """
+        codenames = self.permission_codenames
+        return view_codename in codenames and all(codename.startswith('view') for codename in codenames)
+
+    @cached_property
+    def assigned_mothers(self) -> QuerySet:
+        """
+        Mothers assigned to the user when they were created, superusers are assigned to all of them.
+        """
+        if not self.user.is_authenticated:
+            return Mother.objects.none()
+        if self.user.is_superuser:
+            return Mother.objects.all()
+        return Mother.objects.assigned_to(self.user)
+
+    @cached_property
+    def has_assigned_mothers(self) -> bool:
+        # An assigned mother found by is_assigned already answers it
+        return any(self._assigned.values()) or self.assigned_mothers.exists()
+
+    def is_assigned(self, mother_id) -> bool:
+        """
+        Whether the mother is assigned to the user, checked once per mother with an indexed lookup.
+        """
+        if mother_id not in self._assigned:
+            # No lookup when the user is already known to have no assigned mother
+            if 'has_assigned_mothers' in self.__dict__ and not self.has_assigned_mothers:
+                return False
+            self._assigned[mother_id] = self.assigned_mothers.filter(pk=mother_id).exists()
+        return self._assigned[mother_id]
+
+    def stage_queryset(self, stage: str) -> QuerySet:
+        """
+        All mothers which are on the given stage.
+        """
+        if stage not in self._stage_querysets:
+            self._stage_querysets[stage] = Mother.objects.filter(stage_condition(stage))
+        return self._stage_querysets[stage].all()
+
+    def users_stage_queryset(self, stage: str) -> QuerySet:
+        """
+        Mothers assigned to the user which are on the given stage.
+        """
+        if stage not in self._users_stage_querysets:
+            self._users_stage_querysets[stage] = self.assigned_mothers.filter(stage_condition(stage))
+        return self._users_stage_querysets[stage].all()
+
+    @cached_property
+    def _flags_cache_key(self) -> str:
+        return f'module_visibility:{get_module_visibility_version()}:{self.user.pk}'
+
+    @cached_property
+    def _flags(self) -> dict:
+        return cache.get(self._flags_cache_key) or {}
+
+    def cached_flag(self, key: str, compute) -> bool:
+        """
+        Boolean shared between requests of the same user through the cache framework.
+
+        `compute` is only called when the flag is missing, the flags are dropped by
+        `invalidate_module_visibility` whenever mothers, their events or permissions change.
+        """
+        if key not in self._flags:
+            self._flags[key] = bool(compute())
+            cache.set(self._flags_cache_key, self._flags, settings.MODULE_VISIBILITY_CACHE_TIMEOUT)
+        return self._flags[key]
+
+    def stage_exists(self, stage: str, users_only: bool = False) -> bool:
+        queryset = self.users_stage_queryset(stage) if users_only else self.stage_queryset(stage)
+        return self.cached_flag(f'{stage}:{users_only:d}', queryset.exists)
+
+
+def get_module_visibility_version() -> int:
+    version = cache.get(MODULE_VISIBILITY_VERSION_KEY)
+    if version is None:
+        cache.add(MODULE_VISIBILITY_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(MODULE_VISIBILITY_VERSION_KEY)
+    return version
+
+
+def invalidate_module_visibility() -> None:
+    """
+    Drops the cached module visibility of every user by moving to a new cache version.
+    """
+    cache.set(MODULE_VISIBILITY_VERSION_KEY, time.time_ns(), None)
+
+
+def get_request_visibility(request) -> UserVisibility:
+    """
+    Returns the visibility context of the request user, building it on first use.
+    """
+    visibility = getattr(request, '_mother_visibility', None)
+    if visibility is None or visibility.user is not request.user:
+        visibility = UserVisibility(request.user)
+        request._mother_visibility = visibility
+    return visibility
+
+
+def get_managers_with_mothers(mothers_queryset: QuerySet) -> QuerySet:
+    """
+    Users with a country which are assigned to at least one mother of the queryset.
+
+    Every user is annotated with `mothers_count`, so the whole list is a single grouped query
+    instead of one stage query per user.
+    """
+    return User.objects.exclude(Q(country__isnull=True) | Q(country='')).filter(
+        mother_assignments__mother__in=mothers_queryset.values('pk')
+    ).annotate(mothers_count=Count('mother_assignments')).order_by('pk')
+
+
+def get_manager_display(user) -> str:
+    return _('%(country)s %(username)s (%(count)s)') % {
+        'country': user.get_country_display(), 'username': user.username, 'count': user.mothers_count,
+    }
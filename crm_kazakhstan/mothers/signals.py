@@ -0,0 +1,103 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver, Signal
+from guardian.models import UserObjectPermission
+
+from mothers.models import Mother, ScheduledEvent, MotherAssignment
+from mothers.models.mother import Laboratory, DoctorAnswer
+from mothers.services.stage import refresh_stages
+from mothers.services.visibility import invalidate_module_visibility
+
+User = get_user_model()
+
+# Rows which decide on which stage a mother is
+STAGE_MODELS = Mother, ScheduledEvent, Laboratory, DoctorAnswer
+
+# Rows which decide on which stage a mother is or who may see her
+VISIBILITY_MODELS = STAGE_MODELS + (MotherAssignment, UserObjectPermission)
+
+# Sent once after a bulk UPDATE completed rows of several mothers, with the mother_ids argument
+rows_completed = Signal()
+
+# Set while a bulk deletion drops the cached module visibility once by itself
+visibility_drops_suppressed = ContextVar('visibility_drops_suppressed', default=False)
+
+
+def with_proxies(concrete_models) -> list:
+    """
+    Stage admins save through proxy models and signals are sent with the proxy as sender.
+    """
+    return [model for model in apps.get_models() if model._meta.concrete_model in concrete_models]
+
+
+def is_mother_deletion(origin) -> bool:
+    if isinstance(origin, QuerySet):
+        return origin.model._meta.concrete_model is Mother
+    return isinstance(origin, Mother)
+
+
+def get_stage_mother_id(instance):
+    if isinstance(instance, Mother):
+        return instance.pk
+    if isinstance(instance, DoctorAnswer):
+        return Laboratory.objects.filter(pk=instance.laboratory_id).values_list('mother_id', flat=True).first()
+    return instance.mother_id
+
+
+def refresh_stage_on_write(sender, instance, raw=False, **kwargs):
+    # Related rows removed together with their mother need no stage
+    if raw or is_mother_deletion(kwargs.get('origin')):
+        return
+
+    mother_id = get_stage_mother_id(instance)
+    changed = refresh_stages(Mother.objects.filter(pk=mother_id))
+    if isinstance(instance, Mother) and instance.pk in changed:
+        instance.stage = changed[instance.pk]
+
+
+@contextmanager
+def suppress_module_visibility_drops():
+    """
+    Rows written or deleted inside the block leave the cached module visibility alone, the caller
+    invalidates it once afterwards.
+    """
+    token = visibility_drops_suppressed.set(True)
+    try:
+        yield
+    finally:
+        visibility_drops_suppressed.reset(token)
+
+
+def drop_module_visibility_on_write(sender, **kwargs):
+    if not visibility_drops_suppressed.get():
+        invalidate_module_visibility()
+
+
+@receiver(rows_completed)
+def refresh_stages_on_bulk_completion(sender, mother_ids, **kwargs):
+    refresh_stages(Mother.objects.filter(pk__in=mother_ids))
+    invalidate_module_visibility()
+
+
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def drop_module_visibility_on_permission_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_module_visibility()
+
+
+def connect_signals():
+    for model in with_proxies(STAGE_MODELS):
+        post_save.connect(refresh_stage_on_write, sender=model)
+        post_delete.connect(refresh_stage_on_write, sender=model)
+
+    for model in with_proxies(VISIBILITY_MODELS):
+        post_save.connect(drop_module_visibility_on_write, sender=model)
+        post_delete.connect(drop_module_visibility_on_write, sender=model)
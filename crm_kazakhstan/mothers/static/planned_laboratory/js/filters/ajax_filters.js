@@ -20,12 +20,14 @@ document.addEventListener("DOMContentLoaded", function () {
         return fetch(url).then(response => response.json());
     }
 
-      function fetchFilteredData(params) {
-        console.log(params)
-        return fetch(`/admin/mothers/plannedlaboratory/?${params}`)
-            .then(response => response.text())  // Fetch the HTML content as text
-            .then(html => {
-                updatePageContent(html); // Update the page content with the fetched data
+    function fetchFilteredData(params) {
+        // Only the result rows and the pagination are rendered by the server for the new filter state
+        return fetch(`/admin/mothers/plannedlaboratory/get_filtered_rows/?${params}`)
+            .then(response => response.json())
+            .then(data => {
+                if (data.status === 'success') {
+                    updatePageContent(data);
+                }
             });
     }
 
@@ -49,8 +51,9 @@ document.addEventListener("DOMContentLoaded", function () {
                     const itemsToDisplay = config.correctOrder.length > 0 ? config.correctOrder : data.choices.map(choice => choice.value);
                     // Step 4: Loop through the correctOrder and create list items
                     itemsToDisplay.forEach(value => {
-                        let displayText = (data.choices.find(choice => choice.value === value) || {}).display;
-                        if (displayText) {
+                        const choice = data.choices.find(choice => choice.value === value);
+                        if (choice) {
+                            const displayText = choiceText(choice);
                             const li = document.createElement('li')
                             const a = document.createElement('a')
                             a.href = `?${config.paramName}=${value}`
@@ -112,13 +115,33 @@ document.addEventListener("DOMContentLoaded", function () {
 
     } // #UpdateFilterList end
 
+    // Visit choices carry the number of their mothers, which is shown next to the label
+    function choiceText(choice) {
+        return choice.count === undefined ? choice.display : `${choice.display} (${choice.count})`;
+    }
+
     // Function to update the page content dynamically
-    function updatePageContent(html) {
-        const parser = new DOMParser();
-        const doc = parser.parseFromString(html, 'text/html');
-        const newContent = doc.querySelector("#changelist-form")
-        const currentContent = document.querySelector("#changelist-form")
-        currentContent.innerHTML = newContent.innerHTML
+    function updatePageContent(data) {
+        // The update button is bound once on page load, so a filter state which adds or removes it reloads the page
+        const hasUpdateButton = Boolean(document.querySelector('#update-checked'));
+        if (hasUpdateButton !== data.show_update_button) {
+            window.location.reload();
+            return;
+        }
+
+        const doc = new DOMParser().parseFromString(data.rows, 'text/html');
+        const currentForm = document.querySelector("#changelist-form");
+        ['.results', '.paginator'].forEach(selector => {
+            const newContent = doc.querySelector(selector);
+            const currentContent = currentForm.querySelector(selector);
+            if (newContent && currentContent) {
+                currentContent.replaceWith(newContent);
+            } else if (currentContent) {
+                currentContent.remove();
+            } else if (newContent) {
+                currentForm.appendChild(newContent);
+            }
+        });
     }
 
     // Function to update the URL with all selected filters
@@ -197,11 +220,14 @@ document.addEventListener("DOMContentLoaded", function () {
                     UpdateFilterList(data, config);
                 } else {
                     const filterSection = filterHeading.nextElementSibling;
-                    const currentOptions = Array.from(filterSection.querySelectorAll("li a")).map(a => a.href);
-                    const newOptions = data.choices.map(choice => `?${config.paramName}=${choice.value}`);
-                    const hasNewOptions = newOptions.some(option => !currentOptions.includes(option));
-
-                    if (hasNewOptions) {
+                    const currentOptions = Array.from(filterSection.querySelectorAll("li a"))
+                        .map(a => `${a.getAttribute('href')} ${a.textContent}`);
+                    const newOptions = data.choices
+                        .map(choice => `?${config.paramName}=${choice.value} ${choiceText(choice)}`);
+                    const hasChangedOptions = newOptions.length !== currentOptions.length ||
+                        newOptions.some(option => !currentOptions.includes(option));
+
+                    if (hasChangedOptions) {
                         UpdateFilterList(data, config);
                     }
                 }
@@ -1,19 +1,17 @@
-import asyncio
 import logging
-import aiofiles
 from celery import shared_task
-from django.utils import timezone
-from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, BufferedInputFile
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from documents.models import MainDocument
-from mothers.management.commands.handlers import bot
 from .management.commands.another_functions import construct_message, construct_analysis_types_list
-from .management.commands.record_to_the_file import delete_laboratory_group_message, save_new_message_for_laboratory
-from .models import Mother
-from django.db.models import Q
+from .management.commands.record_to_the_file import delete_laboratory_group_message
+from .services.retention import apply_retention_policy, INCOMPLETE_WEEKDAY_APPLICATIONS, \
+    INCOMPLETE_WEEKEND_APPLICATIONS
+from .services.laboratory_notification import post_laboratory_notification
+from .services.telegram_runtime import telegram_runtime
 from asgiref.sync import sync_to_async
 from .models.mother import Laboratory, AnalysisType
 from django.contrib.auth import get_user_model
-from aiogram.enums.parse_mode import ParseMode
 
 User = get_user_model()
 
@@ -21,58 +19,34 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-@shared_task
-def delete_weekday_objects():
-    # Exclude instances where any of the specified fields are null
-    has_null_fields = Mother.objects.filter(
-        Q(age__isnull=True) | Q(residence__isnull=True) | Q(height__isnull=True) | Q(weight__isnull=True) |
-        Q(caesarean__isnull=True) | Q(children__isnull=True)
-    )
-
-    # Get the current date and time
-    date_now = timezone.now()
-
-    mothers_to_delete_ids = []
-    for mother in has_null_fields:
-        if mother.created.weekday() in [0, 1, 2, 3, 4] and mother.created.date() < date_now.date():
-            mothers_to_delete_ids.append(mother.id)
+@worker_process_init.connect
+def start_telegram_runtime(**kwargs):
+    telegram_runtime.start()
 
-    # Delete the mothers
-    deleted, _ = Mother.objects.filter(id__in=mothers_to_delete_ids).delete()
 
-    return deleted
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def stop_telegram_runtime(**kwargs):
+    telegram_runtime.stop()
 
 
 @shared_task
-def delete_weekend_objects():
-    # Exclude instances where any of the specified fields are null
-    has_null_fields = Mother.objects.filter(
-        Q(age__isnull=True) | Q(residence__isnull=True) | Q(height__isnull=True) | Q(weight__isnull=True) |
-        Q(caesarean__isnull=True) | Q(children__isnull=True)
-    )
+def delete_weekday_objects(dry_run=False):
+    # Incomplete applications created from Monday to Friday
+    return apply_retention_policy(INCOMPLETE_WEEKDAY_APPLICATIONS, dry_run=dry_run).as_dict()
 
-    # Get the current date and time
-    date_now = timezone.now()
 
-    mothers_to_delete_ids = []
-    for mother in has_null_fields:
-        if mother.created.weekday() in [5, 6] and mother.created.date() < date_now.date():
-            mothers_to_delete_ids.append(mother.id)
-
-    # Delete the mothers
-    deleted, _ = Mother.objects.filter(id__in=mothers_to_delete_ids).delete()
-
-    return deleted
+@shared_task
+def delete_weekend_objects(dry_run=False):
+    # Incomplete applications created on Saturday and Sunday
+    return apply_retention_policy(INCOMPLETE_WEEKEND_APPLICATIONS, dry_run=dry_run).as_dict()
 
 
 @shared_task
 def send_telegram_message(group_id, laboratory_id, analysis_type_ids, user_id):
     laboratory_obj = Laboratory.objects.get(id=laboratory_id)
 
-    async def async_send_message():
-
-        await delete_laboratory_group_message(laboratory_id, group_id, bot, is_posted=True)
-
+    async def async_send_message(bot):
         # Define the buttons
         two_buttons = [
             [
@@ -92,44 +66,24 @@ def send_telegram_message(group_id, laboratory_id, analysis_type_ids, user_id):
             title=MainDocument.MainDocumentChoice.PASSPORT
         ).first())()
 
-        if passport_document:
-            passport_file_path = passport_document.file.path
-            file_name = passport_document.file.name.split('/')[-1]
-
-            # Open the image file and read its contents asynchronously
-            async with aiofiles.open(passport_file_path, 'rb') as file:
-                file_data = await file.read()
-
-            input_file = BufferedInputFile(file_data, filename=file_name)
-
-            # Fetch analysis types asynchronously
-            analysis_type_objs_list = await sync_to_async(
-                lambda: list(AnalysisType.objects.filter(id__in=analysis_type_ids))
-            )()
-
-            # Asynchronously construct the analysis types list
-            analysis_types_list = await construct_analysis_types_list(analysis_type_objs_list)
+        if not passport_document:
+            # Without a passport the laboratory is not posted and an earlier post is taken down
+            await delete_laboratory_group_message(laboratory_id, group_id, bot, is_posted=True)
+            return None
 
-            # Asynchronously construct the message
-            message = await construct_message(laboratory_obj, analysis_types_list, user_id)
+        # Fetch analysis types asynchronously
+        analysis_type_objs_list = await sync_to_async(
+            lambda: list(AnalysisType.objects.filter(id__in=analysis_type_ids))
+        )()
 
-            # Send the photo along with the constructed message and keyboard
-            sent_message = await bot.send_photo(
-                chat_id=group_id,
-                photo=input_file,
-                caption=message,
-                reply_markup=keyboard,
-                parse_mode=ParseMode.MARKDOWN
-            )
+        # Asynchronously construct the analysis types list
+        analysis_types_list = await construct_analysis_types_list(analysis_type_objs_list)
 
-            # Update the file with the new message ID
-            await save_new_message_for_laboratory(laboratory_id, group_id, sent_message.message_id, is_posted=True)
+        # Asynchronously construct the message
+        message = await construct_message(laboratory_obj, analysis_types_list, user_id)
 
-    # Use existing or create new event loop
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        # Posts the photo, edits the posted one or does nothing when the same content is posted already
+        return await post_laboratory_notification(bot, laboratory_id, group_id, message, keyboard,
+                                                  passport_document.file)
 
-    loop.run_until_complete(async_send_message())
+    return telegram_runtime.run(async_send_message(telegram_runtime.bot))
@@ -7,7 +7,7 @@ import pytz
 from freezegun import freeze_time
 
 from mothers.admin import MotherAdmin
-from mothers.filters.applications import convert_utc_to_local
+from mothers.services.application import convert_utc_to_local
 from mothers.models import Mother
 
 User = get_user_model()
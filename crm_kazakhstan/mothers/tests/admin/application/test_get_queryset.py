@@ -1,10 +1,8 @@
 from django.test import TestCase, RequestFactory
 from django.contrib.auth import get_user_model
 
-from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth.models import Permission
-from guardian.shortcuts import assign_perm, remove_perm
-from mothers.models import Mother
+from mothers.models import Mother, MotherAssignment
 from mothers.admin import MotherAdmin
 from django.contrib import admin
 
@@ -29,20 +27,10 @@ class GetQuerysetTest(TestCase):
                                              caesarean=1, children=2)
 
     def set_custom_permission(self, user, obj):
-        model_name = obj.__class__.__name__.lower()
-        codename = f'{model_name}_{user.username}'
-        content_type = ContentType.objects.get_for_model(obj)
-        permission, _ = Permission.objects.get_or_create(
-            codename=codename,
-            name=f'Can access {model_name} {user.username}',
-            content_type=content_type,
-        )
-        assign_perm(permission, user, obj)
+        MotherAssignment.objects.get_or_create(user=user, mother=obj)
 
     def remove_custom_permission(self, user, obj):
-        model_name = obj.__class__.__name__.lower()
-        codename = f'{model_name}_{user.username}'
-        remove_perm(codename, user, obj)
+        MotherAssignment.objects.filter(user=user, mother=obj).delete()
 
     def test_get_queryset_with_user1_permissions(self):
         # Set permissions for user1
@@ -1,7 +1,7 @@
 from django.test import TestCase, RequestFactory
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from mothers.models import Mother
+from mothers.models import Mother, MotherAssignment
 from mothers.admin import MotherAdmin
 from freezegun import freeze_time
 from django.contrib import admin
@@ -37,10 +37,8 @@ class MotherAdminTest(TestCase):
         # Check that the 'created' field is set to the current UTC time
         self.assertEqual(mother.created, timezone.now())
 
-        # Check that the user has the correct permission for the object
-        model = mother.__class__.__name__.lower()
-        codename = f'{model}_testuser'
-        self.assertTrue(user.has_perm(codename, mother))
+        # Check that the user is assigned to the object
+        self.assertTrue(MotherAssignment.objects.filter(user=user, mother=mother).exists())
 
     @freeze_time("2024-07-08 12:00:00")
     def test_save_model_with_local_time_kiev(self):
@@ -69,7 +67,5 @@ class MotherAdminTest(TestCase):
         # Check that the 'created' field is set to the current UTC time
         self.assertEqual(mother.created, timezone.now())
 
-        # Check that the user has the correct permission for the object
-        model = mother.__class__.__name__.lower()
-        codename = f'{model}_testuser'
-        self.assertTrue(user.has_perm(codename, mother))
+        # Check that the user is assigned to the object
+        self.assertTrue(MotherAssignment.objects.filter(user=user, mother=mother).exists())
@@ -0,0 +1,123 @@
+from unittest import mock, skipUnless
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from freezegun import freeze_time
+
+from mothers.admin import MotherAdmin
+from mothers.models import Mother
+from mothers.pagination import decode_cursor, encode_cursor
+
+User = get_user_model()
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.superuser = User.objects.create_superuser(username='admin', password='password', timezone='UTC')
+        self.client.force_login(self.superuser)
+        self.url = reverse('admin:mothers_mother_changelist')
+
+        # Two mothers share a creation time, the primary key breaks the tie
+        with freeze_time('2024-07-20 10:00:00'):
+            Mother.objects.create(name='Oldest')
+        with freeze_time('2024-07-21 10:00:00'):
+            Mother.objects.create(name='Second')
+            Mother.objects.create(name='Third')
+        with freeze_time('2024-07-22 10:00:00'):
+            Mother.objects.create(name='Newest')
+
+    def get_changelist(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.context['cl']
+
+    def test_pages_forward_and_back_by_cursor(self):
+        # MotherAdmin shows one mother per page
+        changelist = self.get_changelist(self.url)
+        names = [changelist.result_list[0].name]
+        self.assertIsNone(changelist.previous_page_url)
+
+        while changelist.next_page_url:
+            changelist = self.get_changelist(self.url + changelist.next_page_url)
+            names.append(changelist.result_list[0].name)
+
+        self.assertEqual(names, ['Newest', 'Third', 'Second', 'Oldest'])
+
+        changelist = self.get_changelist(self.url + changelist.previous_page_url)
+        self.assertEqual(changelist.result_list[0].name, 'Second')
+        self.assertIsNotNone(changelist.previous_page_url)
+        self.assertIsNotNone(changelist.next_page_url)
+
+    def test_page_query_has_no_offset(self):
+        changelist = self.get_changelist(self.url)
+        next_url = self.url + changelist.next_page_url + '&p=3'
+
+        with CaptureQueriesContext(connection) as queries:
+            changelist = self.get_changelist(next_url)
+
+        self.assertEqual(changelist.result_list[0].name, 'Third')
+        self.assertFalse(any('OFFSET' in query['sql'] for query in queries.captured_queries))
+
+    def test_unfiltered_changelist_counts_once(self):
+        with mock.patch.object(MotherAdmin, 'estimated_count_threshold', None):
+            with CaptureQueriesContext(connection) as queries:
+                changelist = self.get_changelist(self.url)
+
+        counts = [query['sql'] for query in queries.captured_queries if 'COUNT(' in query['sql']]
+        self.assertEqual(len(counts), 1)
+        self.assertEqual((changelist.result_count, changelist.full_result_count), (4, 4))
+        self.assertFalse(changelist.result_count_is_estimate)
+
+    @skipUnless(connection.vendor == 'postgresql', 'estimated counts are read from PostgreSQL plans')
+    def test_counts_above_threshold_are_estimated(self):
+        with mock.patch.object(MotherAdmin, 'estimated_count_threshold', 0):
+            response = self.client.get(self.url)
+
+        changelist = response.context['cl']
+        self.assertTrue(changelist.result_count_is_estimate)
+        self.assertContains(response, f'~{changelist.result_count} Application')
+
+    def test_full_count_has_its_own_estimate_flag(self):
+        # The planner expects many mothers in the stage and a few matching the search
+        def estimate_count(queryset):
+            return 1 if 'Third' in str(queryset.query) else 50000
+
+        with mock.patch('mothers.pagination.estimate_count', estimate_count):
+            response = self.client.get(self.url + '?q=Third')
+
+        changelist = response.context['cl']
+        self.assertEqual((changelist.result_count, changelist.result_count_is_estimate), (1, False))
+        self.assertEqual((changelist.full_result_count, changelist.full_result_count_is_estimate), (50000, True))
+
+    def test_full_result_count_can_be_disabled(self):
+        with mock.patch.object(MotherAdmin, 'show_full_result_count', False):
+            changelist = self.get_changelist(self.url + '?q=Third')
+
+        self.assertIsNone(changelist.full_result_count)
+        self.assertEqual(changelist.result_count, 1)
+
+    def test_sorting_by_column_uses_page_numbers(self):
+        # Sorted by name, the second page
+        changelist = self.get_changelist(self.url + '?o=0&p=2')
+
+        self.assertFalse(changelist.keyset_page)
+        self.assertEqual(changelist.result_list[0].name, 'Oldest')
+
+    def test_malformed_cursor_shows_first_page(self):
+        changelist = self.get_changelist(self.url + '?cursor=broken')
+
+        self.assertEqual(changelist.result_list[0].name, 'Newest')
+
+
+class CursorTest(TestCase):
+    def test_cursor_round_trip(self):
+        mother = Mother(pk=7, created=timezone.now() - timedelta(days=1))
+
+        self.assertEqual(decode_cursor(encode_cursor('next', mother)), ('next', 7, mother.created))
+        self.assertIsNone(decode_cursor('sideways_7_2024-07-20T10:00:00+00:00'))
+        self.assertIsNone(decode_cursor('next_seven_2024-07-20T10:00:00+00:00'))
@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from mothers.models import Mother
+from mothers.models.mother import Laboratory
+
+User = get_user_model()
+
+FILLED_APPLICATION = dict(age=30, residence='Almaty', height='170', weight='65', caesarean=1, children=2)
+
+
+class GetFilteredRowsTest(TestCase):
+    def setUp(self):
+        self.superuser = User.objects.create_superuser(username='admin', password='password', timezone='UTC')
+        self.client.force_login(self.superuser)
+        self.url = reverse('admin:get_filtered_rows')
+
+        for name, is_came in (('Came', True), ('Missed', False), ('New', None)):
+            mother = Mother.objects.create(name=name, **FILLED_APPLICATION)
+            Laboratory.objects.create(mother=mother, scheduled_time=timezone.now() - timedelta(hours=1),
+                                      is_came=is_came)
+
+    def test_returns_rows_of_filter_state(self):
+        response = self.client.get(self.url, {'time_new_visit': 'not_visit'})
+
+        data = response.json()
+        self.assertEqual(data['result_count'], 1)
+        self.assertTrue(data['show_update_button'])
+        self.assertIn('Missed', data['rows'])
+        self.assertNotIn('Came', data['rows'])
+        self.assertIn('class="paginator"', data['rows'])
+        self.assertNotIn('changelist-filter', data['rows'])
+
+    def test_returns_all_rows_without_filters(self):
+        data = self.client.get(self.url).json()
+
+        self.assertEqual(data['result_count'], 3)
+        self.assertFalse(data['show_update_button'])
+
+    def test_costs_less_than_changelist(self):
+        with CaptureQueriesContext(connection) as page_queries:
+            self.client.get(reverse('admin:mothers_plannedlaboratory_changelist'), {'time_new_visit': 'visit'})
+        with CaptureQueriesContext(connection) as rows_queries:
+            self.client.get(self.url, {'time_new_visit': 'visit'})
+
+        self.assertLess(len(rows_queries), len(page_queries))
+
+    def test_invalid_filters(self):
+        response = self.client.get(self.url, {'unknown_field': '1'})
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth import get_user_model
+from django.test import TestCase, RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+
+from mothers.admin import PlannedLaboratoryAdmin
+from mothers.models import Mother
+from mothers.models.mother import Laboratory, AnalysisType
+
+User = get_user_model()
+
+
+class LaboratoryColumnsTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.admin_instance = PlannedLaboratoryAdmin(Mother, AdminSite())
+        self.superuser = User.objects.create_superuser(username='admin', password='password', timezone='UTC')
+        self.serology = AnalysisType.objects.create(name=AnalysisType.SEROLOGY)
+        self.ultrasound = AnalysisType.objects.create(name=AnalysisType.ULTRASOUND)
+
+        self.mothers = []
+        for i in range(4):
+            mother = Mother.objects.create(name=f'Mother{i}', age=30, residence='Almaty', height='170', weight='65',
+                                           caesarean=1, children=2)
+            Laboratory.objects.create(mother=mother, scheduled_time=timezone.now() - timedelta(days=7),
+                                      is_completed=True)
+            laboratory = Laboratory.objects.create(mother=mother, scheduled_time=timezone.now() + timedelta(days=i))
+            laboratory.analysis_types.add(self.serology, self.ultrasound)
+            self.mothers.append((mother, laboratory))
+
+    def get_rows(self, page_size):
+        request = self.factory.get('/')
+        request.user = self.superuser
+        mothers = list(self.admin_instance.get_queryset(request).order_by('pk')[:page_size])
+
+        columns = []
+        for mother in mothers:
+            columns.append((
+                self.admin_instance.change_laboratory_link(mother),
+                self.admin_instance.custom_scheduled_time(mother),
+                self.admin_instance.custom_analysis_type(mother),
+            ))
+        return columns
+
+    def test_columns_read_current_laboratory(self):
+        mother, laboratory = self.mothers[0]
+
+        link, scheduled_time, analysis_types = self.get_rows(1)[0]
+
+        url = reverse('admin:mothers_laboratory_change', args=(laboratory.pk,))
+        self.assertIn(f'{url}?mother={mother.pk}', link)
+        self.assertEqual(scheduled_time, laboratory.scheduled_time.strftime("%d %B, %A %H:%M"))
+        self.assertIn('Serology', analysis_types)
+        self.assertIn('Ultrasound', analysis_types)
+
+    def test_page_costs_constant_queries(self):
+        # Permissions, mothers, open laboratories and their analysis types, whatever the page size
+        with self.assertNumQueries(4):
+            self.get_rows(1)
+        with self.assertNumQueries(4):
+            self.get_rows(4)
+
+    def test_columns_without_prefetch_fall_back_to_queries(self):
+        mother, laboratory = self.mothers[1]
+        request = self.factory.get('/')
+        request.user = self.superuser
+        self.admin_instance.request = request
+
+        mother = Mother.objects.get(pk=mother.pk)
+        self.assertEqual(self.admin_instance.custom_scheduled_time(mother),
+                         laboratory.scheduled_time.strftime("%d %B, %A %H:%M"))
@@ -0,0 +1,39 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from mothers.models import Mother
+from mothers.models.mother import Laboratory
+
+User = get_user_model()
+
+
+class UpdateIsCompletedTest(TestCase):
+    def setUp(self):
+        self.superuser = User.objects.create_superuser(username='admin', password='password')
+        self.client.force_login(self.superuser)
+        self.url = reverse('admin:update_is_completed')
+        self.mother = Mother.objects.create(name='Mother', age=30, residence='Almaty', height='170', weight='65',
+                                            caesarean=1, children=2)
+        self.laboratory = Laboratory.objects.create(mother=self.mother, scheduled_time=timezone.now(), is_came=False)
+
+    def test_completes_missed_laboratories(self):
+        response = self.client.post(self.url, json.dumps({'mother_ids': [self.mother.pk]}),
+                                    content_type='application/json')
+
+        self.assertEqual(response.json(), {'status': 'success', 'updated': 1})
+        self.laboratory.refresh_from_db()
+        self.assertTrue(self.laboratory.is_completed)
+        self.assertEqual(Mother.objects.get(pk=self.mother.pk).stage, Mother.StageChoices.QUESTIONNAIRE)
+
+    def test_rejects_malformed_bodies(self):
+        for body in ([None], {'mother_ids': [None]}, {'mother_ids': '1'}):
+            with self.subTest(body=body):
+                response = self.client.post(self.url, json.dumps(body), content_type='application/json')
+
+                self.assertEqual(response.status_code, 400)
+        self.laboratory.refresh_from_db()
+        self.assertFalse(self.laboratory.is_completed)
@@ -1,10 +1,8 @@
 from django.test import TestCase, RequestFactory
 from django.contrib.auth import get_user_model
-from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth.models import Permission
-from guardian.shortcuts import assign_perm, remove_perm
 from mothers.admin.questionnaire import QuestionnaireAdmin
-from mothers.models import Mother, ScheduledEvent
+from mothers.models import Mother, ScheduledEvent, MotherAssignment
 from django.contrib import admin
 from django.utils import timezone
 
@@ -47,20 +45,10 @@ class GetQuerysetTest(TestCase):
                                                               is_completed=True)
 
     def set_custom_permission(self, user, obj):
-        model_name = obj.__class__.__name__.lower()
-        codename = f'{model_name}_{user.username}'
-        content_type = ContentType.objects.get_for_model(obj)
-        permission, _ = Permission.objects.get_or_create(
-            codename=codename,
-            name=f'Can access {model_name} {user.username}',
-            content_type=content_type,
-        )
-        assign_perm(permission, user, obj)
+        MotherAssignment.objects.get_or_create(user=user, mother=obj)
 
     def remove_custom_permission(self, user, obj):
-        model_name = obj.__class__.__name__.lower()
-        codename = f'{model_name}_{user.username}'
-        remove_perm(codename, user, obj)
+        MotherAssignment.objects.filter(user=user, mother=obj).delete()
 
     def test_get_queryset_user1_with_custom_perm(self):
         # Set permissions for user1
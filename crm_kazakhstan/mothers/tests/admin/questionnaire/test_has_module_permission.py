@@ -1,11 +1,9 @@
 from django.test import TestCase, RequestFactory
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth.models import Permission
-from guardian.shortcuts import assign_perm, remove_perm
 from mothers.admin.questionnaire import QuestionnaireAdmin
-from mothers.models import Mother, ScheduledEvent
+from mothers.models import Mother, ScheduledEvent, MotherAssignment
 from django.contrib import admin
 
 User = get_user_model()
@@ -19,21 +17,11 @@ class HasModulePermissionTest(TestCase):
 
     @staticmethod
     def set_custom_permission(user, obj):
-        model_name = obj.__class__.__name__.lower()
-        codename = f'{model_name}_{user.username}'
-        content_type = ContentType.objects.get_for_model(obj)
-        permission, _ = Permission.objects.get_or_create(
-            codename=codename,
-            name=f'Can access {model_name} {user.username}',
-            content_type=content_type,
-        )
-        assign_perm(permission, user, obj)
+        MotherAssignment.objects.get_or_create(user=user, mother=obj)
 
     @staticmethod
     def remove_custom_permission(user, obj):
-        model_name = obj.__class__.__name__.lower()
-        codename = f'{model_name}_{user.username}'
-        remove_perm(codename, user, obj)
+        MotherAssignment.objects.filter(user=user, mother=obj).delete()
 
     def test_has_module_permission_with_custom_perm(self):
         self.mother1 = Mother.objects.create(name="Mother1", age=30, residence="New York", height="170", weight="65",
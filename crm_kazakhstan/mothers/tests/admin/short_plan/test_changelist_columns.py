@@ -0,0 +1,89 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth import get_user_model
+from django.test import TestCase, RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+
+from mothers.admin import ShortPlanAdmin
+from mothers.models import Mother, ScheduledEvent
+
+User = get_user_model()
+
+FILLED_APPLICATION = dict(age=30, residence='New York', height='170', weight='65', caesarean=1, children=2)
+
+
+class ChangelistColumnsTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.admin_instance = ShortPlanAdmin(Mother, AdminSite())
+        self.superuser = User.objects.create_superuser(username='admin', password='password', timezone='UTC')
+
+        self.due = Mother.objects.create(name='Due', **FILLED_APPLICATION)
+        ScheduledEvent.objects.create(mother=self.due, note='Done', scheduled_time=timezone.now() - timedelta(days=3),
+                                      is_completed=True)
+        ScheduledEvent.objects.create(mother=self.due, note='Call her', scheduled_time=timezone.now() - timedelta(hours=1))
+
+        self.first_call = Mother.objects.create(name='First call', **FILLED_APPLICATION)
+        ScheduledEvent.objects.create(mother=self.first_call, note='Visit', scheduled_time=timezone.now())
+
+    def get_mothers(self):
+        request = self.factory.get('/')
+        request.user = self.superuser
+        return {mother.name: mother for mother in self.admin_instance.get_queryset(request)}
+
+    def test_open_event_is_annotated(self):
+        mothers = self.get_mothers()
+
+        self.assertEqual(mothers['Due'].open_event_note, 'Call her')
+        self.assertEqual(mothers['Due'].events_count, 2)
+        self.assertTrue(mothers['Due'].event_is_due)
+        self.assertEqual(mothers['First call'].open_event_note, 'Visit')
+        self.assertEqual(mothers['First call'].events_count, 1)
+
+    def test_columns_read_annotations_without_queries(self):
+        mothers = self.get_mothers()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.admin_instance.custom_note(mothers['Due']), 'Call her')
+            self.assertFalse(self.admin_instance.is_new(mothers['Due']))
+            self.assertTrue(self.admin_instance.is_new(mothers['First call']))
+
+    def test_changelist_reuses_its_count(self):
+        self.client.force_login(self.superuser)
+
+        response = self.client.get(reverse('admin:mothers_shortplan_changelist'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['instance_count'], 2)
+        self.assertFalse(response.context['instance_count_is_estimate'])
+
+    def test_changelist_redirects_when_empty(self):
+        for event in ScheduledEvent.objects.filter(is_completed=False):
+            event.is_completed = True
+            event.save()
+        self.client.force_login(self.superuser)
+
+        response = self.client.get(reverse('admin:mothers_shortplan_changelist'))
+
+        self.assertRedirects(response, reverse('admin:index'), fetch_redirect_response=False)
+
+    def test_search_without_results_stays_on_changelist(self):
+        self.client.force_login(self.superuser)
+
+        with mock.patch.object(ShortPlanAdmin, 'show_full_result_count', False):
+            response = self.client.get(reverse('admin:mothers_shortplan_changelist'), {'q': 'Nobody'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['instance_count'], 0)
+
+    def test_estimated_full_count_is_marked(self):
+        self.client.force_login(self.superuser)
+
+        with mock.patch('mothers.pagination.estimate_count', lambda queryset: 50000):
+            response = self.client.get(reverse('admin:mothers_shortplan_changelist'))
+
+        self.assertTrue(response.context['instance_count_is_estimate'])
+        self.assertContains(response, '~50000')
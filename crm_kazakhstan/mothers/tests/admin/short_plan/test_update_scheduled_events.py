@@ -0,0 +1,37 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from mothers.models import Mother, ScheduledEvent
+
+User = get_user_model()
+
+
+class UpdateScheduledEventsTest(TestCase):
+    def setUp(self):
+        self.superuser = User.objects.create_superuser(username='admin', password='password')
+        self.client.force_login(self.superuser)
+        self.url = reverse('admin:update_scheduled_events')
+        self.mother = Mother.objects.create(name='Mother', age=30, residence='Almaty', height='170', weight='65',
+                                            caesarean=1, children=2)
+        self.event = ScheduledEvent.objects.create(mother=self.mother, note='Call', scheduled_time=timezone.now())
+
+    def post(self, data):
+        return self.client.post(self.url, json.dumps(data), content_type='application/json')
+
+    def test_completes_checked_events(self):
+        response = self.post({'mother_ids': [str(self.mother.pk)]})
+
+        self.assertEqual(response.json(), {'status': 'success', 'updated': 1})
+        self.event.refresh_from_db()
+        self.assertTrue(self.event.is_completed)
+
+    def test_rejects_malformed_ids(self):
+        response = self.post({'mother_ids': ['one']})
+
+        self.assertEqual(response.status_code, 400)
+        self.event.refresh_from_db()
+        self.assertFalse(self.event.is_completed)
@@ -45,3 +45,26 @@ class TestDayOfWeekFilter(TestCase):
         filter_ = DayOfWeekFilter(request, {'created_day_of_week': '1'}, Mother, self.mother_admin_instance)
         queryset = filter_.queryset(request, Mother.objects.all())
         self.assertEqual(queryset.count(), 1)
+
+    @freeze_time("2024-07-08 23:00:00")
+    def test_day_of_week_is_filtered_in_one_query(self):
+        Mother.objects.create(name="Mother Monday")
+        request = self.factory.get('/')
+        request.user = self.user_kiev
+        filter_ = DayOfWeekFilter(request, {'created_day_of_week': '0'}, Mother, self.mother_admin_instance)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(list(filter_.queryset(request, Mother.objects.all())), [])
+
+    @freeze_time("2024-07-14 22:30:00")
+    def test_sunday_evening_in_utc_is_monday_in_kiev(self):
+        mother = Mother.objects.create(name="Mother Sunday")
+        request = self.factory.get('/')
+        request.user = self.user_kiev
+
+        filter_ = DayOfWeekFilter(request, {'created_day_of_week': '0'}, Mother, self.mother_admin_instance)
+        self.assertEqual(list(filter_.queryset(request, Mother.objects.all())), [mother])
+
+        request.user = self.user_utc
+        filter_ = DayOfWeekFilter(request, {'created_day_of_week': '6'}, Mother, self.mother_admin_instance)
+        self.assertEqual(list(filter_.queryset(request, Mother.objects.all())), [mother])
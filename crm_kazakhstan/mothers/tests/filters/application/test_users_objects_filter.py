@@ -41,7 +41,7 @@ class CustomUserAdminTest(TestCase):
         filter_ = UsersObjectsFilter(request, {}, Mother, self.mother_admin_instance)
 
         lookups = filter_.lookups(request, self.mother_admin_instance)
-        expected_lookups = [('user1', 'Uzbekistan user1')]
+        expected_lookups = [('user1', 'Uzbekistan user1 (1)')]
         self.assertEqual(expected_lookups, lookups)
 
         request = self.factory.get('/')
@@ -50,7 +50,7 @@ class CustomUserAdminTest(TestCase):
         filter_ = UsersObjectsFilter(request, {}, Mother, self.mother_admin_instance)
 
         lookups = filter_.lookups(request, self.mother_admin_instance)
-        expected_lookups = [('user1', 'Uzbekistan user1'), ('user2', 'Kyrgyzstan user2')]
+        expected_lookups = [('user1', 'Uzbekistan user1 (1)'), ('user2', 'Kyrgyzstan user2 (1)')]
         self.assertEqual(expected_lookups, lookups)
 
         request = self.factory.get('/')
@@ -58,7 +58,25 @@ class CustomUserAdminTest(TestCase):
         filter_ = UsersObjectsFilter(request, {}, Mother, self.mother_admin_instance)
 
         lookups = filter_.lookups(request, self.mother_admin_instance)
-        expected_lookups = [('user1', 'Uzbekistan user1'), ('user2', 'Kyrgyzstan user2')]
+        expected_lookups = [('user1', 'Uzbekistan user1 (1)'), ('user2', 'Kyrgyzstan user2 (1)')]
+        self.assertEqual(expected_lookups, lookups)
+
+    def test_lookups_counts_mothers_in_one_query(self):
+        request = self.factory.get('/')
+        request.user = self.user1
+        assign_user(request, self.mother_admin_instance, self.mother1)
+        assign_user(request, self.mother_admin_instance, self.mother2)
+        assign_user(request, self.mother_admin_instance, self.mother7)
+        request.user = self.user2
+        assign_user(request, self.mother_admin_instance, self.mother3)
+
+        request = self.factory.get('/')
+        request.user = self.user3
+        filter_ = UsersObjectsFilter(request, {}, Mother, self.mother_admin_instance)
+
+        with self.assertNumQueries(1):
+            lookups = filter_.lookups(request, self.mother_admin_instance)
+        expected_lookups = [('user1', 'Uzbekistan user1 (2)'), ('user2', 'Kyrgyzstan user2 (1)')]
         self.assertEqual(expected_lookups, lookups)
 
     def test_queryset(self):
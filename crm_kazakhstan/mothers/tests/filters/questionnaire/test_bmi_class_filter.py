@@ -0,0 +1,42 @@
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth import get_user_model
+from django.test import TestCase, RequestFactory
+
+from mothers.admin import QuestionnaireAdmin
+from mothers.filters.questionnaire import BmiClassFilter
+from mothers.models import Mother
+
+User = get_user_model()
+
+
+class BmiClassFilterTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username='testuser', password='12345')
+        self.mother_normal = Mother.objects.create(name='Normal', height='175', weight='70')
+        self.mother_overweight = Mother.objects.create(name='Overweight', height='170', weight='80')
+
+        self.questionnaire_admin = QuestionnaireAdmin(Mother, AdminSite())
+
+    def get_filter(self, params):
+        request = self.factory.get('/', params)
+        request.user = self.user
+        return request, BmiClassFilter(request, params, Mother, self.questionnaire_admin)
+
+    def test_filter_lookups(self):
+        request, filter_ = self.get_filter({})
+
+        lookups = [lookup for lookup, _ in filter_.lookups(request, self.questionnaire_admin)]
+        self.assertEqual(lookups, ['underweight', 'normal', 'overweight', 'obesity_1', 'obesity_2', 'obesity_3'])
+
+    def test_filter_overweight_mothers(self):
+        request, filter_ = self.get_filter({'bmi_class': 'overweight'})
+
+        queryset = filter_.queryset(request, Mother.objects.all())
+        self.assertQuerysetEqual(queryset, [self.mother_overweight])
+
+    def test_no_filter_value_returns_all(self):
+        request, filter_ = self.get_filter({})
+
+        queryset = filter_.queryset(request, Mother.objects.all())
+        self.assertEqual(queryset.count(), 2)
@@ -0,0 +1,42 @@
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.test import TestCase, RequestFactory
+
+from mothers.admin import QuestionnaireAdmin
+from mothers.filters.questionnaire import UsersObjectsFilter
+from mothers.models import Mother, MotherAssignment
+
+User = get_user_model()
+
+
+class UsersObjectsFilterTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.admin_instance = QuestionnaireAdmin(Mother, admin.site)
+        self.manager = User.objects.create_user(username='manager', password='password')
+        self.superuser = User.objects.create_superuser(username='admin', password='password')
+
+        self.heavy_mother = Mother.objects.create(name='Heavy', age=30, residence='Tashkent', height='170',
+                                                  weight='90', caesarean=0, children=1)
+        self.light_mother = Mother.objects.create(name='Light', age=30, residence='Tashkent', height='170',
+                                                  weight='60', caesarean=0, children=1)
+        self.other_mother = Mother.objects.create(name='Other', age=30, residence='Tashkent', height='170',
+                                                  weight='70', caesarean=0, children=1)
+        MotherAssignment.objects.create(user=self.manager, mother=self.heavy_mother)
+        MotherAssignment.objects.create(user=self.manager, mother=self.light_mother)
+
+    def test_queryset_keeps_bmi_annotation(self):
+        request = self.factory.get('/', {'username': 'manager'})
+        request.user = self.superuser
+        filter_ = UsersObjectsFilter(request, {'username': 'manager'}, Mother, self.admin_instance)
+
+        queryset = filter_.queryset(request, self.admin_instance.get_queryset(request))
+
+        self.assertEqual(list(queryset.order_by('bmi')), [self.light_mother, self.heavy_mother])
+
+    def test_queryset_without_value_returns_none(self):
+        request = self.factory.get('/')
+        request.user = self.superuser
+        filter_ = UsersObjectsFilter(request, {}, Mother, self.admin_instance)
+
+        self.assertIsNone(filter_.queryset(request, self.admin_instance.get_queryset(request)))
@@ -5,11 +5,8 @@ from freezegun import freeze_time
 from django.contrib.admin.sites import AdminSite
 from mothers.admin import ShortPlanAdmin
 from mothers.filters.short_plan import NewEventOccursFilter
-from mothers.models import Mother, ScheduledEvent
+from mothers.models import Mother, ScheduledEvent, MotherAssignment
 
-from django.contrib.contenttypes.models import ContentType
-from django.contrib.auth.models import Permission
-from guardian.shortcuts import assign_perm, remove_perm
 
 User = get_user_model()
 
@@ -29,20 +26,10 @@ class NewEventOccursFilterTest(TestCase):
                                              caesarean=1, children=2)
 
     def set_custom_permission(self, user, obj):
-        model_name = obj.__class__.__name__.lower()
-        codename = f'{model_name}_{user.username}'
-        content_type = ContentType.objects.get_for_model(obj)
-        permission, _ = Permission.objects.get_or_create(
-            codename=codename,
-            name=f'Can access {model_name} {user.username}',
-            content_type=content_type,
-        )
-        assign_perm(permission, user, obj)
+        MotherAssignment.objects.get_or_create(user=user, mother=obj)
 
     def remove_custom_permission(self, user, obj):
-        model_name = obj.__class__.__name__.lower()
-        codename = f'{model_name}_{user.username}'
-        remove_perm(codename, user, obj)
+        MotherAssignment.objects.filter(user=user, mother=obj).delete()
 
     @freeze_time("2024-07-20 15:00:00")
     def test_filter_with_new_event(self):
@@ -0,0 +1,67 @@
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth import get_user_model
+from django.test import TestCase, RequestFactory
+from django.utils import timezone
+
+from mothers.inlines.laboratory import LaboratoryInline
+from mothers.models import Mother
+from mothers.models.mother import Laboratory, LaboratoryFile, AnalysisType
+
+User = get_user_model()
+
+
+class LaboratoryFilesTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = User.objects.create_superuser(username='admin', password='password', timezone='UTC')
+        self.inline_admin = LaboratoryInline(Mother, AdminSite())
+        self.mother = Mother.objects.create(name='Mother')
+        self.serology = AnalysisType.objects.create(name=AnalysisType.SEROLOGY)
+        self.ultrasound = AnalysisType.objects.create(name=AnalysisType.ULTRASOUND)
+
+        for _ in range(3):
+            laboratory = Laboratory.objects.create(mother=self.mother, scheduled_time=timezone.now())
+            laboratory.analysis_types.add(self.serology, self.ultrasound)
+            LaboratoryFile.objects.create(laboratory=laboratory, analysis_type=self.serology,
+                                          file=f'Mother/serology_{laboratory.pk}.pdf')
+            LaboratoryFile.objects.create(laboratory=laboratory, analysis_type=self.ultrasound,
+                                          file=f'Mother/ultrasound_{laboratory.pk}.pdf',
+                                          video=f'Mother/ultrasound_{laboratory.pk}.mp4')
+
+    def get_laboratories(self):
+        request = self.factory.get('/')
+        request.user = self.user
+        return list(self.inline_admin.get_queryset(request).filter(mother=self.mother).order_by('pk'))
+
+    def test_files_and_videos_render_in_constant_queries(self):
+        # Laboratories, their analysis types and their files, whatever the number of laboratories
+        with self.assertNumQueries(3):
+            laboratories = self.get_laboratories()
+            columns = [(self.inline_admin.custom_analysis_types(laboratory), self.inline_admin.custom_video(laboratory))
+                       for laboratory in laboratories]
+
+        self.assertEqual(len(columns), 3)
+
+    def test_files_grouped_by_analysis_type(self):
+        laboratory = self.get_laboratories()[0]
+
+        files = self.inline_admin.custom_analysis_types(laboratory)
+        self.assertIn(f'serology_{laboratory.pk}.pdf" target="_blank">SEROLOGY</a>', files)
+        self.assertIn(f'ultrasound_{laboratory.pk}.pdf" target="_blank">ULTRASOUND</a>', files)
+
+    def test_video_read_from_laboratory_file(self):
+        laboratory = self.get_laboratories()[0]
+
+        video = self.inline_admin.custom_video(laboratory)
+        self.assertEqual(video.count('Video file'), 1)
+        self.assertIn(f'>ultrasound_{laboratory.pk}.mp4</a>', video)
+
+    def test_videos_numbered_in_a_row(self):
+        laboratory = self.get_laboratories()[0]
+        # The serology video follows a serology file without one, the ultrasound video is of another type
+        LaboratoryFile.objects.create(laboratory=laboratory, analysis_type=self.serology, video='Mother/serology.mp4')
+        laboratory = self.get_laboratories()[0]
+
+        video = self.inline_admin.custom_video(laboratory)
+        self.assertIn('1. Video file: <a href="/media/Mother/serology.mp4"', video)
+        self.assertIn(f'2. Video file: <a href="/media/Mother/ultrasound_{laboratory.pk}.mp4"', video)
@@ -0,0 +1,32 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from freezegun import freeze_time
+
+from mothers.models import Mother
+
+
+class ApplyRetentionPoliciesTest(TestCase):
+    def setUp(self):
+        with freeze_time('2024-07-02 12:00:00'):
+            Mother.objects.create(name='Tuesday')
+        with freeze_time('2024-07-06 12:00:00'):
+            Mother.objects.create(name='Saturday')
+
+    @freeze_time('2024-07-08 00:00:00')
+    def test_dry_run_reports_every_policy(self):
+        out = StringIO()
+        call_command('apply_retention_policies', dry_run=True, stdout=out)
+
+        self.assertIn('incomplete_weekday_applications: 1 mothers and 0 files would be deleted', out.getvalue())
+        self.assertIn('incomplete_weekend_applications: 1 mothers and 0 files would be deleted', out.getvalue())
+        self.assertEqual(Mother.objects.count(), 2)
+
+    @freeze_time('2024-07-08 00:00:00')
+    def test_applies_chosen_policy(self):
+        out = StringIO()
+        call_command('apply_retention_policies', 'incomplete_weekend_applications', stdout=out)
+
+        self.assertIn('incomplete_weekend_applications: deleted 1 mothers', out.getvalue())
+        self.assertEqual(list(Mother.objects.values_list('name', flat=True)), ['Tuesday'])
@@ -0,0 +1,36 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from mothers.models import Mother
+
+
+class BackfillBodyMetricsTest(TestCase):
+    def setUp(self):
+        self.metric = Mother.objects.create(name='Metric', height='170', weight='65')
+        self.meters = Mother.objects.create(name='Meters', height='1.62', weight='58,5')
+        self.unparsed = Mother.objects.create(name='Unparsed', height='tall', weight='heavy')
+        Mother.objects.create(name='Application')
+
+        # Rows written before the numeric columns existed
+        Mother.objects.update(height_cm=None, weight_kg=None)
+
+    def test_fills_numeric_columns_in_batches(self):
+        out = StringIO()
+        call_command('backfill_body_metrics', batch_size=1, stdout=out)
+
+        metrics = {name: (height, weight) for name, height, weight in
+                   Mother.objects.values_list('name', 'height_cm', 'weight_kg')}
+        self.assertEqual(metrics['Metric'], (170, Decimal('65.0')))
+        self.assertEqual(metrics['Meters'], (162, Decimal('58.5')))
+        self.assertEqual(metrics['Unparsed'], (None, None))
+        self.assertIn('Backfilled 2 mothers, 1 could not be parsed', out.getvalue())
+
+    def test_second_run_backfills_nothing(self):
+        call_command('backfill_body_metrics', stdout=StringIO())
+        out = StringIO()
+        call_command('backfill_body_metrics', stdout=out)
+
+        self.assertIn('Backfilled 0 mothers, 1 could not be parsed', out.getvalue())
@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import DeleteMessages
+from django.test import TestCase
+from django.utils import timezone
+
+from mothers.management.commands.record_to_the_file import schedule_messages_cleanup, sweep_due_messages
+from mothers.models import Mother
+from mothers.models.mother import Laboratory, LaboratoryMessage, MessageCleanup
+
+GROUP_ID = -100
+USER_ID = 7
+
+
+class FakeBot:
+    def __init__(self, fail=False):
+        self.deleted = []
+        self.fail = fail
+
+    async def delete_messages(self, chat_id, message_ids):
+        self.deleted.append((chat_id, message_ids))
+        if self.fail:
+            raise TelegramBadRequest(DeleteMessages(chat_id=chat_id, message_ids=message_ids), 'Bad Request')
+        return True
+
+
+class MessagesCleanupTest(TestCase):
+    def setUp(self):
+        mother = Mother.objects.create(name='Mother')
+        self.laboratory = Laboratory.objects.create(mother=mother, scheduled_time=timezone.now())
+        LaboratoryMessage.objects.bulk_create(
+            [LaboratoryMessage(laboratory=self.laboratory, chat_id=GROUP_ID, message_id=message_id, is_posted=False)
+             for message_id in range(1, 4)] +
+            [LaboratoryMessage(laboratory=self.laboratory, chat_id=GROUP_ID, message_id=99, is_posted=True)]
+        )
+
+    async def schedule(self, user_id=USER_ID):
+        await schedule_messages_cleanup(self.laboratory.pk, GROUP_ID, user_id, is_posted=False)
+
+    async def test_schedules_unposted_messages_once(self):
+        await self.schedule()
+        await self.schedule()
+
+        cleanups = [cleanup async for cleanup in MessageCleanup.objects.select_related('laboratory_message')]
+        self.assertEqual(sorted(cleanup.laboratory_message.message_id for cleanup in cleanups), [1, 2, 3])
+        self.assertTrue(all(cleanup.chat_id == USER_ID and cleanup.due_at > timezone.now() for cleanup in cleanups))
+
+    async def test_sweeps_nothing_before_due(self):
+        await self.schedule()
+        bot = FakeBot()
+
+        self.assertEqual(await sweep_due_messages(bot), 0)
+        self.assertEqual(bot.deleted, [])
+
+    async def test_deletes_due_messages_in_bulk_per_chat(self):
+        await self.schedule()
+        await LaboratoryMessage.objects.acreate(laboratory=self.laboratory, chat_id=GROUP_ID, message_id=4,
+                                                is_posted=False)
+        await self.schedule(user_id=8)
+        bot = FakeBot()
+
+        swept = await sweep_due_messages(bot, now=timezone.now() + timedelta(minutes=2))
+
+        self.assertEqual(swept, 4)
+        self.assertEqual(sorted((chat_id, sorted(ids)) for chat_id, ids in bot.deleted), [(7, [1, 2, 3]), (8, [4])])
+        self.assertEqual([message.message_id async for message in LaboratoryMessage.objects.all()], [99])
+        self.assertFalse(await MessageCleanup.objects.aexists())
+
+    async def test_splits_large_chats_into_batches(self):
+        await LaboratoryMessage.objects.abulk_create(
+            [LaboratoryMessage(laboratory=self.laboratory, chat_id=GROUP_ID, message_id=message_id, is_posted=False)
+             for message_id in range(100, 250)]
+        )
+        await self.schedule()
+        bot = FakeBot()
+
+        await sweep_due_messages(bot, now=timezone.now() + timedelta(minutes=2))
+
+        self.assertEqual([len(ids) for _, ids in bot.deleted], [100, 53])
+
+    async def test_rows_are_removed_when_telegram_refuses(self):
+        await self.schedule()
+
+        await sweep_due_messages(FakeBot(fail=True), now=timezone.now() + timedelta(minutes=2))
+
+        self.assertFalse(await MessageCleanup.objects.aexists())
@@ -0,0 +1,65 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.test import TestCase
+from guardian.models import UserObjectPermission
+from guardian.shortcuts import assign_perm
+
+from mothers.models import Mother, MotherAssignment
+from mothers.services.visibility import get_module_visibility_version
+
+User = get_user_model()
+
+
+class MigrateMotherAssignmentsTest(TestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user(username='User1', password='password1')
+        self.user2 = User.objects.create_user(username='user2', password='password2')
+        self.mother1 = Mother.objects.create(name='Mother1')
+        self.mother2 = Mother.objects.create(name='Mother2')
+        self.mother3 = Mother.objects.create(name='Mother3')
+
+        self.grant(self.user1, self.mother1)
+        self.grant(self.user1, self.mother2)
+        self.grant(self.user2, self.mother3)
+
+    @staticmethod
+    def grant(user, obj):
+        # This is how assign_user granted access before the MotherAssignment table
+        codename = f'mother_{user.username}'.lower()
+        permission, _ = Permission.objects.get_or_create(
+            codename=codename,
+            name=f'mother {user.username}'.lower(),
+            content_type=ContentType.objects.get_for_model(Mother),
+        )
+        assign_perm(permission, user, obj)
+
+    def test_copies_legacy_grants(self):
+        call_command('migrate_mother_assignments', stdout=StringIO())
+
+        self.assertQuerysetEqual(Mother.objects.assigned_to(self.user1).order_by('pk'), [self.mother1, self.mother2])
+        self.assertQuerysetEqual(Mother.objects.assigned_to(self.user2), [self.mother3])
+        self.assertEqual(UserObjectPermission.objects.count(), 3)
+
+    def test_drops_cached_module_visibility(self):
+        version = get_module_visibility_version()
+
+        call_command('migrate_mother_assignments', stdout=StringIO())
+
+        self.assertNotEqual(get_module_visibility_version(), version)
+
+    def test_is_idempotent(self):
+        call_command('migrate_mother_assignments', stdout=StringIO())
+        call_command('migrate_mother_assignments', stdout=StringIO())
+
+        self.assertEqual(MotherAssignment.objects.count(), 3)
+
+    def test_delete_legacy_grants(self):
+        call_command('migrate_mother_assignments', '--delete-legacy', stdout=StringIO())
+
+        self.assertEqual(MotherAssignment.objects.count(), 3)
+        self.assertFalse(UserObjectPermission.objects.exists())
+        self.assertFalse(Permission.objects.filter(codename__startswith='mother_').exists())
@@ -0,0 +1,59 @@
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from mothers.models import Mother, ScheduledEvent
+from mothers.models.mother import Laboratory
+
+
+class RecomputeStagesTest(TestCase):
+    def setUp(self):
+        self.application = Mother.objects.create(name='Application')
+        self.questionnaire = Mother.objects.create(name='Questionnaire', age=30, residence='New York', height='170',
+                                                   weight='65', caesarean=1, children=2)
+        self.short_plan = Mother.objects.create(name='ShortPlan', age=30, residence='New York', height='170',
+                                                weight='65', caesarean=1, children=2)
+        ScheduledEvent.objects.create(mother=self.short_plan, note='Call', scheduled_time=timezone.now())
+
+        # Rows written without signals, as after adding the column
+        Mother.objects.update(stage=None, stage_changed_at=None)
+
+    def test_rebuilds_stages_in_batches(self):
+        out = StringIO()
+        call_command('recompute_stages', batch_size=2, stdout=out)
+
+        stages = dict(Mother.objects.values_list('pk', 'stage'))
+        self.assertEqual(stages, {
+            self.application.pk: Mother.StageChoices.APPLICATION,
+            self.questionnaire.pk: Mother.StageChoices.QUESTIONNAIRE,
+            self.short_plan.pk: Mother.StageChoices.SHORT_PLAN,
+        })
+        self.assertIn('Moved 3 of 3 mothers', out.getvalue())
+
+    def test_second_run_moves_nothing(self):
+        call_command('recompute_stages', stdout=StringIO())
+        out = StringIO()
+        call_command('recompute_stages', stdout=out)
+
+        self.assertIn('Moved 0 of 3 mothers', out.getvalue())
+
+    def test_migration_backfills_stages(self):
+        migration = import_module('mothers.migrations.0045_backfill_mother_stage')
+        laboratory = Mother.objects.create(name='Laboratory')
+        Laboratory.objects.create(mother=laboratory, scheduled_time=timezone.now())
+        Mother.objects.update(stage=None, stage_changed_at=None)
+
+        migration.backfill_mother_stage(apps, None)
+
+        stages = dict(Mother.objects.values_list('pk', 'stage'))
+        self.assertEqual(stages, {
+            self.application.pk: Mother.StageChoices.APPLICATION,
+            self.questionnaire.pk: Mother.StageChoices.QUESTIONNAIRE,
+            self.short_plan.pk: Mother.StageChoices.SHORT_PLAN,
+            laboratory.pk: Mother.StageChoices.LABORATORY,
+        })
+        self.assertFalse(Mother.objects.filter(stage_changed_at__isnull=True).exists())
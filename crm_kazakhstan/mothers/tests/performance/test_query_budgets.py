@@ -0,0 +1,174 @@
+import logging
+import time
+from datetime import timedelta
+
+from admin_interface.models import Theme
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from documents.models import MainDocument, AdditionalDocument
+from mothers.models import Mother, ScheduledEvent, MotherAssignment
+from mothers.models.mother import Laboratory, DoctorAnswer, AnalysisType, LaboratoryFile
+from mothers.services.stage import refresh_stages
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+MOTHERS_PER_STAGE = 250
+
+# Maximum SQL queries of a page for the superuser, a view-only user and an assigned manager,
+# including the admin sidebar with a cold module visibility cache
+BUDGETS = {
+    'mother_changelist': (12, 17, 15),
+    'mother_change': (12, 15, 14),
+    'questionnaire_changelist': (21, 26, 24),
+    'questionnaire_change': (17, 19, 19),
+    'shortplan_changelist': (13, 17, 16),
+    'shortplan_change': (16, 18, 18),
+    'plannedlaboratory_changelist': (16, 19, 19),
+    'plannedlaboratory_change': (18, 21, 20),
+    'get_filter_choices': (4, 4, 4),
+    'get_users_objects_choices': (4, 4, 4),
+    'get_filtered_rows': (15, 18, 18),
+    'laboratory_changelist': (10, 14, 13),
+    'laboratory_add': (13, 16, 15),
+    'laboratory_change': (15, 19, 18),
+    'document_changelist': (10, 14, 13),
+    'document_change': (15, 18, 17),
+}
+
+FILLED_APPLICATION = dict(age=30, residence='Almaty', height='170', weight='65', caesarean=1, children=2)
+
+
+class QueryBudgetTest(TestCase):
+    """
+    Renders every admin view over a realistic dataset and keeps its number of SQL queries within
+    budget, so an N+1 in a list column, inline or filter fails here. Wall times are logged.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        # The admin theme is created by the first rendered page otherwise
+        Theme.objects.get_active()
+        cls.superuser = User.objects.create_superuser(username='admin', password='password', country='UZBEKISTAN')
+        cls.viewer = User.objects.create_user(username='viewer', password='password', is_staff=True)
+        cls.viewer.user_permissions.add(*Permission.objects.filter(codename__in=[
+            'view_mother', 'view_questionnaire', 'view_shortplan', 'view_plannedlaboratory', 'view_laboratory',
+            'view_document',
+        ]))
+        cls.manager = User.objects.create_user(username='manager', password='password', country='KYRGYZSTAN',
+                                              is_staff=True)
+        cls.manager.user_permissions.add(*Permission.objects.filter(codename__in=[
+            'add_mother', 'change_mother', 'change_questionnaire', 'change_shortplan', 'change_plannedlaboratory',
+            'add_laboratory', 'change_laboratory', 'change_document',
+        ]))
+
+        mothers = Mother.objects.bulk_create(
+            [Mother(name=f'Application{i}') for i in range(MOTHERS_PER_STAGE)] +
+            [Mother(name=f'Mother{i}', **FILLED_APPLICATION) for i in range(MOTHERS_PER_STAGE * 3)]
+        )
+        application = mothers[:MOTHERS_PER_STAGE]
+        questionnaire = mothers[MOTHERS_PER_STAGE:MOTHERS_PER_STAGE * 2]
+        short_plan = mothers[MOTHERS_PER_STAGE * 2:MOTHERS_PER_STAGE * 3]
+        laboratory = mothers[MOTHERS_PER_STAGE * 3:]
+
+        ScheduledEvent.objects.bulk_create(
+            [ScheduledEvent(mother=mother, note='done', scheduled_time=now - timedelta(days=3), is_completed=True)
+             for mother in questionnaire + short_plan] +
+            [ScheduledEvent(mother=mother, note='call', scheduled_time=now - timedelta(days=1))
+             for mother in short_plan]
+        )
+        laboratories = Laboratory.objects.bulk_create(
+            [Laboratory(mother=mother, scheduled_time=now - timedelta(hours=i % 48), is_came=[None, True, False][i % 3])
+             for i, mother in enumerate(laboratory)]
+        )
+        analysis_types = [AnalysisType.objects.get_or_create(name=name)[0]
+                          for name in (AnalysisType.SEROLOGY, AnalysisType.CYTOLOGY, AnalysisType.ULTRASOUND)]
+        Laboratory.analysis_types.through.objects.bulk_create(
+            [Laboratory.analysis_types.through(laboratory=lab, analysistype=analysis_type)
+             for lab in laboratories for analysis_type in analysis_types]
+        )
+        DoctorAnswer.objects.bulk_create([DoctorAnswer(laboratory=lab) for lab in laboratories[::2]])
+        LaboratoryFile.objects.bulk_create(
+            [LaboratoryFile(laboratory=lab, analysis_type=analysis_type, file=f'Laboratory_files/{lab.pk}.pdf')
+             for lab in laboratories[::2] for analysis_type in analysis_types]
+        )
+        MainDocument.objects.bulk_create(
+            [MainDocument(mother=mother, title=MainDocument.MainDocumentChoice.PASSPORT, file=f'{mother.name}/Passport.pdf')
+             for mother in mothers[::2]]
+        )
+        AdditionalDocument.objects.bulk_create(
+            [AdditionalDocument(mother=mother, title='Reference', file=f'{mother.name}/Reference.pdf') for mother in mothers[::3]]
+        )
+        MotherAssignment.objects.bulk_create([MotherAssignment(user=cls.manager, mother=mother)
+                                              for mother in mothers[::2]] +
+                                             # View-only users open only the planned laboratories assigned to them
+                                             [MotherAssignment(user=cls.viewer, mother=laboratory[0])])
+        refresh_stages(Mother.objects.all())
+
+        cls.application = application[0]
+        cls.questionnaire = questionnaire[0]
+        cls.short_plan = short_plan[0]
+        cls.laboratory = laboratories[0]
+
+    def measure(self, user, url):
+        # Every page is measured with a cold module visibility cache
+        cache.clear()
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = self.client.get(url)
+            elapsed = time.perf_counter() - started
+        return response.status_code, len(queries), elapsed
+
+    def assertWithinBudget(self, page, url):
+        for user, budget in zip((self.superuser, self.viewer, self.manager), BUDGETS[page]):
+            with self.subTest(page=page, user=user.username):
+                status, queries, elapsed = self.measure(user, url)
+                logger.info('%s as %s: %d queries, %.1f ms', page, user.username, queries, elapsed * 1000)
+
+                # A redirect would measure the login or index page instead of the view
+                self.assertEqual(status, 200)
+                self.assertLessEqual(queries, budget)
+
+    def test_mother_admin(self):
+        self.assertWithinBudget('mother_changelist', reverse('admin:mothers_mother_changelist'))
+        self.assertWithinBudget('mother_change', reverse('admin:mothers_mother_change', args=[self.application.pk]))
+
+    def test_questionnaire_admin(self):
+        self.assertWithinBudget('questionnaire_changelist', reverse('admin:mothers_questionnaire_changelist'))
+        self.assertWithinBudget('questionnaire_change',
+                                reverse('admin:mothers_questionnaire_change', args=[self.questionnaire.pk]))
+
+    def test_short_plan_admin(self):
+        self.assertWithinBudget('shortplan_changelist', reverse('admin:mothers_shortplan_changelist'))
+        self.assertWithinBudget('shortplan_change',
+                                reverse('admin:mothers_shortplan_change', args=[self.short_plan.pk]))
+
+    def test_planned_laboratory_admin(self):
+        self.assertWithinBudget('plannedlaboratory_changelist', reverse('admin:mothers_plannedlaboratory_changelist'))
+        self.assertWithinBudget('plannedlaboratory_change',
+                                reverse('admin:mothers_plannedlaboratory_change', args=[self.laboratory.mother_id]))
+        self.assertWithinBudget('get_filter_choices', reverse('admin:get_filter_choices'))
+        self.assertWithinBudget('get_users_objects_choices', reverse('admin:get_users_objects_choices'))
+        self.assertWithinBudget('get_filtered_rows', reverse('admin:get_filtered_rows'))
+
+    def test_laboratory_admin(self):
+        mother_query = f'?mother={self.laboratory.mother_id}'
+        self.assertWithinBudget('laboratory_changelist', reverse('admin:mothers_laboratory_changelist'))
+        self.assertWithinBudget('laboratory_add', reverse('admin:mothers_laboratory_add') + mother_query)
+        self.assertWithinBudget('laboratory_change',
+                                reverse('admin:mothers_laboratory_change', args=[self.laboratory.pk]) + mother_query)
+
+    def test_document_proxy_admin(self):
+        self.assertWithinBudget('document_changelist', reverse('admin:documents_document_changelist'))
+        self.assertWithinBudget('document_change',
+                                reverse('admin:documents_document_change', args=[self.laboratory.mother_id]))
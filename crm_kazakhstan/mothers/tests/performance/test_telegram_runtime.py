@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import threading
+import time
+from unittest import mock
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiohttp import web
+from django.test import SimpleTestCase
+
+from mothers.services.telegram_runtime import TelegramRuntime
+
+logger = logging.getLogger(__name__)
+
+TASKS = 10
+TOKEN = '123456:TEST'
+
+
+class FakeBotAPI:
+    """
+    Bot API answering every sendMessage on localhost, it records the client connections it was called through.
+    """
+
+    def __init__(self):
+        self.connections = set()
+        self.calls = 0
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    async def send_message(self, request):
+        self.calls += 1
+        self.connections.add(request.transport.get_extra_info('peername'))
+        data = await request.post()
+        return web.json_response({'ok': True, 'result': {
+            'message_id': self.calls, 'date': 0, 'chat': {'id': int(data['chat_id']), 'type': 'group'},
+            'text': data['text'],
+        }})
+
+    async def serve(self):
+        app = web.Application()
+        app.router.add_post('/bot{token}/sendMessage', self.send_message)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        return site._server.sockets[0].getsockname()[1]
+
+    def start(self):
+        self.thread.start()
+        self.port = asyncio.run_coroutine_threadsafe(self.serve(), self.loop).result()
+        return TelegramAPIServer.from_base(f'http://127.0.0.1:{self.port}')
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+async def notify(bot, number):
+    message = await bot.send_message(chat_id=-100, text=f'Laboratory {number}')
+    return message.message_id
+
+
+class TelegramRuntimeBenchmarkTest(SimpleTestCase):
+    """
+    Sends the same messages the way the tasks did before, with a new loop and bot session per task, and
+    through the worker runtime. Throughputs are logged.
+    """
+
+    def setUp(self):
+        self.api = FakeBotAPI()
+        self.server = self.api.start()
+        self.addCleanup(self.api.stop)
+
+    def create_bot(self):
+        return Bot(token=TOKEN, session=AiohttpSession(api=self.server))
+
+    def run_per_task_loops(self):
+        for number in range(TASKS):
+            loop = asyncio.new_event_loop()
+            bot = self.create_bot()
+            try:
+                loop.run_until_complete(notify(bot, number))
+                loop.run_until_complete(bot.session.close())
+            finally:
+                loop.close()
+
+    def run_worker_runtime(self):
+        runtime = TelegramRuntime(self.create_bot)
+        runtime.start()
+        try:
+            return [runtime.run(notify(runtime.bot, number)) for number in range(TASKS)]
+        finally:
+            runtime.stop()
+
+    def measure(self, name, send):
+        self.api.connections.clear()
+        started = time.perf_counter()
+        result = send()
+        elapsed = time.perf_counter() - started
+        logger.info('%s: %d tasks in %.1f ms, %.1f tasks/s over %d connections', name, TASKS, elapsed * 1000,
+                    TASKS / elapsed, len(self.api.connections))
+        return result, len(self.api.connections)
+
+    def test_runtime_reuses_one_connection(self):
+        _, before = self.measure('per task loop', self.run_per_task_loops)
+        message_ids, after = self.measure('worker runtime', self.run_worker_runtime)
+
+        self.assertEqual(before, TASKS)
+        self.assertEqual(after, 1)
+        self.assertEqual(len(message_ids), TASKS)
+
+
+class TelegramRuntimeTest(SimpleTestCase):
+    def setUp(self):
+        self.runtime = TelegramRuntime(lambda: Bot(token=TOKEN))
+        self.addCleanup(self.runtime.stop)
+
+    def test_returns_results_and_raises_errors(self):
+        async def double(value):
+            return value * 2
+
+        async def fail():
+            raise ValueError('failed')
+
+        self.assertEqual(self.runtime.run(double(2)), 4)
+        with self.assertRaises(ValueError):
+            self.runtime.run(fail())
+
+    def test_keeps_one_loop_until_stopped(self):
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        loop = self.runtime.run(current_loop())
+        self.assertIs(self.runtime.run(current_loop()), loop)
+
+        self.runtime.stop()
+        self.assertTrue(loop.is_closed())
+        self.assertFalse(self.runtime.is_running)
+        self.assertIsNot(self.runtime.run(current_loop()), loop)
+
+    def test_checks_database_connections_around_every_task(self):
+        async def task():
+            return 'done'
+
+        async def fail():
+            raise ValueError('failed')
+
+        with mock.patch('mothers.services.telegram_runtime.close_old_connections') as close_old_connections:
+            self.assertEqual(self.runtime.run(task()), 'done')
+            with self.assertRaises(ValueError):
+                self.runtime.run(fail())
+
+        self.assertEqual(close_old_connections.call_count, 4)
@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from mothers.models import Mother
+from mothers.services.body_metrics import parse_height_cm, parse_weight_kg, annotate_bmi, filter_by_bmi_class, \
+    truncate_bmi
+
+
+class ParseBodyMetricsTest(TestCase):
+    def test_parse_height(self):
+        self.assertEqual(parse_height_cm('170'), 170)
+        self.assertEqual(parse_height_cm('170 cm'), 170)
+        self.assertEqual(parse_height_cm('1,65'), 165)
+        self.assertEqual(parse_height_cm('1.7m'), 170)
+        self.assertIsNone(parse_height_cm('tall'))
+        self.assertIsNone(parse_height_cm('0'))
+        self.assertIsNone(parse_height_cm('1700'))
+        self.assertIsNone(parse_height_cm(None))
+
+    def test_parse_weight(self):
+        self.assertEqual(parse_weight_kg('65'), Decimal('65.0'))
+        self.assertEqual(parse_weight_kg('65,55 kg'), Decimal('65.6'))
+        self.assertIsNone(parse_weight_kg('unknown'))
+        self.assertIsNone(parse_weight_kg('650'))
+        self.assertIsNone(parse_weight_kg(None))
+
+
+class BmiQueryTest(TestCase):
+    def setUp(self):
+        self.normal = Mother.objects.create(name='Normal', height='175', weight='70')
+        self.underweight = Mother.objects.create(name='Underweight', height='1.85', weight='50')
+        self.obese = Mother.objects.create(name='Obese', height='165', weight='90 kg')
+        self.unknown = Mother.objects.create(name='Unknown', height='tall', weight='70')
+
+    def test_save_fills_numeric_columns(self):
+        self.normal.weight = '72'
+        self.normal.save(update_fields=['weight'])
+        self.normal.refresh_from_db()
+
+        self.assertEqual((self.normal.height_cm, self.normal.weight_kg), (175, Decimal('72.0')))
+        self.assertEqual((self.underweight.height_cm, self.underweight.weight_kg), (185, Decimal('50.0')))
+
+    def test_bmi_is_computed_in_database(self):
+        bmis = dict(annotate_bmi(Mother.objects.all()).values_list('name', 'bmi'))
+
+        self.assertEqual(truncate_bmi(bmis['Normal']), 22.8)
+        self.assertEqual(truncate_bmi(bmis['Underweight']), 14.6)
+        self.assertEqual(truncate_bmi(bmis['Obese']), 33.0)
+        self.assertIsNone(bmis['Unknown'])
+
+    def test_filter_by_bmi_class(self):
+        def names(value):
+            return set(filter_by_bmi_class(Mother.objects.all(), value).values_list('name', flat=True))
+
+        self.assertEqual(names('normal'), {'Normal'})
+        self.assertEqual(names('underweight'), {'Underweight'})
+        self.assertEqual(names('obesity_1'), {'Obese'})
+        self.assertEqual(names('obesity_3'), set())
+        self.assertEqual(names('unknown'), {'Normal', 'Underweight', 'Obese', 'Unknown'})
+
+    def test_ordering_by_bmi(self):
+        ordered = annotate_bmi(Mother.objects.all()).filter(bmi__isnull=False).order_by('bmi')
+        names = list(ordered.values_list('name', flat=True))
+
+        self.assertEqual(names, ['Underweight', 'Normal', 'Obese'])
@@ -0,0 +1,116 @@
+import shutil
+import tempfile
+from types import SimpleNamespace
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import EditMessageCaption
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from documents.models import MainDocument
+from mothers.models import Mother
+from mothers.models.mother import Laboratory, LaboratoryMessage
+from mothers.services.laboratory_notification import post_laboratory_notification, SKIPPED, COALESCED, EDITED, POSTED
+
+CHAT_ID = -100
+
+
+def keyboard(text='✅ Come'):
+    return InlineKeyboardMarkup(inline_keyboard=[[InlineKeyboardButton(text=text, callback_data='come')]])
+
+
+class FakeBot:
+    def __init__(self):
+        self.calls = []
+        self.refuse_edits = False
+
+    async def send_photo(self, **kwargs):
+        self.calls.append('send_photo')
+        return SimpleNamespace(message_id=len(self.calls), photo=[SimpleNamespace(file_id=f'photo-{len(self.calls)}')])
+
+    async def edit_message_caption(self, **kwargs):
+        self.calls.append('edit_message_caption')
+        if self.refuse_edits:
+            raise TelegramBadRequest(EditMessageCaption(), "Bad Request: message can't be edited")
+
+    async def edit_message_reply_markup(self, **kwargs):
+        self.calls.append('edit_message_reply_markup')
+
+    async def delete_message(self, **kwargs):
+        self.calls.append('delete_message')
+
+
+class PostLaboratoryNotificationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        mother = Mother.objects.create(name='Mother')
+        self.laboratory = Laboratory.objects.create(mother=mother, scheduled_time=timezone.now())
+        self.passport = MainDocument.objects.create(mother=mother, title=MainDocument.MainDocumentChoice.PASSPORT,
+                                                    file=ContentFile(b'passport', name='passport.jpg'))
+        self.bot = FakeBot()
+
+    def post(self, caption='Laboratory', markup=None):
+        return post_laboratory_notification(self.bot, self.laboratory.pk, CHAT_ID, caption, markup or keyboard(),
+                                            self.passport.file)
+
+    async def posted(self):
+        return [message async for message in LaboratoryMessage.objects.filter(is_posted=True)]
+
+    async def test_same_content_is_posted_once(self):
+        self.assertEqual(await self.post(), POSTED)
+        self.assertEqual(await self.post(), SKIPPED)
+
+        self.assertEqual(self.bot.calls, ['send_photo'])
+        self.assertEqual(len(await self.posted()), 1)
+
+    async def test_changed_caption_is_edited_in_place(self):
+        await self.post()
+
+        self.assertEqual(await self.post(caption='Laboratory moved'), EDITED)
+
+        self.assertEqual(self.bot.calls, ['send_photo', 'edit_message_caption'])
+        self.assertEqual(await self.post(caption='Laboratory moved'), SKIPPED)
+
+    async def test_changed_keyboard_is_edited_in_place(self):
+        await self.post()
+
+        self.assertEqual(await self.post(markup=keyboard('✅ Came')), EDITED)
+
+        self.assertEqual(self.bot.calls, ['send_photo', 'edit_message_reply_markup'])
+
+    async def test_new_photo_replaces_the_post(self):
+        await self.post()
+        with open(self.passport.file.path, 'wb') as file:
+            file.write(b'new passport')
+
+        self.assertEqual(await self.post(), POSTED)
+
+        self.assertEqual(self.bot.calls, ['send_photo', 'delete_message', 'send_photo'])
+        self.assertEqual([message.message_id for message in await self.posted()], [3])
+
+    async def test_post_which_can_not_be_edited_is_replaced(self):
+        await self.post()
+        self.bot.refuse_edits = True
+
+        self.assertEqual(await self.post(caption='Laboratory moved'), POSTED)
+
+        self.assertEqual(self.bot.calls, ['send_photo', 'edit_message_caption', 'delete_message', 'send_photo'])
+
+    async def test_content_in_flight_is_coalesced(self):
+        await self.post()
+        # The same content is being posted by another task which has not recorded its message yet
+        fingerprint = (await self.posted())[0].fingerprint
+        await LaboratoryMessage.objects.all().adelete()
+        await cache.aset(f'laboratory_notification:{self.laboratory.pk}:{CHAT_ID}:{fingerprint}', True)
+
+        self.assertEqual(await self.post(), COALESCED)
+        self.assertEqual(self.bot.calls, ['send_photo'])
@@ -0,0 +1,48 @@
+from datetime import datetime
+from unittest import mock
+
+import pytz
+from django.contrib.auth import get_user_model
+from django.test import TestCase, RequestFactory
+
+from mothers.services.application import convert_utc_to_local
+from mothers.services.local_time import LocalTimeFormatter, get_request_formatter
+
+User = get_user_model()
+
+
+class LocalTimeFormatterTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username='user', password='password', timezone='Asia/Almaty')
+        self.utc_datetime = datetime(2024, 7, 8, 22, 0, tzinfo=pytz.utc)
+
+    def test_converts_to_user_timezone(self):
+        formatter = LocalTimeFormatter.for_user(self.user)
+
+        self.assertEqual(formatter.format(self.utc_datetime, '%A %H:%M'), 'Tuesday 03:00')
+        self.assertEqual(formatter.localize(datetime(2024, 7, 8, 22, 0)).hour, 3)
+
+    def test_user_without_timezone_gets_utc(self):
+        self.user.timezone = None
+
+        self.assertEqual(LocalTimeFormatter.for_user(self.user).format(self.utc_datetime, '%H:%M'), '22:00')
+
+    def test_formatter_is_shared_within_request(self):
+        request = self.factory.get('/')
+        request.user = self.user
+
+        self.assertIs(get_request_formatter(request), get_request_formatter(request))
+        self.assertEqual(convert_utc_to_local(request, self.utc_datetime).hour, 3)
+
+    def test_timezone_is_resolved_once_for_a_page(self):
+        request = self.factory.get('/')
+        request.user = self.user
+        page = [self.utc_datetime, datetime(2024, 7, 9, 10, 0, tzinfo=pytz.utc), self.utc_datetime]
+
+        with mock.patch('mothers.services.local_time.pytz.timezone', wraps=pytz.timezone) as timezone:
+            formatted = get_request_formatter(request).format_many(page, '%d %H:%M')
+            formatted += get_request_formatter(request).format_many(page, '%d %H:%M')
+
+        self.assertEqual(formatted, ['09 03:00', '09 15:00', '09 03:00'] * 2)
+        timezone.assert_called_once_with('Asia/Almaty')
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from mothers.models import Mother
+from mothers.models.mother import Laboratory
+from mothers.services.planned_laboratory import count_mothers_by_visit, get_visit_counts, \
+    get_filter_choices_for_laboratories
+from mothers.services.transitions import complete_missed_laboratories
+
+User = get_user_model()
+
+FILLED_APPLICATION = dict(age=30, residence='Almaty', height='170', weight='65', caesarean=1, children=2)
+
+
+class VisitCountsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_superuser(username='admin', password='password')
+        self.laboratories = {}
+        for name, is_came in (('Missed', False), ('Missed2', False), ('New', None)):
+            mother = Mother.objects.create(name=name, **FILLED_APPLICATION)
+            self.laboratories[name] = Laboratory.objects.create(
+                mother=mother, scheduled_time=timezone.now() - timedelta(hours=1), is_came=is_came)
+        planned = Mother.objects.create(name='Planned', **FILLED_APPLICATION)
+        Laboratory.objects.create(mother=planned, scheduled_time=timezone.now() + timedelta(days=1))
+
+    def test_counts_every_choice_with_one_query(self):
+        with self.assertNumQueries(1):
+            counts = count_mothers_by_visit(Mother.objects.all())
+
+        self.assertEqual(counts, {'not_visit': 2, 'visit': 0, 'new_visit': 1})
+
+    def test_choices_without_mothers_are_skipped(self):
+        choices = get_filter_choices_for_laboratories({'not_visit': 2, 'visit': 0, 'new_visit': 1})
+
+        self.assertEqual([(choice['value'], choice['count']) for choice in choices],
+                         [('not_visit', 2), ('new_visit', 1)])
+
+    def test_counts_are_cached_per_user(self):
+        get_visit_counts(self.user, Mother.objects.all())
+
+        with self.assertNumQueries(0):
+            counts = get_visit_counts(self.user, Mother.objects.all())
+        self.assertEqual(counts['not_visit'], 2)
+
+        other = User.objects.create_user(username='manager', password='password')
+        self.assertEqual(get_visit_counts(other, Mother.objects.none())['not_visit'], 0)
+
+    def test_laboratory_write_drops_cached_counts(self):
+        get_visit_counts(self.user, Mother.objects.all())
+
+        laboratory = self.laboratories['New']
+        laboratory.is_came = True
+        laboratory.save()
+
+        counts = get_visit_counts(self.user, Mother.objects.all())
+        self.assertEqual((counts['visit'], counts['new_visit']), (1, 0))
+
+    def test_bulk_completion_drops_cached_counts(self):
+        get_visit_counts(self.user, Mother.objects.all())
+
+        complete_missed_laboratories([self.laboratories['Missed'].mother_id])
+
+        self.assertEqual(get_visit_counts(self.user, Mother.objects.all())['not_visit'], 1)
@@ -0,0 +1,67 @@
+from unittest import skipUnless
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, RequestFactory
+from django.utils import timezone
+
+from mothers.admin import MotherAdmin, ShortPlanAdmin, PlannedLaboratoryAdmin
+from mothers.models import Mother, ScheduledEvent
+from mothers.models.mother import Laboratory, DoctorAnswer
+from mothers.services.predicates import on_application_stage, has_due_event, has_due_laboratory
+from mothers.services.retention import INCOMPLETE_WEEKDAY_APPLICATIONS
+from mothers.services.stage import stage_expression
+
+User = get_user_model()
+
+
+@skipUnless(connection.vendor == 'postgresql', 'partial indexes are checked on PostgreSQL plans')
+class PredicateIndexTest(TestCase):
+    """
+    The tables of a test database are tiny, so sequential scans are disabled to make the planner
+    show which index it is able to use.
+    """
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.superuser = User.objects.create_superuser(username='admin', password='password')
+        mother = Mother.objects.create(name='Mother', age=30, residence='New York', height='170', weight='65',
+                                       caesarean=1, children=2)
+        ScheduledEvent.objects.create(mother=mother, note='Call', scheduled_time=timezone.now())
+        laboratory = Laboratory.objects.create(mother=mother, scheduled_time=timezone.now())
+        DoctorAnswer.objects.create(laboratory=laboratory)
+        Mother.objects.create(name='Application')
+
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def plan(self, queryset):
+        return queryset.explain()
+
+    def admin_queryset(self, admin_class):
+        request = self.factory.get('/')
+        request.user = self.superuser
+        return admin_class(Mother, admin.site).get_queryset(request)
+
+    def test_stage_admins_use_stage_index(self):
+        for admin_class in (MotherAdmin, ShortPlanAdmin, PlannedLaboratoryAdmin):
+            with self.subTest(admin_class=admin_class.__name__):
+                self.assertIn('mother_stage_created', self.plan(self.admin_queryset(admin_class)))
+
+    def test_stage_expression_uses_open_row_indexes(self):
+        plan = self.plan(Mother.objects.annotate(computed_stage=stage_expression()))
+
+        self.assertIn('open_event_mother_time', plan)
+        self.assertIn('open_laboratory_mother_time', plan)
+        self.assertIn('open_answer_laboratory', plan)
+
+    def test_due_filters_use_open_row_indexes(self):
+        self.assertIn('open_event_mother_time', self.plan(Mother.objects.filter(has_due_event())))
+        self.assertIn('open_laboratory_mother_time',
+                      self.plan(Mother.objects.filter(has_due_laboratory(is_came__isnull=True))))
+
+    def test_delete_weekday_objects_uses_incomplete_application_index(self):
+        self.assertIn('mother_incomplete_created', self.plan(Mother.objects.filter(on_application_stage())))
+        # The retention policies behind delete_weekday_objects and delete_weekend_objects
+        self.assertIn('mother_incomplete_created', self.plan(INCOMPLETE_WEEKDAY_APPLICATIONS.queryset()))
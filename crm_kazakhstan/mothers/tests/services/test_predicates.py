@@ -0,0 +1,113 @@
+import random
+from datetime import timedelta
+
+from django.db.models import Q, F
+from django.test import TestCase
+from django.utils import timezone
+
+from mothers.models import Mother, ScheduledEvent
+from mothers.models.mother import Laboratory, DoctorAnswer
+from mothers.services.application import get_mothers_with_incomplete_application
+from mothers.services.planned_laboratory import mothers_which_on_laboratory_stage, get_mothers_by_visit
+from mothers.services.questionnaire import get_mothers_without_incomplete_event
+from mothers.services.short_plan import get_mothers_with_recent_incomplete_events, \
+    get_mother_that_event_time_has_come
+
+NON_NULL = Q(age__isnull=False, residence__isnull=False, height__isnull=False, weight__isnull=False,
+             caesarean__isnull=False, children__isnull=False)
+
+
+# Join based implementations the predicates replaced, kept as the reference results
+def legacy_incomplete_application(qs):
+    return qs.filter(Q(age__isnull=True) | Q(residence__isnull=True) | Q(height__isnull=True) |
+                     Q(weight__isnull=True) | Q(caesarean__isnull=True) | Q(children__isnull=True))
+
+
+def legacy_questionnaire(qs):
+    return qs.filter(NON_NULL).exclude(
+        Q(scheduled_event__is_completed=False) | Q(laboratories__is_completed=False) |
+        Q(laboratories__doctoranswer__is_completed=False)
+    ).distinct()
+
+
+def legacy_short_plan(qs):
+    return qs.filter(NON_NULL, scheduled_event__scheduled_time__lte=F('scheduled_event__created'),
+                     scheduled_event__is_completed=False).distinct()
+
+
+def legacy_laboratory(qs):
+    return qs.filter(Q(laboratories__is_completed=False) | Q(laboratories__doctoranswer__is_completed=False))
+
+
+def legacy_event_time_has_come(qs):
+    return qs.filter(Q(scheduled_event__is_completed=False) &
+                     Q(scheduled_event__scheduled_time__lte=timezone.now()))
+
+
+def legacy_visit(qs, is_came):
+    return qs.filter(Q(laboratories__is_completed=False) & Q(laboratories__is_came__exact=is_came) &
+                     Q(laboratories__scheduled_time__lte=timezone.now()))
+
+
+class PredicateEquivalenceTest(TestCase):
+    def setUp(self):
+        self.random = random.Random(20240601)
+        now = timezone.now()
+
+        for i in range(60):
+            fields = {'age': 30, 'residence': 'Almaty', 'height': '170', 'weight': '65', 'caesarean': 1,
+                      'children': 2}
+            if self.random.random() < 0.3:
+                fields[self.random.choice(list(fields))] = None
+            mother = Mother.objects.create(name=f'Mother{i}', **fields)
+
+            for _ in range(self.random.randint(0, 3)):
+                ScheduledEvent.objects.create(
+                    mother=mother, note='note', is_completed=self.random.random() < 0.5,
+                    scheduled_time=now + timedelta(days=self.random.choice([-2, 2])),
+                )
+
+            for _ in range(self.random.randint(0, 2)):
+                laboratory = Laboratory.objects.create(
+                    mother=mother, is_completed=self.random.random() < 0.5,
+                    is_came=self.random.choice([None, True, False]),
+                    scheduled_time=now + timedelta(days=self.random.choice([-2, 2])),
+                )
+                if self.random.random() < 0.5:
+                    DoctorAnswer.objects.create(laboratory=laboratory, is_completed=self.random.random() < 0.5)
+
+    def assertSamePks(self, new, legacy):
+        self.assertEqual(set(new.values_list('pk', flat=True)), set(legacy.values_list('pk', flat=True)))
+
+    def test_stage_predicates_match_join_implementations(self):
+        qs = Mother.objects.all()
+
+        self.assertSamePks(get_mothers_with_incomplete_application(qs), legacy_incomplete_application(qs))
+        self.assertSamePks(get_mothers_without_incomplete_event(qs), legacy_questionnaire(qs))
+        self.assertSamePks(get_mothers_with_recent_incomplete_events(qs), legacy_short_plan(qs))
+        self.assertSamePks(mothers_which_on_laboratory_stage(qs), legacy_laboratory(qs))
+        self.assertSamePks(get_mother_that_event_time_has_come(qs), legacy_event_time_has_come(qs))
+
+    def test_visit_predicates_match_join_implementations(self):
+        qs = Mother.objects.all()
+
+        self.assertSamePks(get_mothers_by_visit(qs, 'not_visit'), legacy_visit(qs, False))
+        self.assertSamePks(get_mothers_by_visit(qs, 'visit'), legacy_visit(qs, True))
+        self.assertSamePks(get_mothers_by_visit(qs, 'new_visit'), legacy_visit(qs, ''))
+
+    def test_predicates_do_not_duplicate_mothers(self):
+        qs = Mother.objects.all()
+
+        for filtered in (get_mothers_without_incomplete_event(qs), get_mothers_with_recent_incomplete_events(qs),
+                         mothers_which_on_laboratory_stage(qs), get_mother_that_event_time_has_come(qs)):
+            self.assertNotIn('DISTINCT', str(filtered.query))
+            pks = list(filtered.values_list('pk', flat=True))
+            self.assertEqual(len(pks), len(set(pks)))
+
+    def test_predicates_are_not_trivial(self):
+        # The random data must cover every stage, otherwise the equivalence proves nothing
+        qs = Mother.objects.all()
+
+        for filtered in (legacy_incomplete_application(qs), legacy_questionnaire(qs), legacy_short_plan(qs),
+                         legacy_laboratory(qs)):
+            self.assertTrue(filtered.exists())
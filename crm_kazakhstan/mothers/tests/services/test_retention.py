@@ -0,0 +1,101 @@
+import shutil
+import tempfile
+from datetime import datetime
+from unittest import mock
+
+import pytz
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from freezegun import freeze_time
+
+from documents.models import MainDocument
+from mothers.models import Mother, ScheduledEvent
+from mothers.models.mother import TelegramFile
+from mothers.services.retention import RetentionPolicy, apply_retention_policy, INCOMPLETE_WEEKDAY_APPLICATIONS, \
+    INCOMPLETE_WEEKEND_APPLICATIONS, SATURDAY
+from mothers.services.predicates import on_application_stage
+
+FILLED_APPLICATION = dict(age=30, residence='Almaty', height='170', weight='65', caesarean=1, children=2)
+
+# Monday
+NOW = datetime(2024, 7, 8, 0, 0, tzinfo=pytz.utc)
+
+
+def create_mother(name, created, **fields):
+    with freeze_time(created):
+        return Mother.objects.create(name=name, **fields)
+
+
+class RetentionPolicyTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+        self.weekdays = [create_mother(f'Weekday{day}', f'2024-07-0{day} 12:00:00') for day in range(1, 6)]
+        self.saturday = create_mother('Saturday', '2024-07-06 12:00:00')
+        self.complete = create_mother('Complete', '2024-07-02 12:00:00', **FILLED_APPLICATION)
+        self.today = create_mother('Today', '2024-07-08 00:00:00')
+
+    def test_deletes_matching_mothers_in_chunks(self):
+        ScheduledEvent.objects.create(mother=self.weekdays[0], note='Call', scheduled_time=NOW)
+
+        report = apply_retention_policy(INCOMPLETE_WEEKDAY_APPLICATIONS, chunk_size=2, now=NOW)
+
+        self.assertEqual((report.matched, report.chunks), (5, 3))
+        self.assertEqual(report.deleted['mothers.ScheduledEvent'], 1)
+        self.assertEqual(set(Mother.objects.values_list('name', flat=True)), {'Saturday', 'Complete', 'Today'})
+
+    def test_drops_cached_module_visibility_once_per_chunk(self):
+        ScheduledEvent.objects.create(mother=self.weekdays[0], note='Call', scheduled_time=NOW)
+
+        with mock.patch('mothers.signals.invalidate_module_visibility') as row_drop, \
+                mock.patch('mothers.services.retention.invalidate_module_visibility') as chunk_drop:
+            apply_retention_policy(INCOMPLETE_WEEKDAY_APPLICATIONS, chunk_size=2, now=NOW)
+
+        row_drop.assert_not_called()
+        self.assertEqual(chunk_drop.call_count, 3)
+
+    def test_weekend_policy(self):
+        report = apply_retention_policy(INCOMPLETE_WEEKEND_APPLICATIONS, now=NOW)
+
+        self.assertEqual(report.matched, 1)
+        self.assertFalse(Mother.objects.filter(pk=self.saturday.pk).exists())
+
+    def test_dry_run_deletes_nothing(self):
+        report = apply_retention_policy(INCOMPLETE_WEEKDAY_APPLICATIONS, dry_run=True, now=NOW)
+
+        self.assertEqual(report.matched, 5)
+        self.assertEqual(report.deleted, {})
+        self.assertEqual(Mother.objects.count(), 8)
+
+    def test_weekday_and_cutoff_are_local(self):
+        # Saturday 21:00 in UTC is already Sunday in Almaty, Monday 20:00 in UTC is Tuesday there
+        create_mother('Late', '2024-07-06 21:00:00')
+        create_mother('Tomorrow', '2024-07-07 20:00:00')
+        policy = RetentionPolicy(name='almaty_sundays', predicate=on_application_stage,
+                                 weekdays=frozenset({SATURDAY + 1}), timezone='Asia/Almaty')
+
+        self.assertEqual(list(policy.queryset(NOW).values_list('name', flat=True)), ['Late'])
+
+    def test_keep_days(self):
+        policy = RetentionPolicy(name='kept', predicate=on_application_stage,
+                                 weekdays=INCOMPLETE_WEEKDAY_APPLICATIONS.weekdays, keep_days=3)
+
+        self.assertEqual(set(policy.queryset(NOW).values_list('name', flat=True)), {'Weekday1', 'Weekday2', 'Weekday3', 'Weekday4'})
+
+    def test_removes_files_of_deleted_mothers(self):
+        with override_settings(MEDIA_ROOT=self.media_root):
+            passport, kept = [
+                MainDocument.objects.create(mother=mother, title=MainDocument.MainDocumentChoice.PASSPORT,
+                                            file=ContentFile(b'passport', name='passport.pdf'))
+                for mother in (self.weekdays[0], self.complete)
+            ]
+
+            TelegramFile.objects.create(path=passport.file.name, content_hash='hash', file_id='passport')
+
+            report = apply_retention_policy(INCOMPLETE_WEEKDAY_APPLICATIONS, now=NOW)
+
+            self.assertEqual(report.files, 1)
+            self.assertFalse(TelegramFile.objects.exists())
+            self.assertFalse(passport.file.storage.exists(passport.file.name))
+            self.assertTrue(kept.file.storage.exists(kept.file.name))
@@ -0,0 +1,111 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from mothers.models import Mother, ScheduledEvent
+from mothers.models.mother import Laboratory, DoctorAnswer, ShortPlan
+from mothers.services.stage import refresh_stages, stage_condition, APPLICATION, QUESTIONNAIRE, SHORT_PLAN, LABORATORY
+
+
+class StageTransitionTest(TestCase):
+    def setUp(self):
+        self.mother = Mother.objects.create(name='Mother', age=30, residence='New York', height='170', weight='65',
+                                            caesarean=1, children=2)
+
+    def stage(self):
+        return Mother.objects.values_list('stage', flat=True).get(pk=self.mother.pk)
+
+    def test_new_mother_gets_stage(self):
+        application = Mother.objects.create(name='Application')
+
+        self.assertEqual(application.stage, APPLICATION)
+        self.assertEqual(self.mother.stage, QUESTIONNAIRE)
+        self.assertEqual(self.stage(), QUESTIONNAIRE)
+        self.assertIsNotNone(Mother.objects.get(pk=self.mother.pk).stage_changed_at)
+
+    def test_filling_application_moves_to_questionnaire(self):
+        application = Mother.objects.create(name='Application')
+
+        application.age = 25
+        application.residence = 'Almaty'
+        application.height = '165'
+        application.weight = '60'
+        application.caesarean = 0
+        application.children = 1
+        application.save()
+
+        self.assertEqual(Mother.objects.get(pk=application.pk).stage, QUESTIONNAIRE)
+
+    def test_event_moves_to_short_plan_and_back(self):
+        event = ScheduledEvent.objects.create(mother=self.mother, note='Call', scheduled_time=timezone.now())
+        self.assertEqual(self.stage(), SHORT_PLAN)
+
+        event.is_completed = True
+        event.save()
+        self.assertEqual(self.stage(), QUESTIONNAIRE)
+
+    def test_laboratory_wins_over_short_plan(self):
+        ScheduledEvent.objects.create(mother=self.mother, note='Call', scheduled_time=timezone.now())
+        laboratory = Laboratory.objects.create(mother=self.mother, scheduled_time=timezone.now())
+        self.assertEqual(self.stage(), LABORATORY)
+
+        laboratory.delete()
+        self.assertEqual(self.stage(), SHORT_PLAN)
+
+    def test_doctor_answer_keeps_laboratory_stage(self):
+        laboratory = Laboratory.objects.create(mother=self.mother, scheduled_time=timezone.now(), is_completed=True)
+        self.assertEqual(self.stage(), QUESTIONNAIRE)
+
+        answer = DoctorAnswer.objects.create(laboratory=laboratory)
+        self.assertEqual(self.stage(), LABORATORY)
+
+        answer.is_completed = True
+        answer.save()
+        self.assertEqual(self.stage(), QUESTIONNAIRE)
+
+    def test_save_through_proxy_refreshes_stage(self):
+        ScheduledEvent.objects.create(mother=self.mother, note='Call', scheduled_time=timezone.now())
+        short_plan = ShortPlan.objects.get(pk=self.mother.pk)
+
+        short_plan.age = None
+        short_plan.save()
+
+        # Saving the stale instance does not keep the stage it was loaded with
+        self.assertEqual(self.stage(), APPLICATION)
+
+    def test_refresh_returns_only_moved_mothers(self):
+        Mother.objects.filter(pk=self.mother.pk).update(stage=None)
+
+        self.assertEqual(refresh_stages(Mother.objects.all()), {self.mother.pk: QUESTIONNAIRE})
+        self.assertEqual(refresh_stages(Mother.objects.all()), {})
+
+
+class OverlappingStageTest(TestCase):
+    """
+    Mothers matching an earlier stage and the laboratory stage are stored on the laboratory stage and
+    listed by both admins, as when every admin evaluated its own predicate.
+    """
+
+    def setUp(self):
+        self.short_plan = Mother.objects.create(name='ShortPlan', age=30, residence='New York', height='170',
+                                                weight='65', caesarean=1, children=2)
+        ScheduledEvent.objects.create(mother=self.short_plan, note='Call', scheduled_time=timezone.now())
+        Laboratory.objects.create(mother=self.short_plan, scheduled_time=timezone.now())
+        self.application = Mother.objects.create(name='Application')
+        Laboratory.objects.create(mother=self.application, scheduled_time=timezone.now())
+        self.laboratory = Mother.objects.create(name='Laboratory', age=30, residence='New York', height='170',
+                                                weight='65', caesarean=1, children=2)
+        Laboratory.objects.create(mother=self.laboratory, scheduled_time=timezone.now())
+
+    def stage_mothers(self, stage):
+        return set(Mother.objects.filter(stage_condition(stage)).values_list('name', flat=True))
+
+    def test_later_stage_is_stored(self):
+        stages = dict(Mother.objects.values_list('name', 'stage'))
+
+        self.assertEqual(stages, {'ShortPlan': LABORATORY, 'Application': LABORATORY, 'Laboratory': LABORATORY})
+
+    def test_overlapping_mothers_are_listed_by_both_stages(self):
+        self.assertEqual(self.stage_mothers(LABORATORY), {'ShortPlan', 'Application', 'Laboratory'})
+        self.assertEqual(self.stage_mothers(SHORT_PLAN), {'ShortPlan'})
+        self.assertEqual(self.stage_mothers(APPLICATION), {'Application'})
+        self.assertEqual(self.stage_mothers(QUESTIONNAIRE), set())
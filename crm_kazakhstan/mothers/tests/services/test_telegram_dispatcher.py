@@ -0,0 +1,111 @@
+import asyncio
+
+from aiogram import methods
+from aiogram.exceptions import TelegramRetryAfter
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from mothers.services.telegram_dispatcher import TelegramDispatcher, SharedWindow, NOTIFICATION
+
+
+class FakeAPI:
+    def __init__(self, flood=0):
+        self.calls = []
+        self.flood = flood
+
+    async def __call__(self, bot, method):
+        self.calls.append(method)
+        if self.flood:
+            self.flood -= 1
+            raise TelegramRetryAfter(method, 'Too Many Requests', retry_after=0)
+        return type(method).__name__
+
+
+class TelegramDispatcherTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.api = FakeAPI()
+        self.dispatcher = TelegramDispatcher(global_rate=50, chat_rate=20)
+
+    def send(self, method):
+        return self.dispatcher(self.api, None, method)
+
+    async def test_interactive_requests_go_before_cleanup(self):
+        self.dispatcher.global_bucket.tokens = 0
+        delete = methods.DeleteMessage(chat_id=1, message_id=1)
+        edit = methods.EditMessageReplyMarkup(chat_id=1, message_id=2)
+
+        await asyncio.gather(self.send(delete), self.send(edit))
+
+        self.assertEqual(self.api.calls, [edit, delete])
+        self.assertEqual(self.dispatcher.metrics.max_queue_depth, 2)
+
+    async def test_messages_wait_for_their_chat_only(self):
+        first, second = methods.SendMessage(chat_id=1, text='1'), methods.SendMessage(chat_id=1, text='2')
+        other = methods.SendMessage(chat_id=2, text='3')
+
+        await asyncio.gather(self.send(first), self.send(second), self.send(other))
+
+        self.assertEqual(self.api.calls, [first, other, second])
+        self.assertGreater(self.dispatcher.metrics.as_dict()['interactive']['max_wait'], 0)
+
+    async def test_groups_have_their_own_rate(self):
+        self.assertEqual(self.dispatcher.chat_bucket(-1002171039112).rate, 20 / 60)
+        self.assertEqual(self.dispatcher.chat_bucket(1).rate, 20)
+
+    async def test_retries_after_flood_control(self):
+        self.api.flood = 2
+
+        result = await self.send(methods.SendPhoto(chat_id=1, photo='file'))
+
+        self.assertEqual(result, 'SendPhoto')
+        self.assertEqual(len(self.api.calls), 3)
+        self.assertEqual(self.dispatcher.metrics.lanes[NOTIFICATION].retried, 2)
+
+    async def test_gives_up_after_max_retries(self):
+        self.api.flood = 10
+
+        with self.assertRaises(TelegramRetryAfter):
+            await self.send(methods.DeleteMessage(chat_id=1, message_id=1))
+        self.assertEqual(len(self.api.calls), self.dispatcher.max_retries + 1)
+
+    async def test_long_polling_is_not_throttled(self):
+        self.dispatcher.global_bucket.tokens = 0
+
+        self.assertEqual(await asyncio.wait_for(self.send(methods.GetUpdates()), 0.01), 'GetUpdates')
+
+
+class SharedWindowTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = 100.25
+
+    def window(self):
+        # Every process of the bot builds its own window over the same key
+        return SharedWindow('telegram_dispatcher:test:global', 2, 1, clock=lambda: self.now)
+
+    async def test_limit_is_shared_between_processes(self):
+        first_process, second_process = self.window(), self.window()
+
+        self.assertEqual(await first_process.delay(), 0)
+        self.assertEqual(await second_process.delay(), 0)
+        self.assertEqual(await first_process.delay(), 0.75)
+
+        self.now = 101.0
+        self.assertEqual(await second_process.delay(), 0)
+
+    async def test_pause_is_shared_between_processes(self):
+        await self.window().pause(5)
+
+        self.assertEqual(await self.window().delay(), 5)
+
+    async def test_dispatchers_of_one_bot_share_their_windows(self):
+        first_process = TelegramDispatcher(chat_rate=1, name='test')
+        second_process = TelegramDispatcher(chat_rate=1, name='test')
+        api = FakeAPI()
+        for dispatcher in (first_process, second_process):
+            dispatcher.chat_window(1).clock = lambda: self.now
+
+        await first_process(api, None, methods.SendMessage(chat_id=1, text='1'))
+        self.assertGreater(await second_process.chat_window(1).delay(), 0)
+        self.assertEqual(second_process.chat_window(-1).limit, 20)
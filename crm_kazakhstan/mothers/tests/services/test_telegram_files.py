@@ -0,0 +1,86 @@
+import shutil
+import tempfile
+from types import SimpleNamespace
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import SendPhoto
+from aiogram.types import FSInputFile
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from documents.models import MainDocument
+from mothers.models import Mother
+from mothers.models.mother import TelegramFile
+from mothers.services.telegram_files import send_cached_file
+
+
+class FakeSend:
+    """
+    Bot method which records what it was sent and answers with the next file_id.
+    """
+
+    def __init__(self):
+        self.sent = []
+        self.stale = set()
+        self.error = 'Bad Request: wrong file identifier/HTTP URL specified'
+
+    async def __call__(self, photo, **kwargs):
+        self.sent.append(photo)
+        if photo in self.stale:
+            raise TelegramBadRequest(SendPhoto(chat_id=1, photo=photo), self.error)
+        file_id = photo if isinstance(photo, str) else f'file-{len(self.sent)}'
+        return SimpleNamespace(photo=[SimpleNamespace(file_id='thumbnail'), SimpleNamespace(file_id=file_id)])
+
+
+class SendCachedFileTest(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        mother = Mother.objects.create(name='Mother')
+        self.passport = MainDocument.objects.create(mother=mother, title=MainDocument.MainDocumentChoice.PASSPORT,
+                                                    file=ContentFile(b'passport', name='passport.jpg'))
+        self.send = FakeSend()
+
+    async def test_uploads_once_then_sends_file_id(self):
+        await send_cached_file(self.send, 'photo', self.passport.file, chat_id=1)
+        await send_cached_file(self.send, 'photo', self.passport.file, chat_id=1)
+
+        self.assertIsInstance(self.send.sent[0], FSInputFile)
+        self.assertEqual(self.send.sent[1], 'file-1')
+        self.assertEqual(await TelegramFile.objects.filter(path=self.passport.file.name).acount(), 1)
+
+    async def test_changed_content_is_uploaded_again(self):
+        await send_cached_file(self.send, 'photo', self.passport.file, chat_id=1)
+        with open(self.passport.file.path, 'wb') as file:
+            file.write(b'new passport')
+
+        await send_cached_file(self.send, 'photo', self.passport.file, chat_id=1)
+
+        self.assertIsInstance(self.send.sent[1], FSInputFile)
+        cached = [telegram_file.file_id async for telegram_file in TelegramFile.objects.all()]
+        self.assertEqual(cached, ['file-2'])
+
+    async def test_stale_file_id_falls_back_to_upload(self):
+        await TelegramFile.objects.acreate(path=self.passport.file.name, content_hash='known', file_id='expired')
+        self.send.stale.add('expired')
+
+        await send_cached_file(self.send, 'photo', self.passport.file, content_hash='known', chat_id=1)
+
+        self.assertEqual(self.send.sent[0], 'expired')
+        self.assertIsInstance(self.send.sent[1], FSInputFile)
+        self.assertEqual((await TelegramFile.objects.aget(content_hash='known')).file_id, 'file-2')
+
+    async def test_other_bad_requests_are_raised(self):
+        await send_cached_file(self.send, 'photo', self.passport.file, chat_id=1)
+        self.send.stale.add('file-1')
+        self.send.error = 'Bad Request: chat not found'
+
+        with self.assertRaises(TelegramBadRequest):
+            await send_cached_file(self.send, 'photo', self.passport.file, chat_id=1)
+
+        self.assertEqual(len(self.send.sent), 2)
+        self.assertTrue(await TelegramFile.objects.filter(file_id='file-1').aexists())
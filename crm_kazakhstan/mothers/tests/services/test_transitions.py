@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from mothers.models import Mother, ScheduledEvent
+from mothers.models.mother import Laboratory
+from mothers.services.transitions import complete_scheduled_events, complete_missed_laboratories, \
+    parse_mother_ids
+from mothers.signals import rows_completed
+
+FILLED_APPLICATION = dict(age=30, residence='Almaty', height='170', weight='65', caesarean=1, children=2)
+
+
+class BulkTransitionTest(TestCase):
+    def setUp(self):
+        self.mothers = [Mother.objects.create(name=f'Mother{i}', **FILLED_APPLICATION) for i in range(3)]
+        for mother in self.mothers:
+            ScheduledEvent.objects.create(mother=mother, note='Call', scheduled_time=timezone.now())
+        self.done = ScheduledEvent.objects.create(mother=self.mothers[0], note='Done', is_completed=True,
+                                                  scheduled_time=timezone.now() - timedelta(days=1))
+
+    def test_completes_events_with_one_update(self):
+        mother_ids = [mother.pk for mother in self.mothers[:2]]
+
+        with CaptureQueriesContext(connection) as queries:
+            completed = complete_scheduled_events(mother_ids)
+
+        self.assertEqual(completed, 2)
+        updates = [query['sql'] for query in queries.captured_queries
+                   if query['sql'].startswith('UPDATE "mothers_scheduledevent"')]
+        self.assertEqual(len(updates), 1)
+        self.assertFalse(ScheduledEvent.objects.get(mother=self.mothers[2]).is_completed)
+
+    def test_refreshes_stages_of_completed_mothers(self):
+        self.assertEqual(Mother.objects.get(pk=self.mothers[0].pk).stage, Mother.StageChoices.SHORT_PLAN)
+
+        complete_scheduled_events([self.mothers[0].pk])
+
+        self.assertEqual(Mother.objects.get(pk=self.mothers[0].pk).stage, Mother.StageChoices.QUESTIONNAIRE)
+        self.assertEqual(Mother.objects.get(pk=self.mothers[1].pk).stage, Mother.StageChoices.SHORT_PLAN)
+
+    def test_signal_sent_once_per_batch(self):
+        received = []
+
+        def receiver(sender, mother_ids, **kwargs):
+            received.append((sender, mother_ids))
+
+        rows_completed.connect(receiver)
+        try:
+            complete_scheduled_events([mother.pk for mother in self.mothers])
+            # Nothing is left to complete, so nothing is sent
+            complete_scheduled_events([mother.pk for mother in self.mothers])
+        finally:
+            rows_completed.disconnect(receiver)
+
+        self.assertEqual(received, [(ScheduledEvent, [mother.pk for mother in self.mothers])])
+
+    def test_completes_only_missed_laboratories(self):
+        missed = Laboratory.objects.create(mother=self.mothers[0], scheduled_time=timezone.now(), is_came=False)
+        came = Laboratory.objects.create(mother=self.mothers[1], scheduled_time=timezone.now(), is_came=True)
+
+        completed = complete_missed_laboratories([self.mothers[0].pk, self.mothers[1].pk])
+
+        self.assertEqual(completed, 1)
+        missed.refresh_from_db()
+        came.refresh_from_db()
+        self.assertTrue(missed.is_completed)
+        self.assertFalse(came.is_completed)
+
+    def test_completes_only_first_open_row_of_mother(self):
+        later = ScheduledEvent.objects.create(mother=self.mothers[0], note='Later',
+                                              scheduled_time=timezone.now() + timedelta(days=1))
+
+        completed = complete_scheduled_events([self.mothers[0].pk])
+
+        self.assertEqual(completed, 1)
+        self.assertTrue(ScheduledEvent.objects.get(mother=self.mothers[0], note='Call').is_completed)
+        later.refresh_from_db()
+        self.assertFalse(later.is_completed)
+
+    def test_parse_mother_ids(self):
+        self.assertEqual(parse_mother_ids({'mother_ids': ['1', 2]}), [1, 2])
+        self.assertEqual(parse_mother_ids({}), [])
+        for data in ({'mother_ids': ['one']}, {'mother_ids': '1,2'}, {'mother_ids': [None]}, [None], None):
+            with self.subTest(data=data), self.assertRaises(ValueError):
+                parse_mother_ids(data)
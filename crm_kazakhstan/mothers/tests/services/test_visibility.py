@@ -0,0 +1,135 @@
+from django.test import TestCase, RequestFactory
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.utils import timezone
+
+from documents.admin import DocumentProxyAdmin
+from documents.models import Document
+from mothers.admin import MotherAdmin, QuestionnaireAdmin, ShortPlanAdmin
+from mothers.models import Mother, ScheduledEvent, MotherAssignment
+from mothers.services.application import assign_user
+from mothers.services.visibility import get_request_visibility, APPLICATION, QUESTIONNAIRE
+
+User = get_user_model()
+
+
+class RequestVisibilityTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.mother_admin = MotherAdmin(Mother, admin.site)
+        self.questionnaire_admin = QuestionnaireAdmin(Mother, admin.site)
+        self.manager = User.objects.create_user(username='manager', password='password')
+        self.viewer = User.objects.create_user(username='viewer', password='password')
+        self.viewer.user_permissions.add(
+            Permission.objects.get(codename='view_mother'),
+            Permission.objects.get(codename='view_questionnaire'),
+        )
+
+        self.application = Mother.objects.create(name='Application', age=None)
+        self.questionnaire = Mother.objects.create(name='Questionnaire', age=30, residence='New York', height='170',
+                                                   weight='65', caesarean=1, children=2)
+        request = self.factory.get('/')
+        request.user = self.manager
+        assign_user(request, self.mother_admin, self.application)
+
+    def test_context_is_built_once_per_request(self):
+        request = self.factory.get('/')
+        request.user = self.manager
+
+        self.assertIs(get_request_visibility(request), get_request_visibility(request))
+
+    def test_view_only_role_is_resolved_with_one_query(self):
+        request = self.factory.get('/')
+        request.user = self.viewer
+        visibility = get_request_visibility(request)
+
+        with self.assertNumQueries(1):
+            self.assertTrue(visibility.is_view_only('view_mother'))
+            self.assertTrue(visibility.is_view_only('view_questionnaire'))
+            self.assertFalse(visibility.is_view_only('view_shortplan'))
+
+    def test_user_with_change_permission_is_not_view_only(self):
+        self.viewer.user_permissions.add(Permission.objects.get(codename='change_mother'))
+        request = self.factory.get('/')
+        request.user = self.viewer
+
+        self.assertFalse(get_request_visibility(request).is_view_only('view_mother'))
+
+    def test_stage_querysets(self):
+        request = self.factory.get('/')
+        request.user = self.manager
+        visibility = get_request_visibility(request)
+
+        self.assertEqual(list(visibility.users_stage_queryset(APPLICATION)), [self.application])
+        self.assertEqual(list(visibility.users_stage_queryset(QUESTIONNAIRE)), [])
+        self.assertEqual(list(visibility.stage_queryset(QUESTIONNAIRE)), [self.questionnaire])
+        self.assertTrue(visibility.has_assigned_mothers)
+        self.assertTrue(visibility.is_assigned(self.application.pk))
+        self.assertFalse(visibility.is_assigned(self.questionnaire.pk))
+
+    def test_repeated_module_checks_reuse_stage_lookups(self):
+        request = self.factory.get('/')
+        request.user = self.viewer
+
+        self.assertTrue(self.questionnaire_admin.has_module_permission(request))
+        self.questionnaire_admin.get_list_filter(request)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(self.questionnaire_admin.has_module_permission(request))
+            self.questionnaire_admin.get_list_filter(request)
+
+
+class ModuleVisibilityCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.questionnaire_admin = QuestionnaireAdmin(Mother, admin.site)
+        self.short_plan_admin = ShortPlanAdmin(Mother, admin.site)
+        self.document_admin = DocumentProxyAdmin(Document, admin.site)
+        self.viewer = User.objects.create_user(username='viewer', password='password')
+        self.viewer.user_permissions.add(
+            Permission.objects.get(codename='view_questionnaire'),
+            Permission.objects.get(codename='view_shortplan'),
+            Permission.objects.get(codename='view_document'),
+        )
+        self.mother = Mother.objects.create(name='Questionnaire', age=30, residence='New York', height='170',
+                                            weight='65', caesarean=1, children=2)
+
+    def new_request(self):
+        request = self.factory.get('/')
+        request.user = User.objects.get(pk=self.viewer.pk)
+        return request
+
+    def sidebar(self, request):
+        return [model_admin.has_module_permission(request)
+                for model_admin in (self.questionnaire_admin, self.short_plan_admin, self.document_admin)]
+
+    def test_sidebar_runs_no_stage_queries_on_next_request(self):
+        self.assertEqual(self.sidebar(self.new_request()), [True, False, True])
+
+        request = self.new_request()
+        request.user.get_all_permissions()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.sidebar(request), [True, False, True])
+
+    def test_event_change_invalidates_cached_visibility(self):
+        self.assertEqual(self.sidebar(self.new_request()), [True, False, True])
+
+        ScheduledEvent.objects.create(mother=self.mother, note='Call', scheduled_time=timezone.now())
+
+        self.assertEqual(self.sidebar(self.new_request()), [False, True, True])
+
+    def test_assignment_invalidates_cached_visibility(self):
+        manager = User.objects.create_user(username='manager', password='password')
+        request = self.factory.get('/')
+        request.user = manager
+        self.assertEqual(self.sidebar(request), [False, False, False])
+
+        MotherAssignment.objects.create(user=manager, mother=self.mother)
+
+        request = self.factory.get('/')
+        request.user = User.objects.get(pk=manager.pk)
+        self.assertEqual(self.sidebar(request), [True, False, True])